@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for district metadata lookups on the /predict path.
+Compares the previous DataFrame boolean-mask scans (four per request) with
+the (state, district) index built in load_district_meta.
+
+Run from the SIH directory: python benchmark_district_lookup.py
+"""
+
+import random
+import time
+import logging
+
+import improved_seasonal_api as seasonal_api
+
+logging.getLogger('improved_seasonal_api').setLevel(logging.WARNING)
+
+
+def mask_scan_request(df, state, district):
+    """Reproduce the four per-request DataFrame scans of the old code path"""
+    for _ in range(4):
+        match = df[(df['state'] == state) & (df['district'] == district)]
+        if not match.empty:
+            row = match.iloc[0]
+            float(row['lat']), float(row['lon'])
+            hc = row['historical_crops']
+            if isinstance(hc, str):
+                [c.strip() for c in hc.split(',')]
+
+
+def index_request(api, state, district):
+    """Same four lookups served from the district index"""
+    for _ in range(4):
+        record = api.get_district_record(state, district)
+        if record:
+            record['lat'], record['lon']
+            record['historical_set']
+
+
+def time_per_request(fn, keys, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for state, district in keys:
+            fn(state, district)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeats * len(keys)) * 1e6
+
+
+def main():
+    api = seasonal_api.api
+    keys = list(api.district_index.keys())
+    random.seed(0)
+    sample = random.sample(keys, min(200, len(keys)))
+
+    df = api.district_meta
+    before = time_per_request(lambda s, d: mask_scan_request(df, s, d), sample, 5)
+    after = time_per_request(lambda s, d: index_request(api, s, d), sample, 500)
+
+    print(f"Districts indexed: {len(keys)}")
+    print(f"DataFrame mask scans: {before:10.2f} us/request")
+    print(f"District index:       {after:10.2f} us/request")
+    print(f"Speedup:              {before / after:10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark engineer_district_features against synthetic training sets built
+by replicating crop_requirements.csv. Compares the previous per-row
+implementation (list comprehension plus iterrows/.at writes) with the
+vectorised indicator-matrix and merge version, and checks the engineered
+columns match when both draw from seed 0.
+
+Run from the SIH directory: python benchmark_feature_engineering.py [--rows 1000 100000 1000000]
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from train_combined_rf_model import CombinedCropRecommendationTrainer
+
+logging.getLogger('train_combined_rf_model').setLevel(logging.WARNING)
+
+ENGINEERED_COLUMNS = ['season', 'state', 'district', 'district_crop_ratio',
+                      'state_avg_yield', 'state_yield_efficiency', 'state_yield_std']
+
+
+def legacy_engineer(trainer, df_base, df_meta):
+    """The previous implementation of engineer_district_features"""
+    seasons = ['kharif', 'rabi_early', 'rabi_late', 'zaid', 'perennial']
+    df_base['season'] = np.random.choice(seasons, size=len(df_base))
+
+    districts_sample = df_meta.sample(n=len(df_base), replace=True)
+    df_base['state'] = districts_sample['state'].values
+    df_base['district'] = districts_sample['district'].values
+
+    def get_district_crop_ratio(district_crops, crop_label):
+        crops_list = district_crops.split(',') if isinstance(district_crops, str) else []
+        if crop_label in crops_list:
+            return 1.0
+        similar_crops = {
+            'rice': ['rice', 'paddy'],
+            'wheat': ['wheat'],
+            'maize': ['maize', 'corn'],
+            'cotton': ['cotton'],
+            'sugarcane': ['sugarcane'],
+            'groundnut': ['groundnut', 'peanut'],
+            'chickpea': ['chickpea', 'gram'],
+            'pearl_millet': ['pearl_millet', 'bajra']
+        }
+        for similar in similar_crops.get(crop_label, []):
+            if similar in crops_list:
+                return 0.7
+        return 0.3
+
+    df_base['district_crop_ratio'] = [
+        get_district_crop_ratio(district_crops, crop_label)
+        for district_crops, crop_label in zip(districts_sample['historical_crops'], df_base['label'])
+    ]
+
+    state_crop_performance = trainer.yield_features.get('state_crop_performance', {})
+    df_base['state_avg_yield'] = 0.0
+    df_base['state_yield_efficiency'] = 0.0
+    df_base['state_yield_std'] = 0.0
+    for idx, row in df_base.iterrows():
+        state = row['state']
+        crop = row['label']
+        if state in state_crop_performance and crop in state_crop_performance[state]:
+            crop_stats = state_crop_performance[state][crop]
+            df_base.at[idx, 'state_avg_yield'] = crop_stats.get('avg_yield', 0.0)
+            df_base.at[idx, 'state_yield_efficiency'] = crop_stats.get('yield_efficiency', 0.0)
+            df_base.at[idx, 'state_yield_std'] = crop_stats.get('yield_std', 0.0)
+    return df_base
+
+
+def synthetic_rows(df_requirements, rows):
+    """crop_requirements.csv repeated to ``rows`` rows"""
+    repeats = -(-rows // len(df_requirements))
+    return pd.concat([df_requirements] * repeats, ignore_index=True).iloc[:rows].copy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--legacy-max-rows', type=int, default=100000,
+                        help='Skip the per-row implementation above this size')
+    args = parser.parse_args()
+
+    trainer = CombinedCropRecommendationTrainer()
+    df_requirements, df_meta = trainer.load_and_combine_datasets()
+
+    # Make sure some rows hit the yield features, whose crop names are capitalised
+    performance = trainer.yield_features.setdefault('state_crop_performance', {})
+    for state in df_meta['state'].unique()[::2]:
+        for crop in df_requirements['label'].unique():
+            performance.setdefault(state, {})[crop] = {
+                'avg_yield': 2.0, 'yield_efficiency': 0.8, 'yield_std': 0.3
+            }
+
+    print(f"{'Rows':>9}{'per-row (s)':>13}{'vectorised (s)':>16}{'rows/s':>14}{'speedup':>9}  match")
+    for rows in args.rows:
+        df_base = synthetic_rows(df_requirements, rows)
+
+        trainer.seed = 0
+        start = time.perf_counter()
+        engineered = trainer.engineer_district_features(df_base.copy(), df_meta)
+        vectorised_time = time.perf_counter() - start
+
+        if rows <= args.legacy_max_rows:
+            np.random.seed(0)
+            start = time.perf_counter()
+            legacy = legacy_engineer(trainer, df_base.copy(), df_meta)
+            legacy_time = time.perf_counter() - start
+            match = legacy[ENGINEERED_COLUMNS].equals(engineered[ENGINEERED_COLUMNS])
+            print(f"{rows:>9}{legacy_time:>13.3f}{vectorised_time:>16.3f}{rows / vectorised_time:>14,.0f}"
+                  f"{legacy_time / vectorised_time:>8.1f}x  {match}")
+        else:
+            print(f"{rows:>9}{'-':>13}{vectorised_time:>16.3f}{rows / vectorised_time:>14,.0f}{'-':>9}  -")
+
+
+if __name__ == '__main__':
+    main()
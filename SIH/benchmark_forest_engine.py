@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Validate the compiled forest against sklearn and compare predict_proba
+latency at batch sizes 1, 32 and 1024.
+
+Correctness is checked two ways: the leaves reached must equal
+``model.apply``, and the probabilities must equal the mean of the
+per-tree normalised class distributions (RandomForestClassifier's own
+definition). When the installed sklearn matches the version the model was
+pickled with, predict_proba is also compared directly; otherwise the
+compiled path serves different (normalised) probabilities than sklearn,
+which ModelBundle.check_forest reports as 'normalises_leaf_counts'.
+
+The speedup comes from skipping per-call overhead, so it is largest for
+single rows and drops to a small factor at batch 1024.
+
+Run from the SIH directory: python benchmark_forest_engine.py
+"""
+
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+from forest_engine import CompiledForest, tree_normalised_proba
+
+MODEL_PATH = '../trained_models/combined_rf_crop_recommender.joblib'
+BATCH_SIZES = [1, 32, 1024]
+
+
+def sample_rows(n, n_features, rng):
+    """Half in the scaled training space, half at raw API feature magnitudes"""
+    scaled = rng.normal(size=(n // 2, n_features))
+    raw = rng.normal(loc=40, scale=60, size=(n - n // 2, n_features))
+    return np.vstack([scaled, raw])
+
+
+def check_equivalent(model, forest, X):
+    leaves = forest.apply(X) - forest.roots
+    assert np.array_equal(leaves, model.apply(X)), "leaf indices differ from model.apply"
+    compiled = forest.predict_proba(X)
+    assert np.allclose(compiled, tree_normalised_proba(model, X), rtol=0, atol=1e-12)
+    sklearn_proba = model.predict_proba(X)
+    if np.allclose(sklearn_proba.sum(axis=1), 1.0):
+        assert np.allclose(compiled, sklearn_proba, rtol=0, atol=1e-12)
+        return "leaves and probabilities match sklearn predict_proba"
+    return ("leaves match model.apply and probabilities match per-tree normalised sklearn trees "
+            "(installed sklearn does not normalise this pickle's leaf counts)")
+
+
+def time_call(fn, X, min_seconds=0.5):
+    fn(X)
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn(X)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def main():
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        model_data = joblib.load(MODEL_PATH)
+    model = model_data['model'] if isinstance(model_data, dict) else model_data
+    forest = CompiledForest.from_model(model)
+    rng = np.random.default_rng(0)
+
+    print(f"{forest.n_estimators} trees, {len(forest.feature)} nodes, max depth {forest.max_depth}, "
+          f"sklearn n_jobs={model.n_jobs}")
+    print(check_equivalent(model, forest, sample_rows(4096, forest.n_features, rng)))
+
+    print(f"{'Batch':>6}{'sklearn (ms)':>14}{'compiled (ms)':>15}{'speedup':>10}")
+    for batch_size in BATCH_SIZES:
+        X = sample_rows(batch_size, forest.n_features, rng)
+        sklearn_time = time_call(model.predict_proba, X)
+        compiled_time = time_call(forest.predict_proba, X)
+        print(f"{batch_size:>6}{sklearn_time * 1000:>14.3f}{compiled_time * 1000:>15.3f}"
+              f"{sklearn_time / compiled_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Measure the cost of the metrics hooks: a single timed stage, concurrent
+observations from several threads, and /predict latency with metrics
+enabled versus disabled (alternating rounds in one subprocess, weather
+pointed at an unreachable host so only local work is timed).
+
+Run from the SIH directory: python benchmark_metrics.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from metrics import STAGE_BUCKETS, Histogram
+
+PROBE = r'''
+import json, logging, time
+logging.disable(logging.CRITICAL)
+import metrics
+import improved_seasonal_api as seasonal_api
+client = seasonal_api.app.test_client()
+body = {'state': 'Punjab', 'district': 'Ludhiana', 'season': 'kharif', 'district_native': True}
+for _ in range(50):
+    client.post('/predict', json=body)
+# Alternate rounds inside one process: separate processes differ by more than the hooks cost
+n = 1000
+best = {True: float('inf'), False: float('inf')}
+before = sum(sum(counts) for counts, _ in seasonal_api.STAGE_SECONDS.collect().values())
+for _ in range(6):
+    for enabled in (True, False):
+        metrics.ENABLED = enabled
+        start = time.perf_counter()
+        for _ in range(n):
+            client.post('/predict', json=body)
+        best[enabled] = min(best[enabled], (time.perf_counter() - start) / n)
+hooks = (sum(sum(counts) for counts, _ in seasonal_api.STAGE_SECONDS.collect().values()) - before) / (6 * n)
+print(json.dumps({'on': best[True], 'off': best[False], 'hooks_per_request': hooks}))
+'''
+
+
+def time_hook(n=200000):
+    histogram = Histogram('bench_seconds', 'bench', 'stage', STAGE_BUCKETS)
+    start = time.perf_counter()
+    for _ in range(n):
+        pass
+    empty = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(n):
+        with histogram.time('stage'):
+            pass
+    return (time.perf_counter() - start - empty) / n
+
+
+def time_contended(threads=8, n=50000):
+    histogram = Histogram('bench_seconds', 'bench', 'stage', STAGE_BUCKETS)
+
+    def worker():
+        for _ in range(n):
+            histogram.observe(0.001, 'stage')
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker_thread in workers:
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+    elapsed = time.perf_counter() - start
+    assert histogram.snapshot('stage')[0] == threads * n
+    return elapsed / (threads * n)
+
+
+def time_predict():
+    env = dict(os.environ, OPEN_METEO_URL='http://127.0.0.1:9/v1/forecast')
+    output = subprocess.run([sys.executable, '-W', 'ignore', '-c', PROBE], env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    hook = time_hook()
+    print(f"Timed stage hook:          {hook * 1e6:6.2f} us")
+    print(f"observe() with 8 threads:  {time_contended() * 1e6:6.2f} us per observation")
+    result = time_predict()
+    on, off, hooks = result['on'], result['off'], result['hooks_per_request']
+    print(f"/predict metrics on:  {on * 1000:6.3f} ms ({hooks:.0f} timed stages per request, "
+          f"about {hooks * hook * 1e6:.1f} us of hooks)")
+    print(f"/predict metrics off: {off * 1000:6.3f} ms "
+          f"(overhead {(on - off) * 1e6:+.1f} us, {(on / off - 1) * 100:+.1f}%)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Quality check and cost of the knowledge/model blend in _merge_predictions.
+
+Quality: every row of data/data_set.csv whose label is a crop the API can
+recommend becomes a request with the row's temperature, humidity and
+rainfall as weather, a season that lists the crop and a random district.
+Hit@1 and hit@top_k of the true label are reported per blend weight,
+overall and for rows whose label the model knows, and the weight with the
+best hit@1 + hit@top_k is recommended as MODEL_BLEND_WEIGHT.
+
+Cost: per-request latency of predict_with_weather at batch sizes 1, 32 and
+1024 with the model skipped (weight 0) and blended (weight 0.3).
+
+Run from the SIH directory: python benchmark_model_blend.py
+"""
+
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault('API_STARTUP_MODE', 'lazy')
+logging.disable(logging.CRITICAL)
+
+from improved_seasonal_api import api  # noqa: E402
+
+DATA_SET_PATH = '../data/data_set.csv'
+WEIGHTS = [0.0, 0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 1.0]
+BATCH_SIZES = [1, 32, 1024]
+BLEND_WEIGHT = 0.3
+
+
+def build_requests(rng):
+    """(items, weather, labels) for data_set.csv rows the knowledge base can rank"""
+    label_season = {}
+    for season, knowledge in api.seasonal_crop_knowledge.items():
+        for crop in knowledge.get('ideal_crops', []) + knowledge.get('suitable_crops', []):
+            label_season.setdefault(crop, season)
+
+    df = pd.read_csv(DATA_SET_PATH)
+    df = df[df['label'].isin(label_season)]
+    districts = list(api.district_index)
+    items, weather, labels = [], [], []
+    for row in df.itertuples(index=False):
+        state, district = districts[rng.integers(len(districts))]
+        items.append((state, district, label_season[row.label]))
+        weather.append({
+            'temperature': float(row.temperature),
+            'humidity': float(row.humidity),
+            'rainfall': float(row.rainfall),
+            'wind_speed': float(row.wind_speed)
+        })
+        labels.append(row.label)
+    return items, weather, labels
+
+
+def hit_rates(predictions, labels, top_k):
+    top1 = np.mean([bool(p) and p[0]['crop'] == label for p, label in zip(predictions, labels)])
+    topk = np.mean([label in [x['crop'] for x in p[:top_k]] for p, label in zip(predictions, labels)])
+    return top1, topk
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--top-k', type=int, default=5)
+    args = parser.parse_args()
+
+    api.ensure_loaded()
+    configured_weight = api.model_blend_weight
+    rng = np.random.default_rng(0)
+    items, weather, labels = build_requests(rng)
+    model_known = np.array([label in api.class_index for label in labels])
+    print(f"{len(items)} data_set.csv rows with rankable labels, {model_known.sum()} with labels the model knows")
+
+    print(f"{'Weight':>7}{'hit@1':>8}{f'hit@{args.top_k}':>8}{'model-known hit@1':>19}{f'hit@{args.top_k}':>8}")
+    quality = {}
+    for weight in WEIGHTS:
+        api.model_blend_weight = weight
+        predictions = api.predict_with_weather(items, weather, args.top_k)
+        top1, topk = hit_rates(predictions, labels, args.top_k)
+        known = [p for p, k in zip(predictions, model_known) if k]
+        known_labels = [label for label, k in zip(labels, model_known) if k]
+        known_top1, known_topk = hit_rates(known, known_labels, args.top_k)
+        print(f"{weight:>7.2f}{top1:>8.3f}{topk:>8.3f}{known_top1:>19.3f}{known_topk:>8.3f}")
+        quality[weight] = top1 + topk
+    # Smallest weight with the best hit@1 + hit@top_k (ties favour skipping the model)
+    best = max(WEIGHTS, key=lambda weight: (round(quality[weight], 6), -weight))
+    print(f"Recommended MODEL_BLEND_WEIGHT: {best} (configured: {configured_weight})")
+
+    print(f"{'Batch':>6}{'weight 0 (ms/req)':>19}{f'weight {BLEND_WEIGHT} (ms/req)':>21}")
+    for batch_size in BATCH_SIZES:
+        batch_items, batch_weather = items[:batch_size], weather[:batch_size]
+        timings = []
+        for weight in [0.0, BLEND_WEIGHT]:
+            api.model_blend_weight = weight
+            api.predict_with_weather(batch_items, batch_weather, args.top_k)
+            repeats = max(3, 2000 // batch_size)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                api.predict_with_weather(batch_items, batch_weather, args.top_k)
+            timings.append((time.perf_counter() - start) / repeats / batch_size)
+        print(f"{batch_size:>6}{timings[0] * 1000:>19.3f}{timings[1] * 1000:>21.3f}")
+    api.model_blend_weight = configured_weight
+
+
+if __name__ == '__main__':
+    main()
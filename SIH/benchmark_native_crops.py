@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Compare the vectorised native crop precompute with per-request scoring for
+every (district, season), check both rank identically, and hammer the LRU
+from several threads to confirm it stays bounded.
+
+Run from the SIH directory: python benchmark_native_crops.py
+"""
+
+import logging
+import os
+import threading
+import time
+
+os.environ.setdefault('API_STARTUP_MODE', 'lazy')
+logging.disable(logging.CRITICAL)
+
+from improved_seasonal_api import api  # noqa: E402
+from native_crops import NativeCropCache  # noqa: E402
+
+
+def main():
+    api.ensure_loaded()
+
+    start = time.perf_counter()
+    api.precompute_native_crops()
+    precompute_time = time.perf_counter() - start
+    table, api._native_table = api._native_table, None
+
+    api._native_cache = NativeCropCache(max_entries=len(table))
+    start = time.perf_counter()
+    mismatches = sum(api.get_native_crops(state, district, season) != expected
+                     for (state, district, season), expected in table.items())
+    inline_time = time.perf_counter() - start
+    print(f"{len(table)} district-seasons: precompute {precompute_time * 1000:.1f} ms, "
+          f"inline scoring {inline_time * 1000:.1f} ms ({inline_time / len(table) * 1e6:.1f} us each), "
+          f"mismatches: {mismatches}")
+
+    # Concurrent lookups against a cache far smaller than the key space
+    api._native_cache = NativeCropCache(max_entries=256)
+    keys = list(table)
+
+    def worker(offset):
+        for i in range(2000):
+            api.get_native_crops(*keys[(offset + i * 7) % len(keys)])
+
+    threads = [threading.Thread(target=worker, args=(i * 101,)) for i in range(8)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stats = api._native_cache.stats()
+    print(f"8 threads x 2000 lookups: {elapsed:.2f} s, size {stats['size']}/{stats['max_entries']}, "
+          f"hits {stats['hits']}, misses {stats['misses']}, evictions {stats['evictions']}")
+
+
+if __name__ == '__main__':
+    main()
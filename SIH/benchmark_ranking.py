@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Check ranking.top_k_indices against a stable Python sort (with heavy ties)
+and compare its cost with a full stable argsort as the crop catalogue grows.
+Catalogues of up to ranking.FULL_SORT_MAX crops (or 4 * k) are themselves
+ranked by a full argsort, so both paths are checked and timed.
+
+Run from the SIH directory: python benchmark_ranking.py
+"""
+
+import argparse
+import gc
+import time
+
+import numpy as np
+
+from ranking import top_k_indices
+
+CATALOGUE_SIZES = [20, 32, 50, 200, 1000, 5000]
+
+
+def best_of(fn, repeats=5, number=20):
+    """Best per-call time over several runs, with GC paused like timeit"""
+    gc.disable()
+    try:
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            best = min(best, (time.perf_counter() - start) / number)
+        return best
+    finally:
+        gc.enable()
+
+
+def check_equivalence(rng, trials=2000):
+    mismatches = 0
+    for _ in range(trials):
+        n = int(rng.integers(1, 60))
+        k = int(rng.integers(0, n + 2))
+        # Few distinct values so ties straddle the k-th position often
+        scores = rng.integers(0, 4, size=n).astype(float)
+        scores[rng.random(n) < 0.1] = -np.inf
+        names = rng.permutation([f'crop{i:02d}' for i in range(n)])
+        expected = sorted(range(n), key=lambda i: (-scores[i], names[i]))[:k]
+        if top_k_indices(scores, k, tiebreak=names).tolist() != expected:
+            mismatches += 1
+        expected = sorted(range(n), key=lambda i: -scores[i])[:k]
+        if top_k_indices(scores[None, :], k)[0].tolist() != expected:
+            mismatches += 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=256, help='score vectors ranked per call')
+    parser.add_argument('--top-k', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"Equivalence with a stable sort over tied scores: {check_equivalence(rng)} mismatches")
+
+    print(f"{'Crops':>6}{'full argsort (ms)':>19}{f'top_k_indices k={args.top_k} (ms)':>26}{'speedup':>9}")
+    for n in CATALOGUE_SIZES:
+        scores = np.round(rng.random((args.rows, n)), 3)
+        full = best_of(lambda: np.argsort(-scores, axis=1, kind='stable')[:, :args.top_k])
+        top = best_of(lambda: top_k_indices(scores, args.top_k))
+        print(f"{n:>6}{full * 1000:>19.3f}{top * 1000:>26.3f}{full / top:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
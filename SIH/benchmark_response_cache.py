@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+POST /predict latency with and without the response cache, on traffic
+skewed toward popular districts (Zipf-distributed over every district and
+season), through Flask's test client. Also times revalidation with
+If-None-Match (304, no body) and raw lookups in the shared mmap tier, and
+checks that answers built on fallback weather are not cached and that
+top_k values past the crop catalogue share one entry.
+
+The shared slots live on /dev/shm when it exists, as in production; pass
+--shared-dir to measure another filesystem.
+
+Weather comes from a synthetic snapshot (WEATHER_MODE=snapshot), so only
+scoring and serialization are measured.
+
+Run from the SIH directory: python benchmark_response_cache.py [--requests 5000] [--zipf 1.1]
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+
+from weather_snapshot import load_districts, synthetic_values, write_snapshot
+
+SEASONS = ['kharif', 'rabi_early', 'rabi_late', 'zaid', 'perennial']
+
+
+def run(client, bodies):
+    latencies = np.empty(len(bodies))
+    statuses = {}
+    for i, body in enumerate(bodies):
+        start = time.perf_counter()
+        response = client.post('/predict', data=body, content_type='application/json')
+        latencies[i] = time.perf_counter() - start
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return latencies, statuses
+
+
+def report(label, latencies, statuses):
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"{label:<30}{len(latencies) / latencies.sum():>9.0f}{p50:>10.3f}{p99:>10.3f}  {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--zipf', type=float, default=1.1, help='Zipf exponent of district popularity')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--shared-dir', default='/dev/shm' if os.path.isdir('/dev/shm') else None,
+                        help='Directory for the shared slot file (default: /dev/shm if present)')
+    args = parser.parse_args()
+
+    districts = load_districts()
+    tmp = tempfile.mkdtemp()
+    shared_tmp = tempfile.mkdtemp(dir=args.shared_dir)
+    snapshot_path = os.path.join(tmp, 'weather_snapshot.npy')
+    start_date = date(date.today().year, 1, 1)
+    write_snapshot(snapshot_path, districts, start_date, synthetic_values(districts, start_date, 366))
+    os.environ.update(WEATHER_MODE='snapshot', WEATHER_SNAPSHOT_PATH=snapshot_path,
+                      RESPONSE_CACHE_SHARED_PATH=os.path.join(shared_tmp, 'responses'))
+
+    # Imported after the environment is set: the API reads it at import time
+    from improved_seasonal_api import api, app
+    logging.disable(logging.WARNING)
+
+    rng = np.random.default_rng(args.seed)
+    keys = [(state, district, season) for state, district, _, _ in districts for season in SEASONS]
+    order = rng.permutation(len(keys))
+    ranks = np.minimum(rng.zipf(args.zipf, args.requests), len(keys)) - 1
+    bodies = [json.dumps({'state': keys[order[r]][0], 'district': keys[order[r]][1], 'season': keys[order[r]][2]})
+              for r in ranks]
+    print(f"{args.requests} requests over {len(set(ranks.tolist()))} distinct bodies (zipf {args.zipf})")
+    print(f"{'Configuration':<30}{'req/s':>9}{'p50 (ms)':>10}{'p99 (ms)':>10}  statuses")
+
+    client = app.test_client()
+    cache = api.response_cache
+    api.response_cache = None
+    # Untimed pass so the first configuration does not pay for warm-up
+    run(client, bodies)
+    report('no cache', *run(client, bodies))
+
+    api.response_cache = cache
+    report('cache, cold start', *run(client, bodies))
+    report('cache, warm', *run(client, bodies))
+
+    etags = {}
+    for body in set(bodies):
+        etags[body] = client.post('/predict', data=body, content_type='application/json').headers['ETag']
+    latencies = np.empty(len(bodies))
+    statuses = {}
+    for i, body in enumerate(bodies):
+        start = time.perf_counter()
+        response = client.post('/predict', data=body, content_type='application/json',
+                               headers={'If-None-Match': etags[body]})
+        latencies[i] = time.perf_counter() - start
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    report('cache, If-None-Match', latencies, statuses)
+
+    # Answers built on default weather (district not in the snapshot) must not be stored
+    stores = cache.stats()['stores']
+    for _ in range(2):
+        client.post('/predict', data=json.dumps({'state': 'Nowhere', 'district': 'Unknown', 'season': 'kharif'}),
+                    content_type='application/json')
+    print(f"fallback weather stored: {cache.stats()['stores'] - stores} (expected 0)")
+
+    # top_k is capped at the catalogue size before keying, so these share one entry
+    stores = cache.stats()['stores']
+    state, district = keys[0][:2]
+    for top_k in (1000, 100, 1000):
+        client.post('/predict', data=json.dumps({'state': state, 'district': district, 'top_k': top_k}),
+                    content_type='application/json')
+    print(f"large top_k stored: {cache.stats()['stores'] - stores} (expected 1)")
+
+    # Shared tier alone: what a worker pays on another worker's entry
+    shared = cache.shared
+    payload = os.urandom(2048)
+    digests = [cache.shared_key(cache.key(('bench', i))) for i in range(1000)]
+    expires = time.time() + 3600
+    start = time.perf_counter()
+    for key in digests:
+        shared.put(key, payload, key, expires)
+    put_us = (time.perf_counter() - start) / len(digests) * 1e6
+    start = time.perf_counter()
+    found = sum(shared.get(key, time.time()) is not None for key in digests)
+    get_us = (time.perf_counter() - start) / len(digests) * 1e6
+    print(f"shared slots: put {put_us:.1f} us, get {get_us:.1f} us per 2 KB entry "
+          f"({found}/{len(digests)} still resident in {shared.slots} slots)")
+
+    # What a miss adds to the request: key, failed lookup (both tiers) and store
+    parts = [('predict', 'State', f'District {i}', 'kharif', 5, False, ('snapshot', (12.3, 45.6), '2026-01-01'),
+              'v1', 0.0, 1) for i in range(1000)]
+    start = time.perf_counter()
+    for part in parts:
+        key = cache.key(part)
+        cache.get(key)
+        cache.put(key, payload, 900)
+    miss_us = (time.perf_counter() - start) / len(parts) * 1e6
+    print(f"cache work per miss (key, lookup, store of 2 KB): {miss_us:.1f} us")
+    print(f"cache stats: {cache.stats()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    shutil.rmtree(shared_tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Check the table-driven SeasonalScoringEngine against the previous if/elif
+implementation of get_seasonal_crop_recommendations for every district and
+season under random weather, then compare throughput of the per-request
+loop with batched scoring.
+
+Run from the SIH directory: python benchmark_scoring_engine.py [--rows 5000]
+"""
+
+import argparse
+import gc
+import logging
+import os
+import time
+
+import numpy as np
+
+os.environ.setdefault('API_STARTUP_MODE', 'lazy')
+logging.disable(logging.CRITICAL)
+
+from improved_seasonal_api import api  # noqa: E402
+
+SEASONS = ['kharif', 'rabi_early', 'rabi_late', 'zaid', 'perennial']
+
+
+def legacy_recommendations(api, season, weather_data, state, district, top_k=5):
+    """The previous if/elif implementation of get_seasonal_crop_recommendations"""
+    seasonal_crops = api.seasonal_crop_knowledge.get(season, {})
+    ideal_crops = seasonal_crops.get('ideal_crops', [])
+    suitable_crops = seasonal_crops.get('suitable_crops', [])
+    conditions = seasonal_crops.get('conditions', {})
+
+    recommendations = []
+
+    # Check weather suitability
+    temp = weather_data['temperature']
+    rainfall = weather_data['rainfall']
+    humidity = weather_data['humidity']
+
+    # Get district-specific historical crops if available
+    record = api.get_district_record(state, district)
+    district_crops = record['historical_set'] if record else frozenset()
+
+    # Get crop yield performance data for the state if available
+    state_crop_performance = {}
+    if hasattr(api, 'yield_features') and api.yield_features:
+        state_crop_performance = api.yield_features.get('state_crop_performance', {}).get(state, {})
+
+    # Score ideal crops higher
+    for crop in ideal_crops[:top_k*2]:  # Consider more crops initially
+        score = 0.8  # Base score for ideal crops
+
+        # Adjust based on weather conditions for 5 seasons
+        if season == 'kharif':
+            if temp >= 25 and temp <= 35: score += 0.1
+            if rainfall >= 500: score += 0.1
+            if humidity >= 70: score += 0.05
+        elif season == 'rabi_early':
+            if temp >= 10 and temp <= 20: score += 0.1
+            if rainfall <= 300: score += 0.1
+            if humidity <= 60: score += 0.05
+        elif season == 'rabi_late':
+            if temp >= 15 and temp <= 25: score += 0.1
+            if rainfall <= 200: score += 0.1
+            if humidity <= 50: score += 0.05
+        elif season == 'zaid':
+            if temp >= 30: score += 0.1
+            if rainfall <= 200: score += 0.1
+            if humidity <= 50: score += 0.05
+        elif season == 'perennial':
+            if temp >= 20 and temp <= 35: score += 0.1
+            if rainfall >= 750 and rainfall <= 2500: score += 0.1
+            if humidity >= 60 and humidity <= 80: score += 0.05
+
+        # Regional adjustments
+        if state == 'Maharashtra' and crop in ['cotton', 'sugarcane', 'soybean']:
+            score += 0.1
+        elif state == 'Punjab' and crop in ['wheat', 'rice']:
+            score += 0.1
+        elif state == 'Karnataka' and crop in ['cotton', 'sugarcane']:
+            score += 0.1
+        elif state == 'Tamil Nadu' and crop in ['rice', 'sugarcane']:
+            score += 0.1
+        elif state == 'Uttar Pradesh' and crop in ['wheat', 'rice', 'sugarcane']:
+            score += 0.1
+        elif state == 'Chhattisgarh' and crop in ['rice', 'pearl_millet', 'chickpea', 'groundnut', 'sugarcane']:
+            score += 0.1
+        elif state == 'Madhya Pradesh' and crop in ['rice', 'pearl_millet', 'chickpea', 'groundnut', 'sugarcane']:
+            score += 0.1
+
+        # District-specific adjustments
+        if crop in district_crops:
+            score += 0.15  # Boost for historically grown crops
+
+        # Crop yield performance adjustments
+        yield_efficiency = 0
+        if crop in state_crop_performance:
+            crop_stats = state_crop_performance[crop]
+            yield_efficiency = crop_stats.get('yield_efficiency', 0)
+            avg_yield = crop_stats.get('avg_yield', 0)
+
+            # Boost score based on yield performance
+            if yield_efficiency > 0.5:  # High efficiency
+                score += 0.2
+            elif yield_efficiency > 0.3:  # Medium efficiency
+                score += 0.1
+            else:
+                score += 0.05  # Low efficiency but still positive
+
+            if avg_yield > 1.0:  # Good average yield
+                score += 0.1
+
+        confidence = 'high' if score > 0.9 else 'medium' if score > 0.7 else 'low'
+
+        recommendations.append({
+            'crop': crop,
+            'probability': min(score, 1.0),
+            'confidence': confidence,
+            'season_suitable': season,
+            'weather_factors': {
+                'temperature': temp,
+                'humidity': humidity,
+                'rainfall_forecast': rainfall
+            },
+            'suitability_reason': api._get_suitability_reason(crop, season, weather_data),
+            'district_historical': crop in district_crops,
+            'yield_efficiency': yield_efficiency
+        })
+
+    # Add suitable crops if we need more recommendations
+    if len(recommendations) < top_k*2:
+        for crop in suitable_crops[:top_k*2 - len(recommendations)]:
+            score = 0.6  # Lower base score for suitable crops
+
+            # Similar adjustments as above for 5 seasons
+            if season == 'kharif' and temp >= 25 and rainfall >= 500:
+                score += 0.1
+            elif season == 'rabi_early' and temp >= 10 and temp <= 20 and rainfall <= 300:
+                score += 0.1
+            elif season == 'rabi_late' and temp >= 15 and temp <= 25 and rainfall <= 200:
+                score += 0.1
+            elif season == 'zaid' and temp >= 30 and rainfall <= 200:
+                score += 0.1
+            elif season == 'perennial' and temp >= 20 and temp <= 35 and rainfall >= 750:
+                score += 0.1
+
+            # Regional adjustments
+            if state == 'Maharashtra' and crop in ['cotton', 'sugarcane', 'soybean']:
+                score += 0.1
+            elif state == 'Punjab' and crop in ['wheat', 'rice']:
+                score += 0.1
+            elif state == 'Karnataka' and crop in ['cotton', 'sugarcane']:
+                score += 0.1
+            elif state == 'Tamil Nadu' and crop in ['rice', 'sugarcane']:
+                score += 0.1
+            elif state == 'Uttar Pradesh' and crop in ['wheat', 'rice', 'sugarcane']:
+                score += 0.1
+            elif state == 'Chhattisgarh' and crop in ['rice', 'pearl_millet', 'chickpea', 'groundnut', 'sugarcane']:
+                score += 0.1
+            elif state == 'Madhya Pradesh' and crop in ['rice', 'pearl_millet', 'chickpea', 'groundnut', 'sugarcane']:
+                score += 0.1
+
+            # District-specific adjustments
+            if crop in district_crops:
+                score += 0.15  # Boost for historically grown crops
+
+            # Crop yield performance adjustments
+            yield_efficiency = 0
+            if crop in state_crop_performance:
+                crop_stats = state_crop_performance[crop]
+                yield_efficiency = crop_stats.get('yield_efficiency', 0)
+                avg_yield = crop_stats.get('avg_yield', 0)
+
+                # Boost score based on yield performance
+                if yield_efficiency > 0.5:  # High efficiency
+                    score += 0.2
+                elif yield_efficiency > 0.3:  # Medium efficiency
+                    score += 0.1
+                else:
+                    score += 0.05  # Low efficiency but still positive
+
+                if avg_yield > 1.0:  # Good average yield
+                    score += 0.1
+
+            confidence = 'medium' if score > 0.7 else 'low'
+
+            recommendations.append({
+                'crop': crop,
+                'probability': min(score, 1.0),
+                'confidence': confidence,
+                'season_suitable': season,
+                'weather_factors': {
+                    'temperature': temp,
+                    'humidity': humidity,
+                    'rainfall_forecast': rainfall
+                },
+                'suitability_reason': api._get_suitability_reason(crop, season, weather_data),
+                'district_historical': crop in district_crops,
+                'yield_efficiency': yield_efficiency
+            })
+
+    # Sort by probability and return top_k
+    recommendations.sort(key=lambda x: x['probability'], reverse=True)
+    return recommendations[:top_k]
+
+
+def best_of(fn, repeats=3):
+    """Best wall time of ``repeats`` runs with GC paused, as timeit does"""
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(times)
+
+
+def random_rows(n, rng):
+    """Random (season, weather, state, district) rows that hit every rule edge"""
+    districts = list(api.district_index)
+    rows = []
+    for _ in range(n):
+        state, district = districts[rng.integers(len(districts))]
+        weather = {
+            'temperature': float(rng.choice([rng.uniform(0, 45), 10, 15, 20, 25, 30, 35])),
+            'humidity': float(rng.choice([rng.uniform(10, 100), 50, 60, 70, 80])),
+            'rainfall': float(rng.choice([rng.uniform(0, 3000), 200, 300, 500, 750, 2500])),
+            'wind_speed': 10
+        }
+        rows.append((SEASONS[rng.integers(len(SEASONS))], weather, state, district))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    args = parser.parse_args()
+
+    api.ensure_loaded()
+    rng = np.random.default_rng(0)
+    rows = random_rows(args.rows, rng)
+
+    mismatches = 0
+    for top_k in [1, 3, 5, 8]:
+        batch = api.get_seasonal_crop_recommendations_batch(rows, top_k)
+        for row, result in zip(rows, batch):
+            mismatches += result != legacy_recommendations(api, *row, top_k=top_k)
+    print(f"{len(rows)} rows x 4 top_k values: {mismatches} mismatches against the if/elif implementation")
+
+    # One row per call scores in plain Python instead of NumPy; check it too
+    mismatches = 0
+    for top_k in [1, 3, 5, 8]:
+        api._scoring_engine = None
+        for row in rows:
+            mismatches += api.get_seasonal_crop_recommendations(*row, top_k=top_k) != \
+                legacy_recommendations(api, *row, top_k=top_k)
+    print(f"{len(rows)} single-row calls x 4 top_k values: {mismatches} mismatches")
+
+    def legacy_loop():
+        for row in rows:
+            legacy_recommendations(api, *row, top_k=5)
+
+    def engine_batch(cold):
+        if cold:
+            api._scoring_engine = None
+        api.get_seasonal_crop_recommendations_batch(rows, top_k=5)
+
+    def engine_single():
+        api._scoring_engine = None
+        for row in rows:
+            api.get_seasonal_crop_recommendations(*row, top_k=5)
+
+    def engine_single_unmemoised():
+        engine = api._get_scoring_engine()
+        for row in rows:
+            engine._ranked.clear()
+            api.get_seasonal_crop_recommendations(*row, top_k=5)
+
+    legacy_time = best_of(legacy_loop)
+    # A fresh engine scores every distinct rule input once, in one pass per season
+    cold_batch_time = best_of(lambda: engine_batch(cold=True))
+    single_time = best_of(engine_single)
+    unmemoised_time = best_of(engine_single_unmemoised)
+    warm_batch_time = best_of(lambda: engine_batch(cold=False))
+
+    for label, elapsed in [('if/elif loop', legacy_time),
+                           ('engine, one batch (cold)', cold_batch_time),
+                           ('engine, one row per call (cold)', single_time),
+                           ('engine, one row per call, no memo', unmemoised_time),
+                           ('engine, one batch (warm)', warm_batch_time)]:
+        print(f"{label:<33}{elapsed * 1000:9.1f} ms  {len(rows) / elapsed:10,.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency of POST /predict under the Werkzeug dev server (as
+started by improved_seasonal_api.py's __main__) and under serve_production.py.
+
+Both servers use WEATHER_MODE=snapshot on a synthetic snapshot, so only the
+serving stack and scoring are measured. Every request opens a new
+connection, as pre-fork sync workers close after each response.
+
+Run from the SIH directory: python benchmark_serving.py [--workers 4] [--concurrency 16]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+import numpy as np
+
+from weather_snapshot import load_districts, synthetic_values, write_snapshot
+
+SEASONS = ['kharif', 'rabi_early', 'rabi_late', 'zaid', 'perennial']
+
+
+def wait_ready(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/seasons')
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def run_load(port, bodies, concurrency, duration):
+    """Closed-loop load for ``duration`` seconds; returns (latencies, errors, elapsed)"""
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    deadline = time.monotonic() + duration
+
+    def client(slot):
+        i = slot
+        while time.monotonic() < deadline:
+            body = bodies[i % len(bodies)]
+            i += concurrency
+            start = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                conn.request('POST', '/predict', body, {'Content-Type': 'application/json', 'Connection': 'close'})
+                response = conn.getresponse()
+                response.read()
+                conn.close()
+                if response.status != 200:
+                    errors[slot] += 1
+                    continue
+            except OSError:
+                errors[slot] += 1
+                continue
+            latencies[slot].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(slot,)) for slot in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.concatenate([np.array(l) for l in latencies]), sum(errors), time.perf_counter() - start
+
+
+def start_server(command, env):
+    return subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                            start_new_session=True)
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=40)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds of load per server')
+    parser.add_argument('--port', type=int, default=5071)
+    args = parser.parse_args()
+
+    districts = load_districts()
+    bodies = [json.dumps({'state': state, 'district': district, 'season': SEASONS[i % len(SEASONS)]})
+              for i, (state, district, _, _) in enumerate(districts)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = os.path.join(tmp, 'weather_snapshot.npy')
+        start_date = date(date.today().year, 1, 1)
+        write_snapshot(snapshot_path, districts, start_date, synthetic_values(districts, start_date, 366))
+        env = dict(os.environ, WEATHER_MODE='snapshot', WEATHER_SNAPSHOT_PATH=snapshot_path,
+                   PORT=str(args.port), PYTHONWARNINGS='ignore')
+
+        servers = [
+            ('dev server (debug=True)', [sys.executable, 'improved_seasonal_api.py']),
+            (f'serve_production x{args.workers}',
+             [sys.executable, 'serve_production.py', '--port', str(args.port),
+              '--workers', str(args.workers), '--reload-interval', '0'])
+        ]
+        print(f"{args.concurrency} concurrent clients, {args.duration:.0f}s per server, {os.cpu_count()} CPUs")
+        print(f"{'Server':<28}{'req/s':>9}{'p50 (ms)':>10}{'p99 (ms)':>10}{'errors':>8}")
+        for label, command in servers:
+            process = start_server(command, env)
+            try:
+                if not wait_ready(args.port):
+                    print(f"{label:<28} did not start")
+                    continue
+                run_load(args.port, bodies, args.concurrency, 1.0)  # warm up
+                latencies, errors, elapsed = run_load(args.port, bodies, args.concurrency, args.duration)
+            finally:
+                stop_server(process)
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1000 if len(latencies) else (float('nan'),) * 2
+            print(f"{label:<28}{len(latencies) / elapsed:>9.0f}{p50:>10.1f}{p99:>10.1f}{errors:>8}")
+
+
+if __name__ == '__main__':
+    main()
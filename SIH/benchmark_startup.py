@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Measure API cold start in each startup mode: time to import the module
+(when a worker could bind its port), time until the first data request is
+answered with artifacts loaded, and the per-component timings reported by
+/health. Each mode runs in a fresh
+subprocess with weather pointed at an unreachable host.
+
+Run from the SIH directory: python benchmark_startup.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+PROBE = r'''
+import json, time
+start = time.perf_counter()
+import improved_seasonal_api as seasonal_api
+imported = time.perf_counter() - start
+client = seasonal_api.app.test_client()
+# Any data endpoint triggers the load in lazy mode and waits for it otherwise
+client.get('/seasons')
+ready = time.perf_counter() - start
+timings = client.get('/health').get_json()['startup_timings']
+print(json.dumps({'import_s': imported, 'ready_s': ready, 'timings': timings}))
+'''
+
+
+def main():
+    for mode in ['eager', 'lazy', 'background']:
+        env = dict(os.environ, API_STARTUP_MODE=mode, OPEN_METEO_URL='http://127.0.0.1:9/forecast')
+        output = subprocess.run([sys.executable, '-c', PROBE], env=env,
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        components = ', '.join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in result['timings'].items())
+        print(f"{mode:<11} import {result['import_s'] * 1000:7.0f} ms | ready {result['ready_s'] * 1000:7.0f} ms")
+        print(f"{'':<11} {components}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Exercise WeatherService and its grid-cell cache against a local stub
+Open-Meteo server. Simulates a burst of farmers from the same districts and
+reports upstream calls, cache counters and latency.
+
+Run from the SIH directory: python benchmark_weather_cache.py
+"""
+
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubOpenMeteoHandler(BaseHTTPRequestHandler):
+    """Answers every forecast request with fixed weather after a delay"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    delay = 0.2
+    fail = False
+    calls = 0
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StubOpenMeteoHandler.lock:
+            StubOpenMeteoHandler.connections += 1
+
+    def do_GET(self):
+        with StubOpenMeteoHandler.lock:
+            StubOpenMeteoHandler.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = json.dumps({
+            'current': {
+                'temperature_2m': 29.4,
+                'relative_humidity_2m': 78,
+                'precipitation': 1.2,
+                'wind_speed_10m': 7.3
+            },
+            'daily': {'precipitation_sum': [4.0, 0.0, 12.5, 3.1, 0.0, 0.0, 8.2]}
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubOpenMeteoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    server = start_stub_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/forecast"
+
+    from improved_seasonal_api import WeatherService
+    from weather_cache import WeatherCache
+    from weather_client import PooledWeatherClient
+
+    WeatherService.client = PooledWeatherClient(url)
+    WeatherService.cache = WeatherCache(ttl=1.0, stale_ttl=30, max_entries=64)
+
+    # 20 districts, 400 requests, jittered inside each district
+    random.seed(0)
+    districts = [(random.uniform(10, 30), random.uniform(70, 90)) for _ in range(20)]
+    coords = []
+    for _ in range(400):
+        lat, lon = random.choice(districts)
+        coords.append((lat + random.uniform(-0.02, 0.02), lon + random.uniform(-0.02, 0.02)))
+
+    def timed(coord):
+        start = time.perf_counter()
+        WeatherService.get_current_weather(*coord)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        cold = sorted(pool.map(timed, coords))
+    print(f"Cold burst: {len(coords)} requests, {StubOpenMeteoHandler.calls} upstream calls")
+    print(f"  p50 {cold[len(cold) // 2] * 1000:.1f} ms, max {cold[-1] * 1000:.1f} ms")
+
+    time.sleep(1.2)  # let every entry go stale
+    calls_before = StubOpenMeteoHandler.calls
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        stale = sorted(pool.map(timed, coords))
+    time.sleep(StubOpenMeteoHandler.delay * 5)
+    print(f"Stale burst: p50 {stale[len(stale) // 2] * 1000:.2f} ms, max {stale[-1] * 1000:.2f} ms, "
+          f"{StubOpenMeteoHandler.calls - calls_before} background refreshes")
+
+    print(f"Cache stats: {WeatherService.cache.stats()}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Exercise the pooled weather client, thread-pool fan-out and circuit breaker
+against the local stub Open-Meteo server from benchmark_weather_cache.
+
+Run from the SIH directory: python benchmark_weather_client.py
+"""
+
+import logging
+import time
+
+import requests
+
+from benchmark_weather_cache import StubOpenMeteoHandler, start_stub_server
+from weather_cache import WeatherCache
+from weather_client import CircuitBreaker, PooledWeatherClient, fan_out
+
+logging.getLogger('improved_seasonal_api').setLevel(logging.CRITICAL)
+
+
+def main():
+    server = start_stub_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/forecast"
+    params = {'latitude': 21.2, 'longitude': 81.3}
+    StubOpenMeteoHandler.delay = 0.0
+
+    # Connection reuse: fresh connection per call vs keep-alive session
+    n = 200
+    before = StubOpenMeteoHandler.connections
+    start = time.perf_counter()
+    for _ in range(n):
+        requests.get(url, params=params, timeout=10).json()
+    unpooled = (time.perf_counter() - start) / n
+    unpooled_connections = StubOpenMeteoHandler.connections - before
+
+    client = PooledWeatherClient(url)
+    before = StubOpenMeteoHandler.connections
+    start = time.perf_counter()
+    for _ in range(n):
+        client.get_json(params)
+    pooled = (time.perf_counter() - start) / n
+    pooled_connections = StubOpenMeteoHandler.connections - before
+    print(f"Unpooled requests.get: {unpooled * 1000:6.2f} ms/call, {unpooled_connections} connections")
+    print(f"Pooled session:        {pooled * 1000:6.2f} ms/call, {pooled_connections} connections")
+
+    from improved_seasonal_api import WeatherService
+
+    # Fan-out over distinct cells with a slow upstream
+    StubOpenMeteoHandler.delay = 0.1
+    WeatherService.client = client
+    coords = [(10 + i * 0.5, 75 + i * 0.5) for i in range(48)]
+    WeatherService.cache = WeatherCache()
+    start = time.perf_counter()
+    for lat, lon in coords:
+        WeatherService.get_current_weather(lat, lon)
+    sequential = time.perf_counter() - start
+
+    WeatherService.cache = WeatherCache()
+    start = time.perf_counter()
+    fan_out(WeatherService.get_current_weather, coords, concurrency=16)
+    concurrent = time.perf_counter() - start
+    print(f"{len(coords)} cells sequential: {sequential:.2f} s, fan-out (16): {concurrent:.2f} s")
+
+    # Circuit breaker: failing upstream stops costing a round trip per request
+    StubOpenMeteoHandler.fail = True
+    WeatherService.client = PooledWeatherClient(url, breaker=CircuitBreaker(failure_threshold=3, reset_timeout=60))
+    WeatherService.cache = WeatherCache()
+    calls_before = StubOpenMeteoHandler.calls
+    start = time.perf_counter()
+    for i in range(50):
+        WeatherService.get_current_weather(30 + i, 80)
+    elapsed = time.perf_counter() - start
+    print(f"50 lookups with failing upstream: {elapsed:.2f} s, "
+          f"{StubOpenMeteoHandler.calls - calls_before} upstream calls, "
+          f"breaker {WeatherService.client.breaker.stats()}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Time offline batch scoring with WEATHER_MODE=snapshot against live mode
+with an unreachable weather endpoint, and the cost of a single snapshot
+lookup. Builds a synthetic snapshot in a temp directory first.
+
+Run from the SIH directory: python benchmark_weather_snapshot.py
+"""
+
+import logging
+import os
+import tempfile
+import time
+from datetime import date
+
+os.environ.setdefault('API_STARTUP_MODE', 'lazy')
+# Nothing listens here: live mode pays for failed connections, then the breaker
+os.environ.setdefault('OPEN_METEO_URL', 'http://127.0.0.1:9/forecast')
+logging.disable(logging.CRITICAL)
+
+from improved_seasonal_api import WeatherService, api  # noqa: E402
+from weather_snapshot import WeatherSnapshot, load_districts, synthetic_values, write_snapshot  # noqa: E402
+
+
+def score_all(items, top_k=5, batch_size=250):
+    start = time.perf_counter()
+    for offset in range(0, len(items), batch_size):
+        api.predict_crops_batch(items[offset:offset + batch_size], top_k)
+    return time.perf_counter() - start
+
+
+def main():
+    api.ensure_loaded()
+    items = [(state, district, season)
+             for state, district in sorted(api.district_index)
+             for season in api.seasonal_crop_knowledge]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'weather_snapshot.npy')
+        districts = load_districts()
+        start = time.perf_counter()
+        write_snapshot(path, districts, date(date.today().year, 1, 1),
+                       synthetic_values(districts, date(date.today().year, 1, 1), 366))
+        build_time = time.perf_counter() - start
+        print(f"Synthetic snapshot: {len(districts)} districts x 366 days, "
+              f"{os.path.getsize(path) / 1e6:.1f} MB, built in {build_time * 1000:.0f} ms")
+
+        snapshot = WeatherSnapshot.load(path)
+        coords = [(lat, lon) for _, _, lat, lon in districts]
+        today = date.today()
+        start = time.perf_counter()
+        for _ in range(20):
+            for lat, lon in coords:
+                snapshot.lookup(lat, lon, today)
+        lookup_time = (time.perf_counter() - start) / (20 * len(coords))
+        print(f"Snapshot lookup: {lookup_time * 1e6:.1f} us")
+
+        WeatherService.mode = 'live'
+        live_time = score_all(items)
+        WeatherService.mode = 'snapshot'
+        WeatherService.snapshot_path = path
+        WeatherService._snapshot = None
+        snapshot_time = score_all(items)
+        fallbacks = sum(1 for weather in WeatherService.get_weather_many(coords) if weather.get('source') != 'snapshot')
+        print(f"{len(items)} district-seasons: live (offline) {live_time:.2f} s, "
+              f"snapshot {snapshot_time:.2f} s, snapshot misses: {fallbacks}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compare cold-start time and resident memory of loading crop yield features
+from crop_yield_features.json versus the columnar store, and check that both
+give the same state_crop_performance lookups. Each loader runs in a fresh
+subprocess so imports and page cache effects are measured separately.
+
+Run from the SIH directory: python benchmark_yield_features.py
+"""
+
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+
+from yield_feature_store import YieldFeatureStore, rows_from_features, write_store
+
+JSON_PATH = '../trained_models/crop_yield_features.json'
+
+PROBE = r'''
+import json, os, sys, time
+
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+
+import numpy
+from yield_feature_store import YieldFeatureStore
+baseline = rss_mb()
+start = time.perf_counter()
+if sys.argv[1] == 'json':
+    with open(sys.argv[2]) as f:
+        features = json.load(f)
+else:
+    features = YieldFeatureStore.load(sys.argv[2])
+loaded = time.perf_counter() - start
+performance = features.get('state_crop_performance', {})
+for state in list(performance)[:10]:
+    crops = performance.get(state, {})
+    for crop in list(crops)[:5]:
+        crops[crop].get('yield_efficiency', 0.0)
+first_use = time.perf_counter() - start
+print(json.dumps({'load_s': loaded, 'first_use_s': first_use, 'rss_mb': rss_mb() - baseline}))
+'''
+
+
+def run_probe(kind, path):
+    output = subprocess.run([sys.executable, '-c', PROBE, kind, path],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def check_equivalent(features, store):
+    """Every state/crop stat must match the JSON exactly"""
+    json_perf = features['state_crop_performance']
+    store_perf = store['state_crop_performance']
+    assert set(json_perf) == set(store_perf)
+    for state, crops in json_perf.items():
+        assert set(crops) == set(store_perf[state])
+        for crop, stats in crops.items():
+            for field, value in stats.items():
+                other = store_perf[state][crop][field]
+                assert (math.isnan(value) and math.isnan(other)) or value == other, (state, crop, field)
+
+
+def main():
+    with open(JSON_PATH) as f:
+        features = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_dir = os.path.join(tmp, 'crop_yield_features')
+        write_store(*rows_from_features(features), store_dir)
+        check_equivalent(features, YieldFeatureStore.load(store_dir))
+        print("state_crop_performance lookups match the JSON")
+
+        store_bytes = sum(os.path.getsize(os.path.join(store_dir, name)) for name in os.listdir(store_dir))
+        print(f"{'Format':<10}{'Size (KB)':>10}{'Load (ms)':>12}{'First use (ms)':>16}{'RSS (MB)':>10}")
+        for kind, path, size in [('json', JSON_PATH, os.path.getsize(JSON_PATH)),
+                                 ('columnar', store_dir, store_bytes)]:
+            result = run_probe(kind, path)
+            print(f"{kind:<10}{size / 1024:>10.0f}{result['load_s'] * 1000:>12.2f}"
+                  f"{result['first_use_s'] * 1000:>16.2f}{result['rss_mb']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark the district yield enrichment against synthetic 1x/10x/100x copies
+of crop_yield.csv and district_meta.csv. Compares the previous iterrows/.at
+implementation with the pivot-and-merge version in CropYieldDataProcessor
+and checks that the seven legacy columns match.
+
+Run from the SIH directory: python benchmark_yield_processing.py [--scales 1 10 100]
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from process_crop_yield_data import CropYieldDataProcessor, MAJOR_CROPS, yield_efficiency_column
+
+logging.getLogger('process_crop_yield_data').setLevel(logging.WARNING)
+
+
+def write_synthetic_yield(path, scale):
+    """Replicate crop_yield.csv ``scale`` times with jittered yields"""
+    df = pd.read_csv('crop_yield.csv')
+    if scale > 1:
+        rng = np.random.default_rng(0)
+        df = pd.concat([df] * scale, ignore_index=True)
+        df['Yield'] = df['Yield'] * rng.uniform(0.9, 1.1, len(df))
+        df['Area'] = df['Area'] * rng.uniform(0.9, 1.1, len(df))
+    df.to_csv(path, index=False)
+    return len(df)
+
+
+def legacy_enhance(processor, df_district, state_crop_stats):
+    """The previous implementation: iterrows into a dict, then .at writes per district"""
+    state_yield_dict = {}
+    for _, row in state_crop_stats.iterrows():
+        state_yield_dict.setdefault(row['State'], {})[row['Crop']] = {
+            'avg_yield': row['avg_yield'],
+            'yield_efficiency': row['yield_efficiency'],
+            'yield_std': row['yield_std']
+        }
+    for crop in MAJOR_CROPS:
+        df_district[yield_efficiency_column(crop)] = 0.0
+    for idx, row in df_district.iterrows():
+        crop_data = state_yield_dict.get(row['state'])
+        if crop_data:
+            for crop in MAJOR_CROPS:
+                df_district.at[idx, yield_efficiency_column(crop)] = \
+                    crop_data.get(crop, {}).get('yield_efficiency', 0.0)
+    return df_district
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    args = parser.parse_args()
+
+    processor = CropYieldDataProcessor()
+    df_meta = pd.read_csv('district_meta.csv')
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            yield_path = os.path.join(tmp, f'crop_yield_{scale}x.csv')
+            rows = write_synthetic_yield(yield_path, scale)
+            df_district = pd.concat([df_meta] * scale, ignore_index=True)
+
+            start = time.perf_counter()
+            df_yield = processor.load_crop_yield_data(yield_path)
+            state_crop_stats, _ = processor.process_yield_data(df_yield)
+            shared_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            legacy = legacy_enhance(processor, df_district.copy(), state_crop_stats)
+            legacy_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            enhanced = processor.add_yield_columns(df_district.copy(), state_crop_stats)
+            new_time = time.perf_counter() - start
+
+            columns = [yield_efficiency_column(crop) for crop in MAJOR_CROPS]
+            match = np.allclose(enhanced[columns].values, legacy[columns].values)
+            crop_columns = sum(c.endswith('_yield_efficiency') for c in enhanced.columns)
+            print(f"{scale:>4}x ({rows:>9,} yield rows, {len(df_district):>6,} districts): "
+                  f"load+groupby {shared_time:6.2f} s | enrichment legacy {legacy_time:7.3f} s, "
+                  f"pivot+merge {new_time:6.3f} s ({legacy_time / new_time:6.1f}x), "
+                  f"{crop_columns} crop columns, legacy columns match: {match}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Build the memory-mapped recommendation table served by /predict in
+mode=precomputed from the offline seasonal recommendations JSON.
+
+Run from the SIH directory: python build_precomputed_table.py
+"""
+
+import argparse
+import json
+import logging
+import os
+
+from precomputed_store import build_table
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Encode seasonal_recommendations.json into the binary table"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--input', default='../outputs/seasonal_recommendations.json')
+    parser.add_argument('--output-dir', default='../trained_models/precomputed')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        logger.error(f"Recommendations file not found at {args.input}")
+        return
+
+    with open(args.input, 'r') as f:
+        recommendations = json.load(f)
+
+    version = build_table(recommendations, args.output_dir)
+    logger.info(f"Precomputed table version {version} written to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache for the trainer's final feature matrix.
+
+An entry holds X (float64, with each column's original dtype recorded), y
+(labels), the feature names, the crop classes and the fitted categorical
+LabelEncoders, under a directory named by a SHA-256 of the
+input files' contents, the sampling seed and FEATURE_CACHE_VERSION. Training,
+tuning and evaluation runs with unchanged inputs load the arrays instead of
+re-engineering features. Bump FEATURE_CACHE_VERSION whenever the feature
+pipeline changes so stale entries are no longer addressed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FEATURE_CACHE_VERSION = 2
+DEFAULT_CACHE_DIR = '../trained_models/cache/features'
+
+
+def file_sha256(path):
+    """Hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def feature_cache_key(input_paths, seed):
+    """Cache key for a set of input files and a sampling seed.
+
+    Files are identified by content, not path or mtime; a missing input
+    hashes as 'missing' since the pipeline runs without some of them.
+    """
+    inputs = {
+        os.path.basename(path): file_sha256(path) if os.path.exists(path) else 'missing'
+        for path in input_paths
+    }
+    payload = json.dumps({'version': FEATURE_CACHE_VERSION, 'seed': seed, 'inputs': inputs},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest(), inputs
+
+
+class FeatureMatrixCache:
+    """Directory of feature matrix entries, one subdirectory per key"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+
+    def path(self, key):
+        return os.path.join(self.directory, key)
+
+    def load(self, key):
+        """(X, y, feature_names, label_encoders, info) for a key, or None on a miss.
+
+        ``info`` is the entry's JSON record, including crop_classes and dtypes.
+        """
+        entry = self.path(key)
+        if not os.path.exists(os.path.join(entry, 'entry.json')):
+            return None
+        # Deferred: the API imports this module (via model_registry) for file_sha256 only
+        import joblib
+        try:
+            with open(os.path.join(entry, 'entry.json'), 'r') as f:
+                info = json.load(f)
+            X = np.load(os.path.join(entry, 'X.npy'))
+            y = np.load(os.path.join(entry, 'y.npy'))
+            label_encoders = joblib.load(os.path.join(entry, 'label_encoders.joblib'))
+        except Exception as e:
+            logger.error(f"Error reading feature cache entry {key}: {e}")
+            return None
+        return X, y, info['feature_names'], label_encoders, info
+
+    def save(self, key, X, y, feature_names, label_encoders, info=None):
+        """Write an entry atomically: built in a temp dir, then renamed into place"""
+        import joblib
+        os.makedirs(self.directory, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f'.{key[:12]}.', dir=self.directory)
+        try:
+            np.save(os.path.join(staging, 'X.npy'), np.asarray(X, dtype=float))
+            np.save(os.path.join(staging, 'y.npy'), np.asarray(y, dtype=str))
+            joblib.dump(label_encoders, os.path.join(staging, 'label_encoders.joblib'))
+            entry = dict(info or {})
+            entry.update({
+                'key': key,
+                'feature_names': list(feature_names),
+                'rows': int(len(y)),
+                'version': FEATURE_CACHE_VERSION,
+                'created': datetime.now().isoformat()
+            })
+            # entry.json last: load() treats its presence as a complete entry
+            with open(os.path.join(staging, 'entry.json'), 'w') as f:
+                json.dump(entry, f, indent=2)
+            os.replace(staging, self.path(key))
+        except OSError as e:
+            # Another run stored the same key first; its entry is equivalent
+            shutil.rmtree(staging, ignore_errors=True)
+            if not os.path.exists(self.path(key)):
+                logger.error(f"Error writing feature cache entry {key}: {e}")
+        except Exception as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            logger.error(f"Error writing feature cache entry {key}: {e}")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Compiled inference for the crop RandomForestClassifier.
+
+flatten_forest() packs every tree of a fitted forest into contiguous NumPy
+node arrays (feature, threshold, left/right children, per-node class
+distribution). CompiledForest walks all trees for a whole batch at once
+with vectorised NumPy indexing, so a single-row prediction skips sklearn's
+input validation and joblib thread dispatch entirely.
+
+Leaves point to themselves and split on feature 0 with an infinite
+threshold, so every row can be advanced ``max_depth`` times without
+masking. Inputs are cast to float32 and sent left when ``x <= threshold``
+exactly as sklearn does, so rows reach the same leaves as ``model.apply``.
+
+Probabilities are the mean of per-tree normalised leaf distributions, which
+is what predict_proba returns when the model was pickled by the installed
+sklearn. Pickles from sklearn < 1.4 (the shipped model) store raw leaf
+counts that sklearn >= 1.4 averages without normalising, so its rows sum to
+the mean leaf size rather than 1; ModelBundle.check_forest detects that case
+and records it. The gain is largest for single rows (no input validation or
+joblib dispatch) and shrinks with batch size, to under 2x at 1024 rows.
+
+Run from the SIH directory to export the currently trained model:
+    python forest_engine.py
+"""
+
+import argparse
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+
+def flatten_forest(model):
+    """Pack a fitted RandomForestClassifier into a dict of flat node arrays"""
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    n_nodes = sum(tree.node_count for tree in trees)
+    n_classes = len(model.classes_)
+
+    feature = np.zeros(n_nodes, dtype=np.int32)
+    threshold = np.full(n_nodes, np.inf, dtype=np.float64)
+    left = np.empty(n_nodes, dtype=np.int32)
+    right = np.empty(n_nodes, dtype=np.int32)
+    value = np.empty((n_nodes, n_classes), dtype=np.float64)
+    roots = np.empty(len(trees), dtype=np.int32)
+
+    offset = 0
+    for i, tree in enumerate(trees):
+        count = tree.node_count
+        nodes = slice(offset, offset + count)
+        own = np.arange(offset, offset + count, dtype=np.int32)
+        is_leaf = tree.children_left == -1
+
+        feature[nodes] = np.where(is_leaf, 0, tree.feature)
+        threshold[nodes] = np.where(is_leaf, np.inf, tree.threshold)
+        left[nodes] = np.where(is_leaf, own, tree.children_left + offset)
+        right[nodes] = np.where(is_leaf, own, tree.children_right + offset)
+
+        # Same normalisation as DecisionTreeClassifier.predict_proba
+        distribution = tree.value[:, 0, :]
+        normalizer = distribution.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        value[nodes] = distribution / normalizer
+
+        roots[i] = offset
+        offset += count
+
+    return {
+        'format_version': np.int32(FORMAT_VERSION),
+        'feature': feature,
+        'threshold': threshold,
+        'left': left,
+        'right': right,
+        'value': value,
+        'roots': roots,
+        'max_depth': np.int32(max(tree.max_depth for tree in trees)),
+        'n_features': np.int32(model.n_features_in_),
+        'classes': np.asarray(model.classes_).astype(str)
+    }
+
+
+def tree_normalised_proba(model, X):
+    """Mean of per-tree normalised leaf distributions, computed with sklearn's own trees"""
+    X = np.asarray(X, dtype=np.float32)
+    total = np.zeros((len(X), len(model.classes_)))
+    for estimator in model.estimators_:
+        distribution = estimator.tree_.value[estimator.apply(X), 0, :]
+        normalizer = distribution.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        total += distribution / normalizer
+    return total / len(model.estimators_)
+
+
+class CompiledForest:
+    """NumPy-only predict_proba over flattened forest arrays"""
+
+    # Upper bound on rows x nodes decisions materialised at once
+    MAX_DECISIONS = 1 << 22
+
+    def __init__(self, arrays):
+        self.feature = arrays['feature'].astype(np.intp)
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.value = arrays['value']
+        self.roots = arrays['roots'].astype(np.intp)
+        self.max_depth = int(arrays['max_depth'])
+        self.n_features = int(arrays['n_features'])
+        self.classes_ = np.asarray(arrays['classes'])
+        self.n_estimators = len(self.roots)
+        self.n_nodes = len(self.feature)
+        # children[2 * node + goes_right] is the next node
+        self._children = np.stack([self.left, self.right], axis=1).ravel().astype(np.intp)
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(flatten_forest(model))
+
+    @classmethod
+    def load(cls, path):
+        """Load an exported forest, or return None if it is missing or stale"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+        if int(arrays.get('format_version', -1)) != FORMAT_VERSION:
+            logger.warning(f"Unsupported compiled forest version in {path}")
+            return None
+        return cls(arrays)
+
+    def apply(self, X):
+        """Return the (n_rows, n_estimators) global leaf index reached by each row"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+        chunk = max(1, self.MAX_DECISIONS // self.n_nodes)
+        if len(X) <= chunk:
+            return self._apply_chunk(X)
+        return np.vstack([self._apply_chunk(X[start:start + chunk]) for start in range(0, len(X), chunk)])
+
+    def _apply_chunk(self, X):
+        # Evaluate every split for every row up front, then walk the trees
+        # with two gathers per level: the decision and the child index
+        goes_right = (X[:, self.feature] > self.threshold).ravel()
+        row_offset = (np.arange(len(X), dtype=np.intp) * self.n_nodes)[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_estimators))
+        for _ in range(self.max_depth):
+            nodes = self._children[2 * nodes + goes_right[row_offset + nodes]]
+        return nodes
+
+    def predict_proba(self, X):
+        """Mean class distribution of the reached leaves, columns in classes_ order"""
+        leaves = self.apply(X)
+        # Trees on the leading axis so the sum runs in tree order over contiguous rows
+        return self.value[leaves.T].sum(axis=0) / self.n_estimators
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def save_forest(arrays, path):
+    """Write flattened forest arrays to ``path`` (an .npz file) atomically"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+    logger.info(f"Compiled forest written to {path}: {len(arrays['roots'])} trees, "
+                f"{len(arrays['feature'])} nodes")
+
+
+def export_forest(model, path):
+    """Flatten ``model`` and save it next to the joblib artifact"""
+    save_forest(flatten_forest(model), path)
+
+
+def main():
+    """Export the trained joblib model to the compiled forest format"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Export the trained RandomForest to flat NumPy arrays')
+    parser.add_argument('--model', default='../trained_models/combined_rf_crop_recommender.joblib')
+    parser.add_argument('--output', default='../trained_models/combined_rf_compiled.npz')
+    args = parser.parse_args()
+
+    import joblib
+    model_data = joblib.load(args.model)
+    model = model_data.get('model') if isinstance(model_data, dict) else model_data
+    export_forest(model, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Regenerate the outputs/ recommendation files for every (state, district,
+season) from ImprovedSeasonalCropRecommendationAPI.
+
+The model and district data are loaded once in the parent. Workers are then
+forked, so they share those pages copy-on-write. Work is split into shards
+of (state, district, season) items. Each worker scores its shard in batches
+through predict_crops_batch, so weather is fetched once per cell and there is
+one predict_proba call per batch. It streams one JSON line per item to
+parts/shard-NNNNN.jsonl.tmp and renames the file when the shard is complete.
+A rerun with the same settings (including the model version, blend weight
+and weather source) skips finished shards, so a crashed run resumes where
+it stopped. Finished parts are assembled into
+seasonal_recommendations.json, district_recommendations.json and
+seasonal_summary.json.
+
+Run from the SIH directory: python generate_bulk_recommendations.py [--workers 4]
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import time
+from collections import defaultdict
+from datetime import datetime
+
+os.environ.setdefault('API_STARTUP_MODE', 'lazy')
+
+from improved_seasonal_api import WeatherService, api, get_current_season  # noqa: E402
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Settings for forked workers, filled in by main() before the pool starts
+_job = {}
+
+
+def work_items(seasons):
+    """Every (state, district, season) in a stable order"""
+    return [(state, district, season)
+            for state, district in sorted(api.district_index)
+            for season in seasons]
+
+
+def shard_path(parts_dir, shard_id):
+    return os.path.join(parts_dir, f'shard-{shard_id:05d}.jsonl')
+
+
+def _run_shard(shard):
+    """Score one shard in a worker and write its JSONL part"""
+    shard_id, items = shard
+    start = time.perf_counter()
+    path = shard_path(_job['parts_dir'], shard_id)
+    with open(path + '.tmp', 'w') as f:
+        for offset in range(0, len(items), _job['batch_size']):
+            batch = items[offset:offset + _job['batch_size']]
+            results = api.predict_crops_batch(batch, _job['top_k'])
+            for (state, district, season), (predictions, weather_data) in zip(batch, results):
+                f.write(json.dumps({
+                    'state': state,
+                    'district': district,
+                    'season': season,
+                    'predictions': predictions,
+                    'weather_data': weather_data
+                }) + '\n')
+    os.replace(path + '.tmp', path)
+    return shard_id, os.getpid(), len(items), time.perf_counter() - start
+
+
+def prepare_parts_dir(parts_dir, manifest, fresh):
+    """Create or validate the parts directory; returns the finished shard ids"""
+    manifest_path = os.path.join(parts_dir, 'manifest.json')
+    if fresh and os.path.exists(parts_dir):
+        shutil.rmtree(parts_dir)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            previous = json.load(f)
+        if previous != manifest:
+            raise ValueError(f"{parts_dir} holds a run with different settings; use --fresh to discard it")
+    else:
+        os.makedirs(parts_dir, exist_ok=True)
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+    return {shard_id for shard_id in range(manifest['shards'])
+            if os.path.exists(shard_path(parts_dir, shard_id))}
+
+
+def assemble_outputs(parts_dir, shards, output_dir, seasons, top_k, district_season):
+    """Merge the JSONL parts into the nested JSON files under output_dir"""
+    seasonal = defaultdict(lambda: defaultdict(dict))
+    total = 0
+    for shard_id in range(shards):
+        with open(shard_path(parts_dir, shard_id), 'r') as f:
+            for line in f:
+                record = json.loads(line)
+                for prediction in record['predictions']:
+                    # Same shape precomputed_store.build_table reads
+                    prediction.setdefault('explanation', prediction.get('suitability_reason', '').split('; '))
+                seasonal[record['state']][record['district']][record['season']] = record['predictions']
+                total += len(record['predictions'])
+
+    district = {
+        state: {name: by_season[district_season] for name, by_season in districts.items()}
+        for state, districts in seasonal.items()
+    }
+    summary = {
+        'generated_at': datetime.now().isoformat(),
+        'total_states': len(seasonal),
+        'total_districts': sum(len(districts) for districts in seasonal.values()),
+        'total_predictions': total,
+        'seasons_covered': seasons,
+        'crops_per_season': top_k
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    for name, data in [('seasonal_recommendations.json', seasonal),
+                       ('district_recommendations.json', district),
+                       ('seasonal_summary.json', summary)]:
+        path = os.path.join(output_dir, name)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(path + '.tmp', path)
+    logger.info(f"Wrote {total} predictions for {summary['total_districts']} districts to {output_dir}")
+
+
+def main():
+    """Generate recommendations for every district and season"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output-dir', default='../outputs')
+    parser.add_argument('--parts-dir', default=None, help='JSONL parts (default: <output-dir>/parts)')
+    parser.add_argument('--seasons', nargs='+', default=None, help='Seasons to cover (default: all known)')
+    parser.add_argument('--district-season', default=None,
+                        help='Season used for district_recommendations.json (default: current season)')
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--shard-size', type=int, default=250, help='Items per shard')
+    parser.add_argument('--batch-size', type=int, default=250, help='Items per predict_crops_batch call')
+    parser.add_argument('--weather', choices=['live', 'snapshot'], default=None,
+                        help='Weather source (default: WEATHER_MODE); snapshot runs fully offline')
+    parser.add_argument('--fresh', action='store_true', help='Discard finished parts instead of resuming')
+    parser.add_argument('--no-assemble', action='store_true', help='Only write the JSONL parts')
+    args = parser.parse_args()
+
+    if args.weather:
+        WeatherService.mode = args.weather
+    api.ensure_loaded()
+    if api.load_error:
+        logger.error(f"API artifacts failed to load: {api.load_error}")
+        return
+    if WeatherService.mode == 'snapshot':
+        # Map the snapshot before forking so workers share it too
+        WeatherService.get_snapshot()
+    seasons = args.seasons or list(api.seasonal_crop_knowledge)
+    district_season = args.district_season or get_current_season()
+    if district_season not in seasons:
+        district_season = seasons[0]
+    parts_dir = args.parts_dir or os.path.join(args.output_dir, 'parts')
+
+    items = work_items(seasons)
+    shards = [(shard_id, items[offset:offset + args.shard_size])
+              for shard_id, offset in enumerate(range(0, len(items), args.shard_size))]
+    manifest = {
+        'items': len(items),
+        'items_sha256': hashlib.sha256(json.dumps(items).encode()).hexdigest(),
+        'seasons': seasons,
+        'top_k': args.top_k,
+        'shard_size': args.shard_size,
+        'shards': len(shards),
+        # Parts scored by another model or other weather must not be mixed in
+        'model_version': api._active_version(),
+        'model_blend_weight': api.model_blend_weight,
+        'weather_mode': WeatherService.mode,
+        'weather_snapshot': (
+            {'path': os.path.abspath(WeatherService.snapshot_path),
+             'date': WeatherService.snapshot_day().isoformat()}
+            if WeatherService.mode == 'snapshot' else None
+        )
+    }
+    try:
+        finished = prepare_parts_dir(parts_dir, manifest, args.fresh)
+    except ValueError as e:
+        logger.error(str(e))
+        return
+    pending = [shard for shard in shards if shard[0] not in finished]
+    logger.info(f"{len(items)} items in {len(shards)} shards; {len(finished)} already done, "
+                f"{len(pending)} to run on {args.workers} workers")
+
+    _job.update({'parts_dir': parts_dir, 'top_k': args.top_k, 'batch_size': args.batch_size})
+    start = time.perf_counter()
+    per_worker = defaultdict(lambda: {'shards': 0, 'items': 0, 'seconds': 0.0})
+    if pending:
+        # Keep the loaded artifacts out of the collector so forked pages stay shared
+        gc.freeze()
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        with context.Pool(processes=min(args.workers, len(pending))) as pool:
+            for shard_id, pid, count, seconds in pool.imap_unordered(_run_shard, pending):
+                stats = per_worker[pid]
+                stats['shards'] += 1
+                stats['items'] += count
+                stats['seconds'] += seconds
+                logger.info(f"Shard {shard_id} done by worker {pid}: {count} items in {seconds:.2f}s")
+        gc.unfreeze()
+    elapsed = time.perf_counter() - start
+
+    for pid, stats in sorted(per_worker.items()):
+        logger.info(f"Worker {pid}: {stats['shards']} shards, {stats['items']} items, "
+                    f"{stats['items'] / max(stats['seconds'], 1e-9):.0f} items/s while busy")
+    done = sum(stats['items'] for stats in per_worker.values())
+    if done:
+        logger.info(f"Generated {done} items in {elapsed:.2f}s ({done / elapsed:.0f} items/s overall)")
+
+    if not args.no_assemble:
+        assemble_outputs(parts_dir, len(shards), args.output_dir, seasons, args.top_k, district_season)
+
+
+if __name__ == '__main__':
+    main()
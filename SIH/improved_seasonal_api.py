@@ -4,18 +4,37 @@ Enhanced Seasonal Crop Recommendation API with improved seasonal logic
 and better crop recommendations based on agricultural knowledge.
 """
 
+import time
+
+_IMPORT_START = time.perf_counter()
+
 import logging
-import pandas as pd
+import threading
 import numpy as np
-import requests
-import joblib
 from datetime import datetime
-import pytz
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import os
 import warnings
 
+from feature_cache import file_sha256
+from native_crops import (HISTORICAL_WEIGHT, SEASONAL_WEIGHT, YIELD_WEIGHT, NativeCropCache,
+                          precompute_native_crops, rank_native_scores)
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, STAGE_BUCKETS
+from model_registry import DEFAULT_REGISTRY_DIR, ModelBundle, ModelLoader, ModelRegistry
+from precomputed_store import PrecomputedRecommendations
+from ranking import top_k_indices
+from response_cache import ResponseCache
+from scoring_engine import SeasonalScoringEngine
+from weather_cache import WeatherCache
+from weather_client import CircuitBreaker, PooledWeatherClient, fan_out
+from weather_snapshot import DEFAULT_SNAPSHOT_PATH, WeatherSnapshot
+from yield_feature_store import load_yield_features
+
+# pandas, joblib/sklearn, requests and pytz are imported on first use so the
+# module imports quickly and workers can bind their port before loading artifacts
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_START
+
 # Suppress warnings
 warnings.filterwarnings('ignore')
 
@@ -26,10 +45,35 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
+# Per-stage latency and fallback counters, exposed on /metrics
+STAGE_SECONDS = REGISTRY.histogram(
+    'farmgaze_stage_duration_seconds', 'Time spent in each prediction stage', 'stage', STAGE_BUCKETS)
+REQUEST_SECONDS = REGISTRY.histogram(
+    'farmgaze_request_duration_seconds', 'End-to-end handler time per endpoint', 'endpoint', STAGE_BUCKETS)
+WEATHER_FALLBACKS = REGISTRY.counter(
+    'farmgaze_weather_fallbacks_total', 'Requests served with default weather because the fetch failed')
+MODEL_FALLBACKS = REGISTRY.counter(
+    'farmgaze_model_fallbacks_total', 'Model predictions that failed and fell back to seasonal rules', 'path')
+NATIVE_CACHE = REGISTRY.counter(
+    'farmgaze_native_cache_total', 'Native crop cache lookups', 'result')
+RESPONSE_CACHE = REGISTRY.counter(
+    'farmgaze_response_cache_total', 'Cached /predict response lookups', 'result')
+MODEL_SWAPS = REGISTRY.counter(
+    'farmgaze_model_swaps_total', 'Model versions swapped in by the background loader')
+
+_IST = None
+
+def now_ist():
+    """Current time in IST (pytz is imported on first call)"""
+    global _IST
+    if _IST is None:
+        import pytz
+        _IST = pytz.timezone('Asia/Kolkata')
+    return datetime.now(_IST)
+
 def get_current_season():
     """Get current agricultural season based on IST time - Enhanced for 5 seasons"""
-    ist = pytz.timezone('Asia/Kolkata')
-    now = datetime.now(ist)
+    now = now_ist()
     month = now.month
     
     if month in [6, 7, 8, 9]:
@@ -46,83 +90,265 @@ def get_current_season():
 class WeatherService:
     """Service to fetch real-time weather data"""
     
-    @staticmethod
-    def get_current_weather(lat, lon):
-        """Fetch current weather from Open-Meteo API"""
+    fan_out_concurrency = int(os.environ.get('WEATHER_FANOUT_CONCURRENCY', 16))
+    
+    # Keep-alive client; the breaker fails fast to seasonal defaults while upstream is down.
+    # The pool defaults to one connection per fan-out worker.
+    client = PooledWeatherClient(
+        os.environ.get('OPEN_METEO_URL', 'https://api.open-meteo.com/v1/forecast'),
+        pool_size=int(os.environ.get('WEATHER_POOL_SIZE', fan_out_concurrency)),
+        connect_timeout=float(os.environ.get('WEATHER_CONNECT_TIMEOUT', 3.05)),
+        read_timeout=float(os.environ.get('WEATHER_READ_TIMEOUT', 10)),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.environ.get('WEATHER_BREAKER_THRESHOLD', 5)),
+            reset_timeout=float(os.environ.get('WEATHER_BREAKER_RESET', 30))
+        )
+    )
+    
+    # Shared cache keyed by rounded lat/lon cell; see weather_cache.WeatherCache
+    cache = WeatherCache(
+        ttl=float(os.environ.get('WEATHER_CACHE_TTL', 900)),
+        stale_ttl=float(os.environ.get('WEATHER_CACHE_STALE_TTL', 3600)),
+        max_entries=int(os.environ.get('WEATHER_CACHE_SIZE', 2048)),
+        cell_size=float(os.environ.get('WEATHER_CACHE_CELL_DEG', 0.1))
+    )
+    
+    # WEATHER_MODE=snapshot answers from the local snapshot store and never
+    # calls Open-Meteo; WEATHER_SNAPSHOT_DATE (YYYY-MM-DD) pins the day served
+    mode = os.environ.get('WEATHER_MODE', 'live')
+    snapshot_path = os.environ.get('WEATHER_SNAPSHOT_PATH', DEFAULT_SNAPSHOT_PATH)
+    snapshot_date = os.environ.get('WEATHER_SNAPSHOT_DATE')
+    _snapshot = None
+    _snapshot_lock = threading.Lock()
+    
+    @classmethod
+    def get_snapshot(cls):
+        """The loaded WeatherSnapshot, or None if the file is missing"""
+        if cls._snapshot is None:
+            with cls._snapshot_lock:
+                if cls._snapshot is None:
+                    snapshot = WeatherSnapshot.load(cls.snapshot_path)
+                    if snapshot is None:
+                        logger.error(f"Weather snapshot not found at {cls.snapshot_path}; using seasonal defaults")
+                    cls._snapshot = snapshot or False
+        return cls._snapshot or None
+    
+    @classmethod
+    def snapshot_day(cls):
+        """Day served from the snapshot: WEATHER_SNAPSHOT_DATE, else today in IST"""
+        return datetime.strptime(cls.snapshot_date, '%Y-%m-%d').date() if cls.snapshot_date else now_ist().date()
+    
+    @classmethod
+    def get_snapshot_weather(cls, lat, lon):
+        """Weather from the snapshot store, or the seasonal default if it has no entry"""
+        return cls._snapshot_weather(lat, lon)[0]
+    
+    @classmethod
+    def _snapshot_weather(cls, lat, lon):
+        snapshot = cls.get_snapshot()
+        weather = snapshot.lookup(lat, lon, cls.snapshot_day()) if snapshot else None
+        if weather is None:
+            WEATHER_FALLBACKS.inc()
+            return cls.get_default_weather(), 0.0
+        return weather, cls.cache.ttl
+    
+    @classmethod
+    def get_current_weather(cls, lat, lon):
+        """Fetch current weather, served from the grid-cell cache when fresh"""
+        return cls.get_weather_with_freshness(lat, lon)[0]
+    
+    @classmethod
+    def get_weather_with_freshness(cls, lat, lon):
+        """(weather, seconds it stays current) from one lookup; 0 for stale or fallback weather"""
+        if cls.mode == 'snapshot':
+            return cls._snapshot_weather(lat, lon)
         try:
-            # Current weather
-            current_url = f"https://api.open-meteo.com/v1/forecast"
-            current_params = {
-                'latitude': lat,
-                'longitude': lon,
-                'current': 'temperature_2m,relative_humidity_2m,precipitation,wind_speed_10m',
-                'timezone': 'Asia/Kolkata',
-                'past_days': 7,
-                'forecast_days': 1
-            }
-            
-            current_response = requests.get(current_url, params=current_params, timeout=10)
-            current_response.raise_for_status()
-            current_data = current_response.json()
-            
-            # Weekly precipitation
-            weekly_precipitation = sum(current_data.get('daily', {}).get('precipitation_sum', [0]))
-            
-            ist = pytz.timezone('Asia/Kolkata')
-            
-            return {
-                'temperature': round(current_data['current']['temperature_2m'], 1),
-                'humidity': current_data['current']['relative_humidity_2m'],
-                'rainfall': weekly_precipitation,
-                'wind_speed': round(current_data['current']['wind_speed_10m'], 1),
-                'precipitation_current': current_data['current']['precipitation'],
-                'precipitation_week': round(weekly_precipitation, 1),
-                'fetch_time': datetime.now(ist).isoformat()
-            }
-            
+            return cls.cache.get_with_freshness(lat, lon, cls.fetch_weather)
         except Exception as e:
             logger.error(f"Weather API error: {e}")
-            # Return default weather for the season
-            season = get_current_season()
-            if season == 'kharif':
-                return {'temperature': 28, 'humidity': 80, 'rainfall': 1200, 'wind_speed': 8, 
-                       'precipitation_current': 5, 'precipitation_week': 80, 
-                       'fetch_time': datetime.now(pytz.timezone('Asia/Kolkata')).isoformat()}
-            elif season == 'rabi_early':
-                return {'temperature': 15, 'humidity': 50, 'rainfall': 200, 'wind_speed': 6,
-                       'precipitation_current': 0, 'precipitation_week': 5,
-                       'fetch_time': datetime.now(pytz.timezone('Asia/Kolkata')).isoformat()}
-            elif season == 'rabi_late':
-                return {'temperature': 20, 'humidity': 45, 'rainfall': 100, 'wind_speed': 5,
-                       'precipitation_current': 0, 'precipitation_week': 3,
-                       'fetch_time': datetime.now(pytz.timezone('Asia/Kolkata')).isoformat()}
-            elif season == 'zaid':
-                return {'temperature': 35, 'humidity': 40, 'rainfall': 50, 'wind_speed': 12,
-                       'precipitation_current': 0, 'precipitation_week': 2,
-                       'fetch_time': datetime.now(pytz.timezone('Asia/Kolkata')).isoformat()}
-            elif season == 'perennial':
-                return {'temperature': 25, 'humidity': 70, 'rainfall': 800, 'wind_speed': 7,
-                       'precipitation_current': 2, 'precipitation_week': 20,
-                       'fetch_time': datetime.now(pytz.timezone('Asia/Kolkata')).isoformat()}
-            else:
-                # Default fallback
-                return {'temperature': 25, 'humidity': 60, 'rainfall': 500, 'wind_speed': 7,
-                       'precipitation_current': 1, 'precipitation_week': 10,
-                       'fetch_time': datetime.now(pytz.timezone('Asia/Kolkata')).isoformat()}
+            WEATHER_FALLBACKS.inc()
+            return cls.get_default_weather(), 0.0
+    
+    @classmethod
+    def weather_cell(cls, lat, lon):
+        """Identifies the weather a request for (lat, lon) is answered with"""
+        if cls.mode == 'snapshot':
+            return ('snapshot', cls.cache.cell_key(lat, lon), cls.snapshot_day().isoformat())
+        return ('live', cls.cache.cell_key(lat, lon))
+    
+    @classmethod
+    def get_weather_many(cls, coords):
+        """Fetch weather for many (lat, lon) pairs concurrently, in input order"""
+        if cls.mode == 'snapshot':
+            return [cls.get_snapshot_weather(lat, lon) for lat, lon in coords]
+        return fan_out(cls.get_current_weather, coords, cls.fan_out_concurrency)
+    
+    @classmethod
+    def fetch_weather(cls, lat, lon):
+        """Fetch current weather from Open-Meteo API"""
+        # Current weather
+        current_params = {
+            'latitude': lat,
+            'longitude': lon,
+            'current': 'temperature_2m,relative_humidity_2m,precipitation,wind_speed_10m',
+            'timezone': 'Asia/Kolkata',
+            'past_days': 7,
+            'forecast_days': 1
+        }
+        
+        current_data = cls.client.get_json(current_params)
+        
+        # Weekly precipitation
+        weekly_precipitation = sum(current_data.get('daily', {}).get('precipitation_sum', [0]))
+        
+        return {
+            'temperature': round(current_data['current']['temperature_2m'], 1),
+            'humidity': current_data['current']['relative_humidity_2m'],
+            'rainfall': weekly_precipitation,
+            'wind_speed': round(current_data['current']['wind_speed_10m'], 1),
+            'precipitation_current': current_data['current']['precipitation'],
+            'precipitation_week': round(weekly_precipitation, 1),
+            'fetch_time': now_ist().isoformat()
+        }
+    
+    @staticmethod
+    def get_default_weather(season=None):
+        """Return default weather for the season when live data is unavailable"""
+        season = season or get_current_season()
+        if season == 'kharif':
+            return {'temperature': 28, 'humidity': 80, 'rainfall': 1200, 'wind_speed': 8, 
+                   'precipitation_current': 5, 'precipitation_week': 80, 
+                   'fetch_time': now_ist().isoformat()}
+        elif season == 'rabi_early':
+            return {'temperature': 15, 'humidity': 50, 'rainfall': 200, 'wind_speed': 6,
+                   'precipitation_current': 0, 'precipitation_week': 5,
+                   'fetch_time': now_ist().isoformat()}
+        elif season == 'rabi_late':
+            return {'temperature': 20, 'humidity': 45, 'rainfall': 100, 'wind_speed': 5,
+                   'precipitation_current': 0, 'precipitation_week': 3,
+                   'fetch_time': now_ist().isoformat()}
+        elif season == 'zaid':
+            return {'temperature': 35, 'humidity': 40, 'rainfall': 50, 'wind_speed': 12,
+                   'precipitation_current': 0, 'precipitation_week': 2,
+                   'fetch_time': now_ist().isoformat()}
+        elif season == 'perennial':
+            return {'temperature': 25, 'humidity': 70, 'rainfall': 800, 'wind_speed': 7,
+                   'precipitation_current': 2, 'precipitation_week': 20,
+                   'fetch_time': now_ist().isoformat()}
+        else:
+            # Default fallback
+            return {'temperature': 25, 'humidity': 60, 'rainfall': 500, 'wind_speed': 7,
+                   'precipitation_current': 1, 'precipitation_week': 10,
+                   'fetch_time': now_ist().isoformat()}
 
 class ImprovedSeasonalCropRecommendationAPI:
     """Enhanced API with better seasonal crop recommendations"""
     
-    def __init__(self):
-        self.model = None
-        self.feature_names = None
-        self.crop_classes = None
+    STARTUP_MODES = ('eager', 'lazy', 'background')
+    
+    def __init__(self, startup_mode='eager'):
+        """Create the API; ``startup_mode`` controls when artifacts are loaded.
+        
+        - eager: load everything now (default)
+        - lazy: load on the first request that needs the artifacts
+        - background: start loading in a warm-up thread and return immediately
+        """
+        if startup_mode not in self.STARTUP_MODES:
+            raise ValueError(f"Unknown startup mode {startup_mode!r}, expected one of {self.STARTUP_MODES}")
+        self.startup_mode = startup_mode
+        # Replaced, never mutated, so /health can serialize it while the
+        # warm-up thread is still recording; see record_timing
+        self.startup_timings = {'module_import': IMPORT_SECONDS}
+        self.load_error = None
+        self._ready = threading.Event()
+        self._load_lock = threading.Lock()
+        # Model, compiled forest (FOREST_ENGINE=compiled), feature names and
+        # class columns of the served version, replaced as one reference
+        self.bundle = None
+        self.registry = ModelRegistry(os.environ.get('MODEL_REGISTRY_DIR', DEFAULT_REGISTRY_DIR))
+        # Loads newer or pinned registry versions off the request path
+        self.model_loader = ModelLoader(self.registry, self._active_version, self._load_version,
+                                        self.swap_bundle, float(os.environ.get('MODEL_REGISTRY_POLL', 30)))
+        self.forest_engine = os.environ.get('FOREST_ENGINE', 'compiled')
+        # Weight of model probabilities in the knowledge/model blend; 0 skips the
+        # model call. Chosen with benchmark_model_blend.py on data/data_set.csv:
+        # with the shipped model every weight > 0 lowers hit@1 (0.226 at 0 vs
+        # 0.158 at 0.05-0.2 and 0.143 from 0.3) and hit@5 only rises from 0.5 up,
+        # by crowding the model's five classes into the top five. Re-run it after
+        # retraining and set MODEL_BLEND_WEIGHT from its recommendation.
+        self.model_blend_weight = float(os.environ.get('MODEL_BLEND_WEIGHT', 0.0))
         self.district_meta = None
+        # (state, district) -> district record, built once in load_district_meta
+        self.district_index = {}
+        self.districts_by_state = {}
         self.seasonal_crop_knowledge = self._load_seasonal_crop_knowledge()
-        self.load_model()
-        self.load_district_meta()
-        # Cache for native crops per (state,district)
-        self._native_cache = {}
+        self.precomputed = None
+        self.yield_features = {}
+        # Bumped whenever district metadata or yield features are (re)loaded;
+        # native crop results computed from older artifacts are discarded
+        self.artifact_version = 0
+        # LRU of native crops per (state, district, season)
+        self._native_cache = NativeCropCache(max_entries=int(os.environ.get('NATIVE_CACHE_SIZE', 4096)))
+        # Full (state, district, season) table when NATIVE_PRECOMPUTE is set
+        self.native_precompute = os.environ.get('NATIVE_PRECOMPUTE', '0').lower() in ('1', 'true', 'yes')
+        self._native_table = None
+        self._native_table_version = None
+        # Serialized /predict responses keyed on request, weather cell and model
+        # version; RESPONSE_CACHE=0 disables it. RESPONSE_CACHE_SHARED_PATH
+        # (e.g. /dev/shm/farmgaze-responses) adds slots shared by every worker
+        self.response_cache = None
+        if os.environ.get('RESPONSE_CACHE', '1').lower() not in ('0', 'false', 'no'):
+            self.response_cache = ResponseCache(
+                max_entries=int(os.environ.get('RESPONSE_CACHE_SIZE', 4096)),
+                max_bytes=int(os.environ.get('RESPONSE_CACHE_MAX_MB', 64)) * 1024 * 1024,
+                shared_path=os.environ.get('RESPONSE_CACHE_SHARED_PATH'),
+                shared_slots=int(os.environ.get('RESPONSE_CACHE_SHARED_SLOTS', 1024)),
+                slot_size=int(os.environ.get('RESPONSE_CACHE_SLOT_BYTES', 16384))
+            )
+        # Table-driven seasonal scorer, rebuilt when artifact_version changes
+        self._scoring_engine = None
+        
+        if startup_mode == 'eager':
+            self.ensure_loaded()
+        elif startup_mode == 'background':
+            threading.Thread(target=self.ensure_loaded, name='api-warmup', daemon=True).start()
+    
+    @property
+    def ready(self):
+        """True once all artifacts have been loaded"""
+        return self._ready.is_set()
+    
+    def record_timing(self, name, seconds):
+        """Publish a new startup_timings dict with ``name`` added"""
+        self.startup_timings = dict(self.startup_timings, **{name: seconds})
+    
+    def ensure_loaded(self):
+        """Load model and data artifacts once; later calls return immediately"""
+        if self._ready.is_set():
+            return
+        with self._load_lock:
+            if self._ready.is_set():
+                return
+            start = time.perf_counter()
+            try:
+                loaders = [('model', self.load_model),
+                           ('district_meta', self.load_district_meta),
+                           ('yield_features', self.load_yield_features),
+                           ('precomputed', self.load_precomputed)]
+                if self.native_precompute:
+                    loaders.append(('native_precompute', self.precompute_native_crops))
+                for component, loader in loaders:
+                    component_start = time.perf_counter()
+                    loader()
+                    self.record_timing(component, time.perf_counter() - component_start)
+            except Exception as e:
+                self.load_error = str(e)
+                logger.error(f"Error loading API artifacts: {e}")
+            self.record_timing('total_load', time.perf_counter() - start)
+            logger.info("Startup timings: " + ", ".join(
+                f"{name}={seconds * 1000:.0f}ms" for name, seconds in self.startup_timings.items()
+            ))
+            self._ready.set()
     
     def _load_seasonal_crop_knowledge(self):
         """Load agricultural knowledge about seasonal crops for 5 seasons"""
@@ -175,65 +401,120 @@ class ImprovedSeasonalCropRecommendationAPI:
         }
     
     def load_model(self):
-        """Load the trained model and related artifacts"""
+        """Load the served model version: the registry's pinned or newest version,
+        else the combined (or original) model files in trained_models/"""
         try:
+            import_start = time.perf_counter()
+            import joblib  # noqa: F401
+            import sklearn.ensemble  # noqa: F401  (needed to unpickle the forest)
+            self.record_timing('import_sklearn', time.perf_counter() - import_start)
+            
+            version = self.registry.resolve()
+            if version:
+                try:
+                    self.swap_bundle(self._load_version(version))
+                    return
+                except Exception as e:
+                    logger.error(f"Error loading model version {version}, using trained_models/ files: {e}")
+                    self.model_loader.failures[version] = str(e)
+            
             # Try to load the combined model first (enhanced with all datasets)
             combined_model_path = '../trained_models/combined_rf_crop_recommender.joblib'
-            combined_meta_path = '../trained_models/combined_model_metadata.json'
-            
+            model_path = '../trained_models/rf_crop_recommender.joblib'
             if os.path.exists(combined_model_path):
-                model_data = joblib.load(combined_model_path)
-                
-                if isinstance(model_data, dict):
-                    self.model = model_data.get('model')
-                    self.feature_names = model_data.get('feature_names', [])
-                    self.crop_classes = model_data.get('crop_classes', [])
-                else:
-                    self.model = model_data
-                    # Load metadata separately
-                    if os.path.exists(combined_meta_path):
-                        import json
-                        with open(combined_meta_path, 'r') as f:
-                            metadata = json.load(f)
-                            self.feature_names = metadata.get('feature_names', [])
-                            self.crop_classes = metadata.get('crop_classes', [])
-                
+                bundle = ModelBundle.load(combined_model_path, '../trained_models/combined_model_metadata.json',
+                                          '../trained_models/combined_rf_compiled.npz', self.forest_engine,
+                                          version=f'legacy-combined-{file_sha256(combined_model_path)[:8]}')
                 logger.info("Combined model loaded successfully")
-                logger.info(f"Features: {len(self.feature_names) if self.feature_names else 0}")
-                logger.info(f"Crops: {len(self.crop_classes) if self.crop_classes else 0}")
-            else:
+            elif os.path.exists(model_path):
                 # Fallback to original model
-                model_path = '../trained_models/rf_crop_recommender.joblib'
-                if os.path.exists(model_path):
-                    model_data = joblib.load(model_path)
-                    
-                    if isinstance(model_data, dict):
-                        self.model = model_data.get('model')
-                        self.feature_names = model_data.get('feature_names', [])
-                        self.crop_classes = model_data.get('crop_classes', [])
-                    else:
-                        self.model = model_data
-                        # Load metadata separately
-                        meta_path = '../trained_models/model_metadata.json'
-                        if os.path.exists(meta_path):
-                            import json
-                            with open(meta_path, 'r') as f:
-                                metadata = json.load(f)
-                                self.feature_names = metadata.get('feature_names', [])
-                                self.crop_classes = metadata.get('crop_classes', [])
-                    
-                    logger.info("Original model loaded successfully")
-                    logger.info(f"Features: {len(self.feature_names) if self.feature_names else 0}")
-                    logger.info(f"Crops: {len(self.crop_classes) if self.crop_classes else 0}")
-                else:
-                    logger.error(f"Model file not found at {model_path}")
+                bundle = ModelBundle.load(model_path, '../trained_models/model_metadata.json',
+                                          '../trained_models/rf_compiled.npz', self.forest_engine,
+                                          version=f'legacy-original-{file_sha256(model_path)[:8]}')
+                logger.info("Original model loaded successfully")
+            else:
+                logger.error(f"Model file not found at {model_path}")
+                return
+            try:
+                bundle.validate(self._probe_matrix(bundle))
+            except Exception as e:
+                # Unversioned files have nothing to fall back to; serve them as before
+                logger.warning(f"Model files failed validation: {e}")
+            self.swap_bundle(bundle)
                 
         except Exception as e:
             logger.error(f"Error loading model: {e}")
     
+    def _load_version(self, version):
+        """Verify, load and validate a registry version; raises if it must not be served"""
+        bundle = self.registry.load_bundle(version, self.forest_engine)
+        bundle.validate(self._probe_matrix(bundle))
+        return bundle
+    
+    def _probe_matrix(self, bundle):
+        """Feature rows for each season's default weather, used to validate a bundle"""
+        return self._prepare_feature_matrix([
+            (WeatherService.get_default_weather(season), season, '', '')
+            for season in self.seasonal_crop_knowledge
+        ], bundle)
+    
+    def _active_version(self):
+        bundle = self.bundle
+        return bundle.version if bundle is not None else None
+    
+    def swap_bundle(self, bundle):
+        """Serve ``bundle`` from now on; requests holding the previous one finish with it"""
+        previous = self._active_version()
+        self.bundle = bundle
+        logger.info(f"Serving model version {bundle.version} "
+                    f"({len(bundle.feature_names or [])} features, {len(bundle.crop_classes or [])} crops, "
+                    f"{'compiled' if bundle.forest is not None else 'sklearn'} forest"
+                    f"{', ' + bundle.forest_check if bundle.forest_check else ''})")
+        if previous is not None and previous != bundle.version:
+            MODEL_SWAPS.inc()
+    
+    # Read-only views of the served bundle
+    @property
+    def model(self):
+        return self.bundle.model if self.bundle is not None else None
+    
+    @property
+    def forest(self):
+        return self.bundle.forest if self.bundle is not None else None
+    
+    @property
+    def feature_names(self):
+        return self.bundle.feature_names if self.bundle is not None else None
+    
+    @property
+    def crop_classes(self):
+        return self.bundle.crop_classes if self.bundle is not None else None
+    
+    @property
+    def class_index(self):
+        return self.bundle.class_index if self.bundle is not None else {}
+    
+    def _model_active(self, bundle):
+        """True when ``bundle``'s probabilities take part in the ranking"""
+        return (bundle is not None and bundle.model is not None and bundle.feature_names is not None
+                and self.model_blend_weight > 0)
+    
+    @property
+    def use_model(self):
+        """True when model probabilities take part in the ranking"""
+        return self._model_active(self.bundle)
+    
+    def predict_proba(self, X, bundle=None):
+        """Class probabilities for a feature matrix from ``bundle`` (default: the served one)"""
+        return (bundle or self.bundle).predict_proba(X)
+    
     def load_district_meta(self):
         """Load district metadata"""
         try:
+            import_start = time.perf_counter()
+            import pandas as pd
+            self.record_timing('import_pandas', time.perf_counter() - import_start)
+            
             # First try to load enhanced district metadata with yield statistics
             enhanced_meta_path = 'enhanced_district_meta.csv'
             if os.path.exists(enhanced_meta_path):
@@ -248,84 +529,150 @@ class ImprovedSeasonalCropRecommendationAPI:
                 else:
                     logger.warning(f"District metadata not found at {meta_path}")
             
-            # Load crop yield features if available
-            yield_features_path = '../trained_models/crop_yield_features.json'
-            if os.path.exists(yield_features_path):
-                import json
-                with open(yield_features_path, 'r') as f:
-                    self.yield_features = json.load(f)
-                logger.info("Loaded crop yield features for enhanced predictions")
-            else:
-                self.yield_features = {}
-                logger.warning(f"Crop yield features not found at {yield_features_path}")
+            self._build_district_index()
                 
         except Exception as e:
             logger.error(f"Error loading district metadata: {e}")
+        self.artifact_version += 1
+    
+    def load_yield_features(self):
+        """Load crop yield features if available"""
+        try:
+            # Prefer the memory-mapped columnar store over parsing the JSON
+            self.yield_features = load_yield_features(
+                '../trained_models/crop_yield_features',
+                '../trained_models/crop_yield_features.json'
+            )
+        except Exception as e:
+            self.yield_features = {}
+            logger.error(f"Error loading crop yield features: {e}")
+        self.artifact_version += 1
+
+    def load_precomputed(self):
+        """Memory-map the precomputed recommendation table if it has been built"""
+        try:
+            precomputed_dir = os.environ.get('PRECOMPUTED_DIR', '../trained_models/precomputed')
+            self.precomputed = PrecomputedRecommendations.load(precomputed_dir)
+            if self.precomputed is not None:
+                logger.info(f"Loaded precomputed recommendations {self.precomputed.version} "
+                            f"for {len(self.precomputed)} district-seasons")
+            else:
+                logger.info(f"Precomputed recommendations not found at {precomputed_dir}")
+        except Exception as e:
+            self.precomputed = None
+            logger.error(f"Error loading precomputed recommendations: {e}")
+
+    def _build_district_index(self):
+        """Build the (state, district) lookup table used on the request path.
+
+        Each record holds the district coordinates, its parsed historical crops
+        (ordered list and set) and any ``*_yield_efficiency`` columns from the
+        enhanced metadata, so request handlers never scan the DataFrame.
+        """
+        self.district_index = {}
+        self.districts_by_state = {}
+        if self.district_meta is None:
+            return
+        
+        yield_columns = [c for c in self.district_meta.columns if c.endswith('_yield_efficiency')]
+        columns = ['state', 'district', 'lat', 'lon', 'historical_crops'] + yield_columns
+        for values in self.district_meta[columns].itertuples(index=False, name=None):
+            state, district, lat, lon, hc = values[:5]
+            historical = [c.strip() for c in hc.split(',') if c.strip()] if isinstance(hc, str) else []
+            key = (state, district)
+            if key in self.district_index:
+                # Keep the first row, matching the previous match.iloc[0] behaviour
+                continue
+            self.district_index[key] = {
+                'lat': float(lat),
+                'lon': float(lon),
+                'historical_crops': historical,
+                'historical_set': frozenset(historical),
+                'yield_efficiency': {
+                    col[:-len('_yield_efficiency')]: float(v)
+                    for col, v in zip(yield_columns, values[5:])
+                }
+            }
+            self.districts_by_state.setdefault(state, []).append(district)
+        
+        logger.info(f"Built district index for {len(self.district_index)} districts")
+
+    def get_district_record(self, state, district):
+        """Return the indexed record for a district, or None if unknown"""
+        return self.district_index.get((state, district))
 
     def get_native_crops(self, state, district, season=None):
-        """Infer district-native crops using 4 datasets:
+        """Infer district-native crops using 3 datasets:
         - enhanced_district_meta.csv or district_meta.csv: historical_crops per district
         - crop_yield_features.json: state-level yield efficiency per crop
         - seasonal knowledge: seasonally ideal/suitable crops
-        - model crop classes (if available): to intersect with supported crops
-        Returns a sorted list of crops (native-first relevance).
+        Returns a sorted list of crops (native-first relevance). Served from the
+        precomputed table (NATIVE_PRECOMPUTE=1) or the bounded LRU when possible.
         """
-        cache_key = (state, district, season or 'all')
-        if cache_key in self._native_cache:
-            return self._native_cache[cache_key]
-
-        historical = []
-        if self.district_meta is not None:
-            match = self.district_meta[(self.district_meta['state'] == state) & (self.district_meta['district'] == district)]
-            if not match.empty:
-                hc = match.iloc[0].get('historical_crops')
-                if isinstance(hc, str):
-                    historical = [c.strip() for c in hc.split(',') if c.strip()]
+        self.ensure_loaded()
+        season_key = season or get_current_season()
+        cache_key = (state, district, season_key)
+        version = self.artifact_version
+        if self._native_table is not None and self._native_table_version == version:
+            native_list = self._native_table.get(cache_key)
+            if native_list is not None:
+                NATIVE_CACHE.inc('precomputed')
+                return native_list
+        native_list = self._native_cache.get(cache_key, version)
+        if native_list is not None:
+            NATIVE_CACHE.inc('hit')
+            return native_list
+        NATIVE_CACHE.inc('miss')
+
+        record = self.get_district_record(state, district)
+        historical = record['historical_set'] if record else frozenset()
 
         state_perf = {}
         if hasattr(self, 'yield_features') and self.yield_features:
             state_perf = self.yield_features.get('state_crop_performance', {}).get(state, {})
 
         # Season candidates from knowledge
-        season_key = season or get_current_season()
-        seasonal = []
         sk = self.seasonal_crop_knowledge.get(season_key, {})
-        seasonal = sk.get('ideal_crops', []) + sk.get('suitable_crops', [])
-
-        # Supported crops by model if available
-        supported = set(self.crop_classes) if self.crop_classes else None
+        seasonal = set(sk.get('ideal_crops', []) + sk.get('suitable_crops', []))
 
         # Score crops: historical high, yield efficiency medium, seasonal low
         scores = {}
-        for crop in set(historical + seasonal + list(state_perf.keys())):
-            if supported and crop not in supported:
-                # If model classes exist, prefer supported crops
-                pass
+        for crop in historical | seasonal | set(state_perf.keys()):
             scores[crop] = 0.0
             if crop in historical:
-                scores[crop] += 1.0
+                scores[crop] += HISTORICAL_WEIGHT
             perf = state_perf.get(crop)
             if perf:
                 ye = perf.get('yield_efficiency', 0.0)
-                scores[crop] += min(max(ye, 0.0), 1.0) * 0.6
+                scores[crop] += min(max(ye, 0.0), 1.0) * YIELD_WEIGHT
             if crop in seasonal:
-                scores[crop] += 0.3
+                scores[crop] += SEASONAL_WEIGHT
 
-        # Rank and prepare list
-        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-        native_list = [c for c, _ in ranked]
-        self._native_cache[cache_key] = native_list
+        # Rank (ties by crop name, as in the precomputed table) and cache
+        native_list = rank_native_scores(scores)
+        self._native_cache.put(cache_key, native_list, version)
         return native_list
+
+    def precompute_native_crops(self):
+        """Rank native crops for every indexed district and season up front"""
+        try:
+            state_crop_performance = {}
+            if self.yield_features:
+                state_crop_performance = self.yield_features.get('state_crop_performance', {})
+            self._native_table = precompute_native_crops(
+                self.district_index, self.seasonal_crop_knowledge, state_crop_performance
+            )
+            self._native_table_version = self.artifact_version
+            logger.info(f"Precomputed native crops for {len(self._native_table)} district-seasons")
+        except Exception as e:
+            self._native_table = None
+            logger.error(f"Error precomputing native crops: {e}")
     
     def get_district_coordinates(self, state, district):
         """Get coordinates for a district"""
-        if self.district_meta is not None:
-            match = self.district_meta[
-                (self.district_meta['state'] == state) & 
-                (self.district_meta['district'] == district)
-            ]
-            if not match.empty:
-                return float(match.iloc[0]['lat']), float(match.iloc[0]['lon'])
+        record = self.get_district_record(state, district)
+        if record:
+            return record['lat'], record['lon']
         
         # Default coordinates for major cities
         defaults = {
@@ -345,192 +692,36 @@ class ImprovedSeasonalCropRecommendationAPI:
     
     def get_seasonal_crop_recommendations(self, season, weather_data, state, district, top_k=5):
         """Get seasonal crop recommendations based on agricultural knowledge for 5 seasons"""
-        seasonal_crops = self.seasonal_crop_knowledge.get(season, {})
-        ideal_crops = seasonal_crops.get('ideal_crops', [])
-        suitable_crops = seasonal_crops.get('suitable_crops', [])
-        conditions = seasonal_crops.get('conditions', {})
-        
-        recommendations = []
-        
-        # Check weather suitability
-        temp = weather_data['temperature']
-        rainfall = weather_data['rainfall']
-        humidity = weather_data['humidity']
-        
-        # Get district-specific historical crops if available
-        district_crops = []
-        if self.district_meta is not None:
-            match = self.district_meta[
-                (self.district_meta['state'] == state) & 
-                (self.district_meta['district'] == district)
-            ]
-            if not match.empty:
-                historical_crops_str = match.iloc[0]['historical_crops']
-                if isinstance(historical_crops_str, str):
-                    district_crops = [crop.strip() for crop in historical_crops_str.split(',')]
-        
-        # Get crop yield performance data for the state if available
-        state_crop_performance = {}
-        if hasattr(self, 'yield_features') and self.yield_features:
-            state_crop_performance = self.yield_features.get('state_crop_performance', {}).get(state, {})
-            logger.debug(f"Found yield performance data for {len(state_crop_performance)} crops in {state}")
-        
-        # Score ideal crops higher
-        for crop in ideal_crops[:top_k*2]:  # Consider more crops initially
-            score = 0.8  # Base score for ideal crops
-            
-            # Adjust based on weather conditions for 5 seasons
-            if season == 'kharif':
-                if temp >= 25 and temp <= 35: score += 0.1
-                if rainfall >= 500: score += 0.1
-                if humidity >= 70: score += 0.05
-            elif season == 'rabi_early':
-                if temp >= 10 and temp <= 20: score += 0.1
-                if rainfall <= 300: score += 0.1
-                if humidity <= 60: score += 0.05
-            elif season == 'rabi_late':
-                if temp >= 15 and temp <= 25: score += 0.1
-                if rainfall <= 200: score += 0.1
-                if humidity <= 50: score += 0.05
-            elif season == 'zaid':
-                if temp >= 30: score += 0.1
-                if rainfall <= 200: score += 0.1
-                if humidity <= 50: score += 0.05
-            elif season == 'perennial':
-                if temp >= 20 and temp <= 35: score += 0.1
-                if rainfall >= 750 and rainfall <= 2500: score += 0.1
-                if humidity >= 60 and humidity <= 80: score += 0.05
-            
-            # Regional adjustments
-            if state == 'Maharashtra' and crop in ['cotton', 'sugarcane', 'soybean']:
-                score += 0.1
-            elif state == 'Punjab' and crop in ['wheat', 'rice']:
-                score += 0.1
-            elif state == 'Karnataka' and crop in ['cotton', 'sugarcane']:
-                score += 0.1
-            elif state == 'Tamil Nadu' and crop in ['rice', 'sugarcane']:
-                score += 0.1
-            elif state == 'Uttar Pradesh' and crop in ['wheat', 'rice', 'sugarcane']:
-                score += 0.1
-            elif state == 'Chhattisgarh' and crop in ['rice', 'pearl_millet', 'chickpea', 'groundnut', 'sugarcane']:
-                score += 0.1
-            elif state == 'Madhya Pradesh' and crop in ['rice', 'pearl_millet', 'chickpea', 'groundnut', 'sugarcane']:
-                score += 0.1
-            
-            # District-specific adjustments
-            if crop in district_crops:
-                score += 0.15  # Boost for historically grown crops
-            
-            # Crop yield performance adjustments
-            yield_efficiency = 0
-            if crop in state_crop_performance:
-                crop_stats = state_crop_performance[crop]
-                yield_efficiency = crop_stats.get('yield_efficiency', 0)
-                avg_yield = crop_stats.get('avg_yield', 0)
-                
-                # Boost score based on yield performance
-                if yield_efficiency > 0.5:  # High efficiency
-                    score += 0.2
-                elif yield_efficiency > 0.3:  # Medium efficiency
-                    score += 0.1
-                else:
-                    score += 0.05  # Low efficiency but still positive
-                    
-                if avg_yield > 1.0:  # Good average yield
-                    score += 0.1
-            
-            confidence = 'high' if score > 0.9 else 'medium' if score > 0.7 else 'low'
-            
-            recommendations.append({
-                'crop': crop,
-                'probability': min(score, 1.0),
-                'confidence': confidence,
-                'season_suitable': season,
-                'weather_factors': {
-                    'temperature': temp,
-                    'humidity': humidity,
-                    'rainfall_forecast': rainfall
-                },
-                'suitability_reason': self._get_suitability_reason(crop, season, weather_data),
-                'district_historical': crop in district_crops,
-                'yield_efficiency': yield_efficiency
-            })
+        return self.get_seasonal_crop_recommendations_batch([(season, weather_data, state, district)], top_k)[0]
+    
+    def get_seasonal_crop_recommendations_batch(self, rows, top_k=5, limit=None):
+        """Seasonal recommendations for many (season, weather_data, state, district) rows.
         
-        # Add suitable crops if we need more recommendations
-        if len(recommendations) < top_k*2:
-            for crop in suitable_crops[:top_k*2 - len(recommendations)]:
-                score = 0.6  # Lower base score for suitable crops
-                
-                # Similar adjustments as above for 5 seasons
-                if season == 'kharif' and temp >= 25 and rainfall >= 500:
-                    score += 0.1
-                elif season == 'rabi_early' and temp >= 10 and temp <= 20 and rainfall <= 300:
-                    score += 0.1
-                elif season == 'rabi_late' and temp >= 15 and temp <= 25 and rainfall <= 200:
-                    score += 0.1
-                elif season == 'zaid' and temp >= 30 and rainfall <= 200:
-                    score += 0.1
-                elif season == 'perennial' and temp >= 20 and temp <= 35 and rainfall >= 750:
-                    score += 0.1
-                
-                # Regional adjustments
-                if state == 'Maharashtra' and crop in ['cotton', 'sugarcane', 'soybean']:
-                    score += 0.1
-                elif state == 'Punjab' and crop in ['wheat', 'rice']:
-                    score += 0.1
-                elif state == 'Karnataka' and crop in ['cotton', 'sugarcane']:
-                    score += 0.1
-                elif state == 'Tamil Nadu' and crop in ['rice', 'sugarcane']:
-                    score += 0.1
-                elif state == 'Uttar Pradesh' and crop in ['wheat', 'rice', 'sugarcane']:
-                    score += 0.1
-                elif state == 'Chhattisgarh' and crop in ['rice', 'pearl_millet', 'chickpea', 'groundnut', 'sugarcane']:
-                    score += 0.1
-                elif state == 'Madhya Pradesh' and crop in ['rice', 'pearl_millet', 'chickpea', 'groundnut', 'sugarcane']:
-                    score += 0.1
-                
-                # District-specific adjustments
-                if crop in district_crops:
-                    score += 0.15  # Boost for historically grown crops
-                
-                # Crop yield performance adjustments
-                yield_efficiency = 0
-                if crop in state_crop_performance:
-                    crop_stats = state_crop_performance[crop]
-                    yield_efficiency = crop_stats.get('yield_efficiency', 0)
-                    avg_yield = crop_stats.get('avg_yield', 0)
-                    
-                    # Boost score based on yield performance
-                    if yield_efficiency > 0.5:  # High efficiency
-                        score += 0.2
-                    elif yield_efficiency > 0.3:  # Medium efficiency
-                        score += 0.1
-                    else:
-                        score += 0.05  # Low efficiency but still positive
-                        
-                    if avg_yield > 1.0:  # Good average yield
-                        score += 0.1
-                
-                confidence = 'medium' if score > 0.7 else 'low'
-                
-                recommendations.append({
-                    'crop': crop,
-                    'probability': min(score, 1.0),
-                    'confidence': confidence,
-                    'season_suitable': season,
-                    'weather_factors': {
-                        'temperature': temp,
-                        'humidity': humidity,
-                        'rainfall_forecast': rainfall
-                    },
-                    'suitability_reason': self._get_suitability_reason(crop, season, weather_data),
-                    'district_historical': crop in district_crops,
-                    'yield_efficiency': yield_efficiency
-                })
-        
-        # Sort by probability and return top_k
-        recommendations.sort(key=lambda x: x['probability'], reverse=True)
-        return recommendations[:top_k]
+        Scoring rules live in scoring_engine as arrays; each season's rows are
+        scored together and reasons are only built for the returned entries
+        (top_k, or ``limit`` of the 2 * top_k candidate pool).
+        """
+        engine = self._get_scoring_engine()
+        return engine.recommend_batch([
+            (season, weather_data, state, self._historical_set(state, district))
+            for season, weather_data, state, district in rows
+        ], top_k, limit)
+    
+    def _historical_set(self, state, district):
+        record = self.get_district_record(state, district)
+        return record['historical_set'] if record else frozenset()
+    
+    def _get_scoring_engine(self):
+        """Scoring engine for the current artifacts, rebuilt after yield features reload"""
+        engine = self._scoring_engine
+        if engine is None or engine.version != self.artifact_version:
+            state_crop_performance = {}
+            if self.yield_features:
+                state_crop_performance = self.yield_features.get('state_crop_performance', {})
+            engine = SeasonalScoringEngine(self.seasonal_crop_knowledge, state_crop_performance,
+                                           self._get_suitability_reason, version=self.artifact_version)
+            self._scoring_engine = engine
+        return engine
     
     def _get_suitability_reason(self, crop, season, weather_data):
         """Generate reason for crop suitability for 5 seasons"""
@@ -574,206 +765,335 @@ class ImprovedSeasonalCropRecommendationAPI:
     
     def predict_crops(self, state, district, season=None, top_k=5):
         """Predict crops using enhanced seasonal logic and ML model when available"""
+        predictions, weather_data, _ = self.predict_crops_with_freshness(state, district, season, top_k)
+        return predictions, weather_data
+    
+    def predict_crops_with_freshness(self, state, district, season=None, top_k=5):
+        """predict_crops(), plus the seconds its weather stays current (0 for stale or fallback weather)"""
+        self.ensure_loaded()
         if not season:
             season = get_current_season()
         
         # Get weather data
-        lat, lon = self.get_district_coordinates(state, district)
-        weather_data = WeatherService.get_current_weather(lat, lon)
+        with STAGE_SECONDS.time('district_lookup'):
+            lat, lon = self.get_district_coordinates(state, district)
+        with STAGE_SECONDS.time('weather'):
+            weather_data, fresh_for = WeatherService.get_weather_with_freshness(lat, lon)
+        
+        # Same stages as a batch of one, so each is timed once under one name
+        predictions = self.predict_with_weather([(state, district, season)], [weather_data], top_k, path='single')[0]
+        
+        return predictions, weather_data, fresh_for
+    
+    def normalise_top_k(self, top_k):
+        """``top_k`` as an int of at least 1, capped at the crop catalogue size.
         
-        # If we have a trained model, use it for predictions
-        if self.model is not None and self.feature_names is not None:
+        Any larger value ranks every candidate, so capping it changes no answer
+        and lets equivalent requests share a response cache entry. Raises
+        ValueError for anything else.
+        """
+        if isinstance(top_k, bool) or not isinstance(top_k, (int, float)) or top_k != int(top_k) or top_k < 1:
+            raise ValueError('top_k must be a positive integer')
+        return min(int(top_k), len(self._get_scoring_engine().crops))
+
+    def predict_crops_batch(self, items, top_k=5):
+        """Predict crops for many (state, district, season) requests at once.
+        
+        Weather is fetched once per distinct weather-cache cell, the feature
+        matrix is assembled in one pass and the model is called once.
+        Returns a list of (predictions, weather_data) tuples in input order.
+        """
+        self.ensure_loaded()
+        items = [(state, district, season or get_current_season()) for state, district, season in items]
+        
+        # Fetch weather once per grid cell, fanning out over distinct cells
+        cells = []
+        cell_coords = {}
+        for state, district, _ in items:
+            lat, lon = self.get_district_coordinates(state, district)
+            cell = WeatherService.cache.cell_key(lat, lon)
+            cell_coords.setdefault(cell, (lat, lon))
+            cells.append(cell)
+        with STAGE_SECONDS.time('weather'):
+            weather_by_cell = dict(zip(cell_coords, WeatherService.get_weather_many(list(cell_coords.values()))))
+        weather = [weather_by_cell[cell] for cell in cells]
+        return list(zip(self.predict_with_weather(items, weather, top_k), weather))
+    
+    def predict_with_weather(self, items, weather, top_k=5, path='batch'):
+        """Rank crops for (state, district, season) items given their weather dicts.
+        
+        Knowledge scores for each item's candidate pool are blended with one
+        batched model call (skipped when MODEL_BLEND_WEIGHT is 0). Returns one
+        prediction list per item. ``path`` labels model fallbacks ('single'
+        for /predict).
+        """
+        probabilities = None
+        # One bundle for the whole call, even if a new version is swapped in meanwhile
+        bundle = self.bundle
+        if items and self._model_active(bundle):
             try:
-                # Prepare features for model prediction
-                features = self._prepare_model_features(weather_data, season, state, district)
-                
-                # Make prediction
-                probabilities = self.model.predict_proba([features])[0]
-                
-                # Combine with knowledge-based recommendations
-                knowledge_predictions = self.get_seasonal_crop_recommendations(
-                    season, weather_data, state, district, top_k
-                )
-                
-                # Merge predictions with model probabilities
-                merged_predictions = self._merge_predictions(
-                    knowledge_predictions, probabilities, top_k
-                )
-                
-                return merged_predictions, weather_data
+                with STAGE_SECONDS.time('prepare_features'):
+                    X = self._prepare_feature_matrix([
+                        (weather_data, season, state, district)
+                        for weather_data, (state, district, season) in zip(weather, items)
+                    ], bundle)
+                with STAGE_SECONDS.time('predict_proba'):
+                    probabilities = self.predict_proba(X, bundle)
             except Exception as e:
-                logger.warning(f"Model prediction failed, falling back to knowledge-based: {e}")
-                
-        # Use knowledge-based recommendations as fallback
-        predictions = self.get_seasonal_crop_recommendations(
-            season, weather_data, state, district, top_k
-        )
+                logger.warning(f"Model prediction failed ({path}), falling back to knowledge-based: {e}")
+                MODEL_FALLBACKS.inc(path)
         
-        return predictions, weather_data
+        with STAGE_SECONDS.time('seasonal_rules'):
+            knowledge = self.get_seasonal_crop_recommendations_batch([
+                (season, weather_data, state, district)
+                for (state, district, season), weather_data in zip(items, weather)
+            ], top_k, limit=top_k * 2 if probabilities is not None else top_k)
+        
+        if probabilities is not None:
+            with STAGE_SECONDS.time('merge'):
+                knowledge = self._merge_predictions_batch(knowledge, probabilities, top_k, bundle)
+        
+        return knowledge
 
-    def _prepare_model_features(self, weather_data, season, state, district):
+    def _prepare_model_features(self, weather_data, season, state, district, bundle=None):
         """Prepare features for model prediction"""
-        # Debug: Print input parameters
-        logger.debug(f"Preparing features for: season={season}, state={state}, district={district}")
-        logger.debug(f"Weather data: {weather_data}")
+        return self._prepare_feature_matrix([(weather_data, season, state, district)], bundle)[0].tolist()
+    
+    def _prepare_feature_matrix(self, rows, bundle=None):
+        """Assemble the model feature matrix for many requests at once.
+        
+        ``rows`` is a list of (weather_data, season, state, district) tuples.
+        Returns an (n_rows, n_features) array with columns in the ``feature_names``
+        order of ``bundle`` (default: the served one).
+        """
+        feature_names = (bundle or self.bundle).feature_names
+        n = len(rows)
+        logger.debug(f"Preparing feature matrix for {n} rows")
         
         # Map season to numerical value
         season_map = {'kharif': 0, 'rabi_early': 1, 'rabi_late': 2, 'zaid': 3, 'perennial': 4}
-        season_num = season_map.get(season, 0)
         
+        temperature = np.empty(n)
+        humidity = np.empty(n)
+        rainfall = np.empty(n)
+        wind_speed = np.empty(n)
+        season_num = np.empty(n)
         # Get district-specific information
-        district_crop_ratio = 0.5  # Default value
-        state_avg_yield = 0.0
-        state_yield_efficiency = 0.0
-        state_yield_std = 0.0
+        district_crop_ratio = np.full(n, 0.5)  # Default value
+        state_avg_yield = np.zeros(n)
+        state_yield_efficiency = np.zeros(n)
+        state_yield_std = np.zeros(n)
+        
+        state_crop_performance = {}
+        if hasattr(self, 'yield_features') and self.yield_features:
+            state_crop_performance = self.yield_features.get('state_crop_performance', {})
         
-        # Default values for other features
+        for i, (weather_data, season, state, district) in enumerate(rows):
+            temperature[i] = weather_data.get('temperature', 25)
+            humidity[i] = weather_data.get('humidity', 60)
+            rainfall[i] = weather_data.get('rainfall', 500)
+            wind_speed[i] = weather_data.get('wind_speed', 10)
+            season_num[i] = season_map.get(season, 0)
+            
+            # Get district-specific information from enhanced metadata
+            if self.get_district_record(state, district) is not None:
+                # Use district-specific ratios if available
+                district_crop_ratio[i] = 0.7
+                # For demonstration, we'll use rice statistics as state-level stats if available
+                crop_stats = state_crop_performance.get(state, {}).get('rice')
+                if crop_stats:
+                    state_avg_yield[i] = crop_stats.get('avg_yield', 0.0)
+                    state_yield_efficiency[i] = crop_stats.get('yield_efficiency', 0.0)
+                    state_yield_std[i] = crop_stats.get('yield_std', 0.0)
+        
+        # Default values for soil and management features
         N = 50      # Nitrogen
         P = 30      # Phosphorus
         K = 40      # Potassium
         ph = 6.5
-        soil_moisture = 60
-        sunlight_exposure = 8
-        wind_speed = weather_data.get('wind_speed', 10)
-        co2_concentration = 400
-        organic_matter = 2.5
-        irrigation_frequency = 10
-        crop_density = 200
-        pest_pressure = 2
         fertilizer_usage = 40
-        urban_area_proximity = 30
-        frost_risk = 0
-        water_usage_efficiency = 70
-        
-        # Get district-specific information from enhanced metadata
-        if self.district_meta is not None:
-            match = self.district_meta[
-                (self.district_meta['state'] == state) & 
-                (self.district_meta['district'] == district)
-            ]
-            if not match.empty:
-                # Use district-specific ratios if available
-                district_crop_ratio = 0.7
-                
-                # Get state-level yield statistics if available
-                if hasattr(self, 'yield_features') and self.yield_features:
-                    state_crop_performance = self.yield_features.get('state_crop_performance', {}).get(state, {})
-                    logger.debug(f"State crop performance for {state}: {list(state_crop_performance.keys())[:5]}")
-                    # For demonstration, we'll use rice statistics as state-level stats if available
-                    if 'rice' in state_crop_performance:
-                        crop_stats = state_crop_performance['rice']
-                        state_avg_yield = crop_stats.get('avg_yield', 0.0)
-                        state_yield_efficiency = crop_stats.get('yield_efficiency', 0.0)
-                        state_yield_std = crop_stats.get('yield_std', 0.0)
-                        logger.debug(f"Using rice yield stats for {state}: avg={state_avg_yield}, eff={state_yield_efficiency}")
-        
-        # Derived features
-        fertilizer_per_unit = (N + P + K) / (fertilizer_usage + 1)
-        npk_ratio = N / (P + K + 1)
-        temp_humidity_index = weather_data.get('temperature', 25) * weather_data.get('humidity', 60) / 100
-        
-        # Categorical features (using default values)
-        soil_type = 1  # Assuming 1 is a common soil type (e.g., loamy)
-        growth_stage = 2  # Assuming 2 is a common growth stage (e.g., mature)
-        water_source_type = 1  # Assuming 1 is a common water source (e.g., canal)
-        
-        # Categorical features for ph, rainfall, temperature
-        ph_val = ph
-        if ph_val < 5.5:
-            ph_category = 0
-        elif ph_val < 6.5:
-            ph_category = 1
-        elif ph_val < 7.5:
-            ph_category = 2
-        else:
-            ph_category = 3
-            
-        rainfall_val = weather_data.get('rainfall', 500)
-        if rainfall_val < 300:
-            rainfall_category = 0
-        elif rainfall_val < 600:
-            rainfall_category = 1
-        elif rainfall_val < 1200:
-            rainfall_category = 2
-        else:
-            rainfall_category = 3
-            
-        temp_val = weather_data.get('temperature', 25)
-        if temp_val < 15:
-            temperature_category = 0
-        elif temp_val < 25:
-            temperature_category = 1
-        elif temp_val < 35:
-            temperature_category = 2
+        
+        columns = {
+            'N': N,
+            'P': P,
+            'K': K,
+            'temperature': temperature,
+            'humidity': humidity,
+            'ph': ph,
+            'rainfall': rainfall,
+            'soil_moisture': 60,
+            'sunlight_exposure': 8,
+            'wind_speed': wind_speed,
+            'co2_concentration': 400,
+            'organic_matter': 2.5,
+            'irrigation_frequency': 10,
+            'crop_density': 200,
+            'pest_pressure': 2,
+            'fertilizer_usage': fertilizer_usage,
+            'urban_area_proximity': 30,
+            'frost_risk': 0,
+            'water_usage_efficiency': 70,
+            'district_crop_ratio': district_crop_ratio,
+            'state_avg_yield': state_avg_yield,
+            'state_yield_efficiency': state_yield_efficiency,
+            'state_yield_std': state_yield_std,
+            'season': season_num,
+            # Categorical features (using default values)
+            'soil_type': 1,          # Assuming 1 is a common soil type (e.g., loamy)
+            'growth_stage': 2,       # Assuming 2 is a common growth stage (e.g., mature)
+            'water_source_type': 1,  # Assuming 1 is a common water source (e.g., canal)
+            # Derived features
+            'fertilizer_per_unit': (N + P + K) / (fertilizer_usage + 1),
+            'npk_ratio': N / (P + K + 1),
+            'temp_humidity_index': temperature * humidity / 100,
+            # Categorical bins for ph, rainfall, temperature (same edges as training)
+            'ph_category': np.digitize(ph, [5.5, 6.5, 7.5]),
+            'rainfall_category': np.digitize(rainfall, [300, 600, 1200]),
+            'temperature_category': np.digitize(temperature, [15, 25, 35])
+        }
+        
+        # Columns must follow the exact order from the model metadata
+        X = np.empty((n, len(feature_names)))
+        for j, name in enumerate(feature_names):
+            X[:, j] = columns[name]
+        
+        logger.debug(f"Prepared {X.shape[1]} features for model prediction")
+        
+        return X
+    
+    def _merge_predictions_batch(self, knowledge_lists, model_probabilities, top_k, bundle=None):
+        """Blend knowledge scores with model class probabilities and keep the top_k.
+        
+        merged = (1 - w) * knowledge probability + w * model probability, with
+        w = MODEL_BLEND_WEIGHT, for every candidate: crops outside model.classes_
+        count as model probability 0, so all candidates stay on one scale.
+        ``model_probabilities`` is (rows, classes) in model.classes_ order of
+        ``bundle`` (default: the served one). Ties keep the knowledge ranking.
+        """
+        weight = self.model_blend_weight
+        class_index = (bundle or self.bundle).class_index
+        width = max((len(predictions) for predictions in knowledge_lists), default=0)
+        if width == 0 or top_k <= 0:
+            return [[] for _ in knowledge_lists]
+        
+        n = len(knowledge_lists)
+        knowledge = np.zeros((n, width))
+        columns = np.full((n, width), -1, dtype=np.intp)
+        valid = np.zeros((n, width), dtype=bool)
+        for i, predictions in enumerate(knowledge_lists):
+            for j, prediction in enumerate(predictions):
+                knowledge[i, j] = prediction['probability']
+                columns[i, j] = class_index.get(prediction['crop'], -1)
+                valid[i, j] = True
+        
+        known = columns >= 0
+        model = np.where(known, np.take_along_axis(model_probabilities, np.where(known, columns, 0), axis=1), 0.0)
+        merged = (1 - weight) * knowledge + weight * model
+        merged = np.where(valid, merged, -np.inf)
+        
+        # Columns are in knowledge order, so ties keep the knowledge ranking
+        order = top_k_indices(merged, top_k)
+        
+        results = []
+        for i, row in enumerate(order.tolist()):
+            predictions = []
+            for j in row:
+                if not valid[i, j]:
+                    continue
+                probability = float(merged[i, j])
+                predictions.append(dict(
+                    knowledge_lists[i][j],
+                    probability=probability,
+                    confidence='high' if probability > 0.9 else 'medium' if probability > 0.7 else 'low',
+                    knowledge_probability=float(knowledge[i, j]),
+                    model_probability=float(model[i, j]) if known[i, j] else None
+                ))
+            results.append(predictions)
+        return results
+
+# Initialize API (API_STARTUP_MODE=lazy|background defers artifact loading)
+api = ImprovedSeasonalCropRecommendationAPI(startup_mode=os.environ.get('API_STARTUP_MODE', 'eager'))
+
+# Endpoints that must answer before artifacts are loaded
+LIVENESS_ENDPOINTS = {'health_check', 'readiness_check', 'metrics'}
+
+@app.before_request
+def load_artifacts():
+    """Make sure artifacts are loaded before serving data endpoints"""
+    # Per process, like the model loader: each worker flushes its own metrics
+    REGISTRY.ensure_flushing()
+    if request.endpoint not in LIVENESS_ENDPOINTS:
+        api.ensure_loaded()
+        # Per process: pre-fork workers do not inherit the master's thread
+        api.model_loader.ensure_running()
+
+def apply_native_boost(predictions, state, district, season, top_k):
+    """Boost district-native crops and re-rank predictions"""
+    with STAGE_SECONDS.time('native_rerank'):
+        return _apply_native_boost(predictions, state, district, season, top_k)
+
+def _apply_native_boost(predictions, state, district, season, top_k):
+    native_list = api.get_native_crops(state, district, season or get_current_season())
+    native_set = set(native_list[: max(top_k * 3, 10)])  # focus on top native set
+    for p in predictions:
+        if p['crop'] in native_set:
+            p['probability'] = min(p['probability'] + 0.15, 1.0)
+            p['confidence'] = 'high' if p['probability'] > 0.9 else ('medium' if p['probability'] > 0.7 else 'low')
+            p['district_native'] = True
         else:
-            temperature_category = 3
-        
-        # Create feature vector matching the training data (33 features total)
-        # IMPORTANT: Must match the exact order from combined_model_metadata.json
-        feature_values = [
-            N,  # N
-            P,  # P
-            K,  # K
-            weather_data.get('temperature', 25),  # temperature
-            weather_data.get('humidity', 60),     # humidity
-            ph,                                   # ph
-            weather_data.get('rainfall', 500),    # rainfall
-            soil_moisture,                        # soil_moisture
-            sunlight_exposure,                    # sunlight_exposure
-            wind_speed,                           # wind_speed
-            co2_concentration,                    # co2_concentration
-            organic_matter,                       # organic_matter
-            irrigation_frequency,                 # irrigation_frequency
-            crop_density,                         # crop_density
-            pest_pressure,                        # pest_pressure
-            fertilizer_usage,                     # fertilizer_usage
-            urban_area_proximity,                 # urban_area_proximity
-            frost_risk,                           # frost_risk
-            water_usage_efficiency,               # water_usage_efficiency
-            district_crop_ratio,                  # district_crop_ratio
-            state_avg_yield,                      # state_avg_yield
-            state_yield_efficiency,               # state_yield_efficiency
-            state_yield_std,                      # state_yield_std
-            season_num,                           # season
-            soil_type,                            # soil_type
-            growth_stage,                         # growth_stage
-            water_source_type,                    # water_source_type
-            fertilizer_per_unit,                  # fertilizer_per_unit
-            npk_ratio,                            # npk_ratio
-            temp_humidity_index,                  # temp_humidity_index
-            ph_category,                          # ph_category
-            rainfall_category,                    # rainfall_category
-            temperature_category                  # temperature_category
-        ]
-        
-        logger.debug(f"Prepared {len(feature_values)} features for model prediction")
-        
-        return feature_values
-    
-    def _merge_predictions(self, knowledge_predictions, model_probabilities, top_k):
-        """Merge knowledge-based and model-based predictions"""
-        # For now, we'll prioritize knowledge-based predictions but incorporate model confidence
-        # In a full implementation, this would be more sophisticated
-        return knowledge_predictions
-
-# Initialize API
-api = ImprovedSeasonalCropRecommendationAPI()
+            p['district_native'] = False
+    # Native crops first, each group by probability; ties keep their current order
+    probability = np.array([p['probability'] for p in predictions], dtype=float)
+    native = np.array([p['district_native'] for p in predictions], dtype=bool)
+    ranked = []
+    for group in (np.flatnonzero(native), np.flatnonzero(~native)):
+        if len(ranked) < top_k:
+            ranked.extend(group[top_k_indices(probability[group], top_k - len(ranked))].tolist())
+    return [predictions[i] for i in ranked]
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """Liveness check; reports readiness and startup timings without blocking on loads"""
     return jsonify({
         'status': 'healthy',
+        'ready': api.ready,
+        'startup_mode': api.startup_mode,
+        'startup_timings': api.startup_timings,
         'model_loaded': api.model is not None,
+        'model_version': api._active_version(),
+        'forest_engine': 'compiled' if api.forest is not None else 'sklearn',
+        'forest_check': api.bundle.forest_check if api.bundle is not None else None,
         'features_available': len(api.feature_names) if api.feature_names else 0,
         'crops_supported': len(api.crop_classes) if api.crop_classes else 0,
         'current_season': get_current_season(),
-        'timestamp': datetime.now(pytz.timezone('Asia/Kolkata')).isoformat()
+        'weather_mode': WeatherService.mode,
+        'weather_cache': WeatherService.cache.stats(),
+        'weather_circuit': WeatherService.client.breaker.stats(),
+        'native_cache': api._native_cache.stats(),
+        'native_precomputed': len(api._native_table) if api._native_table is not None else 0,
+        'response_cache': api.response_cache.stats() if api.response_cache is not None else None,
+        'precomputed_version': api.precomputed.version if api.precomputed is not None else None,
+        'timestamp': now_ist().isoformat()
+    })
+
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness check: 200 once artifacts are loaded, 503 while warming up"""
+    if not api.ready:
+        return jsonify({'ready': False, 'startup_mode': api.startup_mode}), 503
+    return jsonify({
+        'ready': True,
+        'model_loaded': api.model is not None,
+        'load_error': api.load_error
     })
 
 @app.route('/predict', methods=['POST'])
 def predict():
     """Predict crops with enhanced seasonal logic"""
+    with REQUEST_SECONDS.time('predict'):
+        return _predict()
+
+def _predict():
     try:
         data = request.get_json()
         
@@ -783,45 +1103,196 @@ def predict():
         state = data.get('state')
         district = data.get('district')
         season = data.get('season')
-        top_k = data.get('top_k', 5)
         district_native = bool(data.get('district_native', False))
         
+        mode = data.get('mode', 'live')
+        
         if not state or not district:
             return jsonify({'error': 'State and district are required'}), 400
         
-        # Make predictions
-        predictions, weather_data = api.predict_crops(
-            state=state,
-            district=district, 
-            season=season,
-            top_k=top_k
-        )
+        if mode not in ('live', 'precomputed'):
+            return jsonify({'error': "mode must be 'live' or 'precomputed'"}), 400
+        
+        try:
+            top_k = api.normalise_top_k(data.get('top_k', 5))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Live answers are cached until their weather goes stale
+        cache_key = None
+        if mode == 'live' and api.response_cache is not None:
+            lat, lon = api.get_district_coordinates(state, district)
+            cache_key = api.response_cache.key((
+                'predict', state, district, season or get_current_season(), top_k, district_native,
+                WeatherService.weather_cell(lat, lon), api._active_version(),
+                api.model_blend_weight, api.artifact_version
+            ))
+            cached = api.response_cache.get(cache_key)
+            if cached is not None:
+                RESPONSE_CACHE.inc('hit')
+                body, etag = cached
+                return _conditional(Response(body, content_type='application/json'), etag)
+            RESPONSE_CACHE.inc('miss')
+        
+        # Precomputed answers skip the weather and model calls entirely
+        predictions = None
+        weather_data = None
+        fresh_for = 0.0
+        if mode == 'precomputed' and api.precomputed is not None:
+            with STAGE_SECONDS.time('precomputed_lookup'):
+                predictions = api.precomputed.lookup(state, district, season or get_current_season(), top_k)
+        if predictions is None:
+            mode = 'live'
+            # Make predictions; the cache TTL comes from the weather they were built on
+            predictions, weather_data, fresh_for = api.predict_crops_with_freshness(
+                state=state,
+                district=district, 
+                season=season,
+                top_k=top_k
+            )
 
         # If native emphasis requested, boost native crops and re-rank
         if district_native:
-            native_list = api.get_native_crops(state, district, season or get_current_season())
-            native_set = set(native_list[: max(top_k * 3, 10)])  # focus on top native set
-            for p in predictions:
-                if p['crop'] in native_set:
-                    p['probability'] = min(p['probability'] + 0.15, 1.0)
-                    p['confidence'] = 'high' if p['probability'] > 0.9 else ('medium' if p['probability'] > 0.7 else 'low')
-                    p['district_native'] = True
-                else:
-                    p['district_native'] = False
-            predictions.sort(key=lambda x: (x.get('district_native', False), x['probability']), reverse=True)
-            predictions = predictions[:top_k]
+            predictions = apply_native_boost(predictions, state, district, season, top_k)
+        
+        with STAGE_SECONDS.time('serialize'):
+            response = jsonify({
+                'state': state,
+                'district': district,
+                'season': season or get_current_season(),
+                'predictions': predictions,
+                'weather_data': weather_data,
+                'mode': mode,
+                'timestamp': now_ist().isoformat()
+            })
+        if cache_key is None:
+            return response
+        return _conditional(response, api.response_cache.put(cache_key, response.get_data(), fresh_for))
+        
+    except Exception as e:
+        logger.error(f"Prediction error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def _conditional(response, etag):
+    """Attach the ETag; answer 304 without a body if the client already holds it"""
+    if request.if_none_match.contains(etag):
+        RESPONSE_CACHE.inc('not_modified')
+        api.response_cache.not_modified()
+        response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """Predict crops for a list of (state, district, season) items in one call"""
+    with REQUEST_SECONDS.time('predict_batch'):
+        return _predict_batch()
+
+def _predict_batch():
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('items'), list):
+            return jsonify({'error': 'A list of items is required'}), 400
+        
+        items = data['items']
+        top_k = data.get('top_k', 5)
+        district_native = bool(data.get('district_native', False))
+        max_batch_size = int(os.environ.get('MAX_BATCH_SIZE', 1000))
+        
+        if len(items) > max_batch_size:
+            return jsonify({'error': f'Batch size {len(items)} exceeds limit of {max_batch_size}'}), 400
+        
+        valid = []
+        results = []
+        for item in items:
+            item = item if isinstance(item, dict) else {}
+            state = item.get('state')
+            district = item.get('district')
+            if not state or not district:
+                results.append({'error': 'State and district are required'})
+                continue
+            valid.append((len(results), state, district, item.get('season') or get_current_season()))
+            results.append(None)
+        
+        batch = api.predict_crops_batch([(s, d, season) for _, s, d, season in valid], top_k=top_k)
+        
+        for (index, state, district, season), (predictions, weather_data) in zip(valid, batch):
+            if district_native:
+                predictions = apply_native_boost(predictions, state, district, season, top_k)
+            results[index] = {
+                'state': state,
+                'district': district,
+                'season': season,
+                'predictions': predictions,
+                'weather_data': weather_data
+            }
         
         return jsonify({
-            'state': state,
-            'district': district,
-            'season': season or get_current_season(),
-            'predictions': predictions,
-            'weather_data': weather_data,
-            'timestamp': datetime.now(pytz.timezone('Asia/Kolkata')).isoformat()
+            'results': results,
+            'count': len(results),
+            'timestamp': now_ist().isoformat()
         })
         
     except Exception as e:
-        logger.error(f"Prediction error: {e}")
+        logger.error(f"Batch prediction error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition of stage latencies and fallback counters"""
+    return Response(REGISTRY.render(), mimetype=None, content_type=METRICS_CONTENT_TYPE)
+
+@app.route('/models', methods=['GET'])
+def list_models():
+    """Registry versions, the served and pinned ones, and the background loader's state"""
+    active = api._active_version()
+    pinned = api.registry.pinned()
+    bundle = api.bundle
+    return jsonify({
+        'active': active,
+        'forest_engine': 'compiled' if bundle is not None and bundle.forest is not None else 'sklearn',
+        'forest_check': bundle.forest_check if bundle is not None else None,
+        'pinned': pinned,
+        'target': api.registry.resolve(),
+        'versions': [{
+            'version': manifest['version'],
+            'created': manifest['created'],
+            'source': manifest.get('source'),
+            'files': manifest['files'],
+            'active': manifest['version'] == active,
+            'pinned': manifest['version'] == pinned
+        } for manifest in api.registry.list_versions()],
+        'loader': api.model_loader.stats()
+    })
+
+@app.route('/models/pin', methods=['POST'])
+def pin_model():
+    """Pin a registry version; it is loaded and swapped in by the background loader"""
+    try:
+        data = request.get_json(silent=True) or {}
+        version = data.get('version')
+        if not version:
+            return jsonify({'error': 'version is required'}), 400
+        try:
+            api.registry.pin(version)
+        except KeyError:
+            return jsonify({'error': f'Unknown model version {version}'}), 404
+        api.model_loader.request()
+        return jsonify({'pinned': version, 'active': api._active_version()}), 202
+    except Exception as e:
+        logger.error(f"Model pin error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/models/pin', methods=['DELETE'])
+def unpin_model():
+    """Remove the pin; the newest registry version is swapped in by the background loader"""
+    try:
+        api.registry.unpin()
+        api.model_loader.request()
+        return jsonify({'pinned': None, 'target': api.registry.resolve(), 'active': api._active_version()}), 202
+    except Exception as e:
+        logger.error(f"Model unpin error: {e}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/states', methods=['GET'])
@@ -837,8 +1308,7 @@ def get_states():
 def get_districts(state):
     """Get districts for a state"""
     if api.district_meta is not None:
-        districts_series = api.district_meta[api.district_meta['state'] == state]['district']
-        districts = list(set(districts_series.tolist()))
+        districts = api.districts_by_state.get(state, [])
     else:
         # Default districts for major states
         districts_map = {
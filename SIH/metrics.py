@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Counters and histograms are keyed by a single label value. Recording is
+lock-free: an observation is appended to a deque (atomic in CPython) and
+folded into the totals by whoever reads the metric, or by the recording
+thread once enough have queued up and nobody else is folding. A timed
+stage therefore costs two perf_counter calls and an append, so timing hooks
+can stay on in production. Set METRICS_ENABLED=0 to turn every hook into a
+no-op.
+
+Pre-fork workers each hold their own values. When METRICS_DIR is set,
+every process writes a snapshot of its values to METRICS_DIR/<pid>.json
+every METRICS_FLUSH_INTERVAL seconds (and whenever it renders /metrics),
+and render() adds the snapshots of every other process to its own live
+values, so any worker answers for the whole server. Snapshots of exited
+workers are kept so totals never go down; other workers' values lag by at
+most one flush interval.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Prometheus client default buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+# Finer low end for sub-millisecond stages (lookups, merges, compiled inference)
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025) + DEFAULT_BUCKETS
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+ENABLED = os.environ.get('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no')
+
+# Queued observations a recording thread lets pile up before folding them itself
+FOLD_THRESHOLD = 1024
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Lock-free recording into a deque, folded into ``_values`` under the lock"""
+
+    def __init__(self, name, documentation, label=None):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self._values = {}
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def _record(self, item):
+        pending = self._pending
+        pending.append(item)
+        if len(pending) > FOLD_THRESHOLD:
+            self._fold_if_idle()
+
+    def _fold_if_idle(self):
+        if self._lock.acquire(blocking=False):
+            try:
+                self._fold()
+            finally:
+                self._lock.release()
+
+    def _fold(self):
+        """Apply queued observations; the caller holds the lock"""
+        popleft = self._pending.popleft
+        while True:
+            try:
+                item = popleft()
+            except IndexError:
+                return
+            self._apply(*item)
+
+    def _apply(self, label_value, value):
+        raise NotImplementedError
+
+    def collect(self):
+        """{label value: value} with every queued observation applied (values are copies)"""
+        with self._lock:
+            self._fold()
+            return {label_value: self._copy(value) for label_value, value in self._values.items()}
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+    def reset(self):
+        """Drop every value; also run in a forked child, so it takes no lock the parent may hold"""
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self._values = {}
+
+
+class Counter(_Metric):
+    """Monotonic counter with one optional label"""
+
+    def inc(self, label_value=None, amount=1):
+        if not ENABLED:
+            return
+        self._record((label_value, amount))
+
+    def _apply(self, label_value, amount):
+        self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def value(self, label_value=None):
+        return self.collect().get(label_value, 0)
+
+    @staticmethod
+    def merge(total, value):
+        return total + value
+
+    def render(self, values):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for label_value, value in sorted(values.items(), key=lambda item: str(item[0])):
+            labels = f'{{{self.label}="{label_value}"}}' if self.label else ''
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+_perf_counter = time.perf_counter
+
+
+class _Timer:
+    __slots__ = ('histogram', 'label_value', 'start')
+
+    def __init__(self, histogram, label_value):
+        self.histogram = histogram
+        self.label_value = label_value
+
+    def __enter__(self):
+        self.start = _perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Histogram._record inlined: this runs once per timed stage
+        pending = self.histogram._pending
+        pending.append((self.label_value, _perf_counter() - self.start))
+        if len(pending) > FOLD_THRESHOLD:
+            self.histogram._fold_if_idle()
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram with one optional label"""
+
+    def __init__(self, name, documentation, label=None, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label)
+        # _values: label value -> [per-bucket counts (+Inf last), sum]
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, label_value=None):
+        if not ENABLED:
+            return
+        self._record((label_value, value))
+
+    def _apply(self, label_value, value):
+        series = self._values.get(label_value)
+        if series is None:
+            series = self._values[label_value] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    @staticmethod
+    def _copy(series):
+        return [list(series[0]), series[1]]
+
+    def time(self, label_value=None):
+        """Context manager that observes the elapsed wall time of its block"""
+        if not ENABLED:
+            return _NULL_TIMER
+        return _Timer(self, label_value)
+
+    def snapshot(self, label_value=None):
+        """(count, sum) for one series"""
+        series = self.collect().get(label_value)
+        if series is None:
+            return 0, 0.0
+        return sum(series[0]), series[1]
+
+    @staticmethod
+    def merge(total, series):
+        return [[a + b for a, b in zip(total[0], series[0])], total[1] + series[1]]
+
+    def render(self, values):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for label_value, (counts, total) in sorted(values.items(), key=lambda item: str(item[0])):
+            prefix = f'{self.label}="{label_value}",' if self.label else ''
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{_format_value(bound)}"}} {cumulative}')
+            labels = f'{{{self.label}="{label_value}"}}' if self.label else ''
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics in registration order and renders them together"""
+
+    def __init__(self, directory=None, flush_interval=5.0):
+        self._metrics = []
+        self._lock = threading.Lock()
+        # Per-process snapshots for multi-worker totals; see the module docstring
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._flusher = None
+        self._flusher_pid = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            # A forked worker starts from zero; the parent's values are not its own
+            os.register_at_fork(after_in_child=self.reset)
+
+    def counter(self, name, documentation, label=None):
+        return self._register(Counter(name, documentation, label))
+
+    def histogram(self, name, documentation, label=None, buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, label, buckets))
+
+    def _register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def reset(self):
+        self._lock = threading.Lock()
+        for metric in self._metrics:
+            metric.reset()
+
+    def collect(self):
+        """{metric name: {label value: value}} for this process"""
+        with self._lock:
+            metrics = list(self._metrics)
+        return {metric.name: metric.collect() for metric in metrics}
+
+    def _snapshot_path(self, pid):
+        return os.path.join(self.directory, f'{pid}.json')
+
+    def flush(self, values=None):
+        """Write this process's values to its snapshot file (no-op without a directory)"""
+        if not self.directory:
+            return
+        values = self.collect() if values is None else values
+        snapshot = {name: [[label_value, value] for label_value, value in series.items()]
+                    for name, series in values.items()}
+        path = self._snapshot_path(os.getpid())
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+
+    def ensure_flushing(self):
+        """Start this process's periodic flush thread (once per process, so per forked worker)"""
+        if not self.directory or self.flush_interval <= 0 or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+            self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def _other_snapshots(self):
+        own = f'{os.getpid()}.json'
+        try:
+            names = sorted(os.listdir(self.directory))
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith('.json') or name == own:
+                continue
+            try:
+                with open(os.path.join(self.directory, name), 'r') as f:
+                    yield json.load(f)
+            except (OSError, ValueError):
+                continue
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics)
+        values = {metric.name: metric.collect() for metric in metrics}
+        if self.directory:
+            try:
+                self.flush(values)
+            except OSError:
+                pass
+            merged = {name: dict(series) for name, series in values.items()}
+            by_name = {metric.name: metric for metric in metrics}
+            for snapshot in self._other_snapshots():
+                for name, series in snapshot.items():
+                    metric = by_name.get(name)
+                    if metric is None:
+                        continue
+                    target = merged[name]
+                    for label_value, value in series:
+                        target[label_value] = metric.merge(target[label_value], value) if label_value in target else value
+            values = merged
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render(values[metric.name]))
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry(os.environ.get('METRICS_DIR'), float(os.environ.get('METRICS_FLUSH_INTERVAL', 5)))
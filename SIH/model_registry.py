@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Versioned model registry under trained_models/registry/.
+
+Every published version is an immutable directory holding the model, its
+preprocessing pipeline, metadata and (optionally) the compiled forest,
+plus a manifest.json with the SHA-256 and size of each file:
+
+    registry/<version>/model.joblib
+    registry/<version>/preprocessing.joblib
+    registry/<version>/metadata.json
+    registry/<version>/compiled.npz          (optional)
+    registry/<version>/manifest.json         written last
+    registry/PINNED                          optional, names the served version
+
+Versions are named <UTC timestamp>-<first 8 hex of the model checksum>, so
+they sort by publication time. The served version is the pinned one, or the
+newest when nothing is pinned.
+
+ModelBundle is everything inference needs from one version. The API holds a
+single reference to its current bundle; ModelLoader loads and validates the
+next one on a background thread and swaps the reference, so requests that
+already took the old bundle finish with it.
+
+Run from the SIH directory:
+    python model_registry.py list
+    python model_registry.py publish        # the current trained_models/ files
+    python model_registry.py pin <version>
+    python model_registry.py unpin
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from feature_cache import file_sha256
+from forest_engine import CompiledForest, tree_normalised_proba
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGISTRY_DIR = '../trained_models/registry'
+MANIFEST_VERSION = 1
+# Role -> file name inside a version directory
+FILES = {
+    'model': 'model.joblib',
+    'preprocessing': 'preprocessing.joblib',
+    'metadata': 'metadata.json',
+    'compiled': 'compiled.npz'
+}
+REQUIRED_FILES = ('model', 'metadata')
+PIN_FILE = 'PINNED'
+
+
+class ModelBundle:
+    """A loaded model version: estimator, compiled forest, features and class columns"""
+
+    def __init__(self, model, feature_names, crop_classes, forest=None, version='legacy', metadata=None):
+        self.model = model
+        self.forest = forest
+        self.feature_names = feature_names
+        self.crop_classes = crop_classes
+        self.version = version
+        self.metadata = metadata or {}
+        # How the compiled forest compares with sklearn's predict_proba; set by check_forest
+        self.forest_check = None
+        # crop name -> predict_proba column (model.classes_ order, not crop_classes order)
+        classes = getattr(model, 'classes_', None)
+        if classes is None:
+            classes = crop_classes or []
+        self.class_index = {str(crop): column for column, crop in enumerate(classes)}
+
+    @classmethod
+    def load(cls, model_path, metadata_path=None, compiled_path=None, forest_engine='compiled',
+             version='legacy', check_compiled_mtime=True):
+        """Load a joblib model (a dict with model/feature_names/crop_classes, or a bare
+        estimator plus metadata JSON) and its compiled forest.
+
+        The exported forest arrays are used when present and not older than the
+        model (``check_compiled_mtime``); otherwise the model is flattened in memory.
+        """
+        import joblib
+        import sklearn.ensemble  # noqa: F401  (needed to unpickle the forest)
+
+        model_data = joblib.load(model_path)
+        metadata = {}
+        if metadata_path and os.path.exists(metadata_path):
+            with open(metadata_path, 'r') as f:
+                metadata = json.load(f)
+        if isinstance(model_data, dict):
+            model = model_data.get('model')
+            feature_names = model_data.get('feature_names', [])
+            crop_classes = model_data.get('crop_classes', [])
+        else:
+            model = model_data
+            feature_names = metadata.get('feature_names') if metadata else None
+            crop_classes = metadata.get('crop_classes') if metadata else None
+
+        forest = None
+        if forest_engine == 'compiled' and model is not None:
+            try:
+                fresh = (compiled_path and os.path.exists(compiled_path) and
+                         (not check_compiled_mtime or os.path.getmtime(compiled_path) >= os.path.getmtime(model_path)))
+                if fresh:
+                    forest = CompiledForest.load(compiled_path)
+                if forest is None or list(forest.classes_) != [str(c) for c in model.classes_]:
+                    forest = CompiledForest.from_model(model)
+                    logger.info(f"Flattened {forest.n_estimators} trees in memory"
+                                + (f" (export {compiled_path} to skip this)" if compiled_path else ""))
+                else:
+                    logger.info(f"Compiled forest loaded from {compiled_path}")
+            except Exception as e:
+                logger.error(f"Error preparing compiled forest, using sklearn predict_proba: {e}")
+                forest = None
+        return cls(model, feature_names, crop_classes, forest, version, metadata)
+
+    def predict_proba(self, X):
+        """Class probabilities for a feature matrix, via the compiled forest when available"""
+        if self.forest is not None:
+            return self.forest.predict_proba(X)
+        return self.model.predict_proba(X)
+
+    def validate(self, probe):
+        """Raise ValueError unless the bundle scores ``probe`` (n_rows, n_features) sanely:
+        one finite, non-negative column per class and rows summing to 1. The
+        compiled forest is checked against sklearn first (see check_forest).
+        """
+        if self.model is None:
+            raise ValueError(f"Model version {self.version} has no estimator")
+        if not self.feature_names:
+            raise ValueError(f"Model version {self.version} has no feature names")
+        n_features = getattr(self.model, 'n_features_in_', len(self.feature_names))
+        if n_features != len(self.feature_names):
+            raise ValueError(f"Model version {self.version} expects {n_features} features, "
+                             f"metadata lists {len(self.feature_names)}")
+        self.check_forest(probe)
+        probabilities = np.asarray(self.predict_proba(probe))
+        expected = (len(probe), len(self.class_index))
+        if probabilities.shape != expected:
+            raise ValueError(f"Model version {self.version} returned shape {probabilities.shape}, "
+                             f"expected {expected}")
+        if not np.all(np.isfinite(probabilities)) or np.any(probabilities < 0):
+            raise ValueError(f"Model version {self.version} returned invalid probabilities")
+        if not np.allclose(probabilities.sum(axis=1), 1.0, atol=1e-6):
+            raise ValueError(f"Model version {self.version} returned probabilities that do not sum to 1")
+
+    def check_forest(self, probe):
+        """Compare the compiled forest with the installed sklearn's predict_proba on ``probe``.
+
+        Exact agreement is recorded as 'matches_sklearn'. A pickle from sklearn
+        < 1.4 holds raw leaf counts that newer sklearn averages unnormalised
+        (rows do not sum to 1); when the compiled forest equals the per-tree
+        normalised output the model was trained to give, the difference is
+        served and recorded as 'normalises_leaf_counts'. Any other disagreement
+        drops the compiled forest, so sklearn's predict_proba is served.
+        """
+        if self.forest is None or self.model is None:
+            self.forest_check = None
+            return
+        compiled = self.forest.predict_proba(probe)
+        served = np.asarray(self.model.predict_proba(probe))
+        if np.allclose(compiled, served, rtol=0, atol=1e-9):
+            self.forest_check = 'matches_sklearn'
+        elif (not np.allclose(served.sum(axis=1), 1.0, atol=1e-6)
+              and np.allclose(compiled, tree_normalised_proba(self.model, probe), rtol=0, atol=1e-9)):
+            self.forest_check = 'normalises_leaf_counts'
+            logger.warning(f"Model version {self.version}: installed sklearn returns unnormalised "
+                           f"predict_proba for this pickle (rows sum to {served.sum(axis=1).mean():.2f}); "
+                           f"serving per-tree normalised probabilities from the compiled forest "
+                           f"(FOREST_ENGINE=sklearn serves sklearn's output)")
+        else:
+            logger.error(f"Model version {self.version}: compiled forest differs from sklearn predict_proba "
+                         f"by up to {np.abs(compiled - served).max():.3g}, using sklearn")
+            self.forest = None
+            self.forest_check = 'mismatch'
+
+
+class ModelRegistry:
+    """Directory of immutable model versions plus an optional pin"""
+
+    def __init__(self, root=DEFAULT_REGISTRY_DIR):
+        self.root = root
+
+    def path(self, version, name=None):
+        directory = os.path.join(self.root, version)
+        return os.path.join(directory, name) if name else directory
+
+    def manifest(self, version):
+        """The manifest of ``version``, or None if it is not a complete version"""
+        if not version or os.sep in version or version.startswith('.'):
+            return None
+        try:
+            with open(self.path(version, 'manifest.json'), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def list_versions(self):
+        """Manifests of every complete version, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        manifests = [self.manifest(name) for name in os.listdir(self.root)
+                     if os.path.isdir(self.path(name))]
+        return sorted((m for m in manifests if m), key=lambda m: (m['created'], m['version']))
+
+    def latest(self):
+        versions = self.list_versions()
+        return versions[-1]['version'] if versions else None
+
+    def pinned(self):
+        try:
+            with open(os.path.join(self.root, PIN_FILE), 'r') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def resolve(self):
+        """Version that should be served: the pin if it exists, else the newest"""
+        pinned = self.pinned()
+        if pinned and self.manifest(pinned):
+            return pinned
+        if pinned:
+            logger.warning(f"Pinned model version {pinned} is not in the registry; using the latest")
+        return self.latest()
+
+    def pin(self, version):
+        if not self.manifest(version):
+            raise KeyError(version)
+        self._write_pin(version)
+
+    def unpin(self):
+        self._write_pin('')
+
+    def _write_pin(self, version):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, PIN_FILE)
+        with open(path + '.tmp', 'w') as f:
+            f.write(version + '\n' if version else '')
+        os.replace(path + '.tmp', path)
+
+    def publish(self, files, source=None):
+        """Copy ``files`` (role -> path, see FILES) into a new version and return its name.
+
+        The version is assembled in a staging directory and renamed into place
+        with its manifest already written, so readers never see a partial
+        version. Publishing files identical to an existing version returns
+        that version instead of adding a duplicate.
+        """
+        missing = [role for role in REQUIRED_FILES if not files.get(role) or not os.path.exists(files[role])]
+        if missing:
+            raise FileNotFoundError(f"Cannot publish a model version without {', '.join(missing)}")
+        checksums = {role: file_sha256(path) for role, path in files.items() if path and os.path.exists(path)}
+        for existing in self.list_versions():
+            if {role: entry['sha256'] for role, entry in existing['files'].items()} == checksums:
+                logger.info(f"Model files already published as {existing['version']}")
+                return existing['version']
+
+        created = datetime.now(timezone.utc)
+        version = f"{created.strftime('%Y%m%dT%H%M%S')}-{checksums['model'][:8]}"
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f'.{version}.', dir=self.root)
+        try:
+            entries = {}
+            for role, checksum in checksums.items():
+                target = os.path.join(staging, FILES[role])
+                shutil.copyfile(files[role], target)
+                entries[role] = {'path': FILES[role], 'sha256': checksum, 'bytes': os.path.getsize(target)}
+            manifest = {
+                'version': version,
+                'manifest_version': MANIFEST_VERSION,
+                'created': created.isoformat(),
+                'source': source,
+                'files': entries
+            }
+            with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(staging, self.path(version))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        logger.info(f"Published model version {version} to {self.root}")
+        return version
+
+    def verify(self, version):
+        """Raise ValueError if any file of ``version`` is missing or fails its checksum"""
+        manifest = self.manifest(version)
+        if manifest is None:
+            raise ValueError(f"Model version {version} is not in the registry")
+        for role, entry in manifest['files'].items():
+            path = self.path(version, entry['path'])
+            if not os.path.exists(path) or file_sha256(path) != entry['sha256']:
+                raise ValueError(f"Model version {version}: {entry['path']} failed its checksum")
+        return manifest
+
+    def load_bundle(self, version, forest_engine='compiled'):
+        """Verify and load ``version``; the bundle still needs validate() before serving"""
+        manifest = self.verify(version)
+        files = manifest['files']
+        compiled = self.path(version, files['compiled']['path']) if 'compiled' in files else None
+        # Checksums pin the compiled arrays to this model, so file mtimes do not matter
+        bundle = ModelBundle.load(self.path(version, files['model']['path']),
+                                  self.path(version, files['metadata']['path']),
+                                  compiled, forest_engine, version, check_compiled_mtime=False)
+        bundle.metadata = dict(bundle.metadata, manifest=manifest)
+        return bundle
+
+
+class ModelLoader:
+    """Background thread that keeps the served bundle on the registry's resolved version.
+
+    ``load`` turns a version name into a validated ModelBundle (raising on
+    failure) and ``swap`` installs it; both run on the loader thread, never
+    on a request. The registry is polled every ``interval`` seconds
+    (0 disables polling) and request() triggers an immediate check, e.g.
+    after a pin. A version that failed is not retried by polling until it
+    is requested explicitly.
+    """
+
+    def __init__(self, registry, current_version, load, swap, interval=30.0):
+        self.registry = registry
+        self.current_version = current_version
+        self.load = load
+        self.swap = swap
+        self.interval = interval
+        self.failures = {}
+        self.loading = None
+        self.last_swap = None
+        self._wake = threading.Event()
+        self._retry = False
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_running(self):
+        """Start the thread, including in a process forked after it was started"""
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._wake = threading.Event()
+            self._thread = threading.Thread(target=self._run, name='model-loader', daemon=True)
+            self._thread.start()
+
+    def request(self):
+        """Check the registry now, retrying a version that failed before"""
+        self._retry = True
+        self.ensure_running()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval if self.interval > 0 else None)
+            self._wake.clear()
+            retry, self._retry = self._retry, False
+            try:
+                self.check(retry)
+            except Exception as e:
+                logger.error(f"Model loader error: {e}")
+
+    def check(self, retry=False):
+        """Load and swap in the resolved version if it is not the one being served"""
+        target = self.registry.resolve()
+        if not target or target == self.current_version():
+            return
+        if target in self.failures and not retry:
+            return
+        self.loading = target
+        start = time.perf_counter()
+        try:
+            bundle = self.load(target)
+        except Exception as e:
+            self.failures[target] = str(e)
+            logger.error(f"Model version {target} rejected: {e}")
+            return
+        finally:
+            self.loading = None
+        self.failures.pop(target, None)
+        self.swap(bundle)
+        self.last_swap = {'version': target, 'at': datetime.now().isoformat(),
+                          'load_seconds': round(time.perf_counter() - start, 3)}
+
+    def stats(self):
+        return {
+            'interval': self.interval,
+            'loading': self.loading,
+            'last_swap': self.last_swap,
+            'failures': dict(self.failures)
+        }
+
+
+def main():
+    """List, publish and pin registry versions"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Manage the versioned model registry')
+    parser.add_argument('--registry', default=os.environ.get('MODEL_REGISTRY_DIR', DEFAULT_REGISTRY_DIR))
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help='Show every version, marking the pinned and served ones')
+    publish = commands.add_parser('publish', help='Publish the combined model files from trained_models/')
+    publish.add_argument('--model-dir', default='../trained_models')
+    pin = commands.add_parser('pin', help='Serve a specific version')
+    pin.add_argument('version')
+    commands.add_parser('unpin', help='Serve the newest version again')
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.registry)
+    if args.command == 'publish':
+        d = args.model_dir
+        registry.publish({
+            'model': f'{d}/combined_rf_crop_recommender.joblib',
+            'preprocessing': f'{d}/combined_preprocessing_pipeline.joblib',
+            'metadata': f'{d}/combined_model_metadata.json',
+            'compiled': f'{d}/combined_rf_compiled.npz'
+        }, source=os.path.abspath(d))
+    elif args.command == 'pin':
+        try:
+            registry.pin(args.version)
+        except KeyError:
+            logger.error(f"Unknown model version {args.version}")
+            return
+    elif args.command == 'unpin':
+        registry.unpin()
+
+    served = registry.resolve()
+    pinned = registry.pinned()
+    for manifest in registry.list_versions():
+        version = manifest['version']
+        marks = ' '.join(mark for mark, on in [('served', version == served), ('pinned', version == pinned)] if on)
+        print(f"{version}  {manifest['created']}  {marks}")
+
+
+if __name__ == '__main__':
+    main()
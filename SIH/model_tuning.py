@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Hyperparameter search for the combined crop RandomForest.
+
+Candidates come from a grid or random search over DEFAULT_PARAM_SPACE and are
+scored with stratified k-fold cross-validation. Fold splits and the scaled
+train/validation matrices are built once, saved as .npy files and
+memory-mapped by every worker, so all candidates share them. Each
+(candidate, fold) pair runs in a process pool worker with an optional
+address-space cap. n_estimators is grown in steps with warm_start and stops
+early once validation accuracy has not improved for a few steps.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARAM_SPACE = {
+    'max_depth': [10, 20, None],
+    'min_samples_split': [2, 5, 10],
+    'min_samples_leaf': [1, 2, 4],
+    'max_features': ['sqrt', 0.5]
+}
+TREE_STEP = 25
+MAX_ESTIMATORS = 300
+PATIENCE = 2
+FOLD_ARRAYS = ('X_train', 'y_train', 'X_val', 'y_val')
+
+# Folds already memory-mapped by this worker process, keyed by (directory, fold)
+_worker_folds = {}
+
+
+def candidate_params(param_space=None, search='grid', n_iter=20, seed=42):
+    """List of parameter dicts for a grid or random search"""
+    param_space = param_space or DEFAULT_PARAM_SPACE
+    if search == 'grid':
+        return list(ParameterGrid(param_space))
+    if search == 'random':
+        n_iter = min(n_iter, len(ParameterGrid(param_space)))
+        return list(ParameterSampler(param_space, n_iter=n_iter, random_state=seed))
+    raise ValueError(f"Unknown search type: {search}")
+
+
+class FoldCache:
+    """Stratified folds with per-fold scaled matrices, stored as .npy files.
+
+    The scaler is fitted on each fold's training part only, as in the real
+    pipeline. Workers open the files with mmap_mode='r', so every candidate
+    reads the same pages instead of re-scaling its own copy.
+    """
+
+    def __init__(self, X, y, n_splits=5, seed=42, directory=None):
+        self.classes, codes = np.unique(y, return_inverse=True)
+        self.n_splits = n_splits
+        self.directory = tempfile.mkdtemp(prefix='farmgaze_folds_', dir=directory)
+        X = np.asarray(X, dtype=float)
+        splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+        for fold, (train, val) in enumerate(splitter.split(X, codes)):
+            scaler = StandardScaler().fit(X[train])
+            np.save(self.path(fold, 'X_train'), scaler.transform(X[train]))
+            np.save(self.path(fold, 'y_train'), codes[train])
+            np.save(self.path(fold, 'X_val'), scaler.transform(X[val]))
+            np.save(self.path(fold, 'y_val'), codes[val])
+
+    def path(self, fold, name):
+        return os.path.join(self.directory, f'fold{fold}_{name}.npy')
+
+    def cleanup(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cleanup()
+
+
+def _init_worker(memory_limit_mb):
+    """Cap the worker's address space so one oversized fit fails on its own"""
+    if memory_limit_mb and resource is not None:
+        limit = int(memory_limit_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _load_fold(directory, fold):
+    key = (directory, fold)
+    if key not in _worker_folds:
+        _worker_folds[key] = {
+            name: np.load(os.path.join(directory, f'fold{fold}_{name}.npy'), mmap_mode='r')
+            for name in FOLD_ARRAYS
+        }
+    return _worker_folds[key]
+
+
+def _fit_fold(directory, fold, params, seed, tree_step, max_estimators, patience):
+    """Grow one candidate's forest on one fold; returns the accuracy curve"""
+    started = time.time()
+    try:
+        arrays = _load_fold(directory, fold)
+        model = RandomForestClassifier(n_estimators=tree_step, warm_start=True,
+                                       random_state=seed, n_jobs=1, **params)
+        scores, best, since_best = [], -1.0, 0
+        while model.n_estimators <= max_estimators:
+            model.fit(arrays['X_train'], arrays['y_train'])
+            score = float(np.mean(model.predict(arrays['X_val']) == arrays['y_val']))
+            scores.append(score)
+            if score > best:
+                best, since_best = score, 0
+            else:
+                since_best += 1
+                if since_best >= patience:
+                    break
+            model.n_estimators += tree_step
+        error = None
+    except MemoryError:
+        scores, error = [], 'memory limit exceeded'
+    except Exception as e:
+        scores, error = [], str(e)
+    return {'fold': fold, 'scores': scores, 'error': error,
+            'started': started, 'finished': time.time()}
+
+
+def _summarize(params, fold_results, tree_step):
+    """Mean accuracy curve across folds and the best tree count on it"""
+    wall = max(r['finished'] for r in fold_results) - min(r['started'] for r in fold_results)
+    summary = {'params': params, 'wall_seconds': round(wall, 3),
+               'folds_completed': sum(1 for r in fold_results if not r['error'])}
+    errors = [r['error'] for r in fold_results if r['error']]
+    if errors:
+        summary.update({'n_estimators': None, 'cv_accuracy': None, 'cv_std': None, 'error': errors[0]})
+        return summary
+
+    # Folds that stopped early keep their last score for the remaining steps
+    length = max(len(r['scores']) for r in fold_results)
+    curves = np.array([r['scores'] + [r['scores'][-1]] * (length - len(r['scores']))
+                       for r in fold_results])
+    mean = curves.mean(axis=0)
+    best = int(np.argmax(mean))  # first maximum, i.e. the fewest trees
+    summary.update({
+        'n_estimators': (best + 1) * tree_step,
+        'cv_accuracy': round(float(mean[best]), 4),
+        'cv_std': round(float(curves[:, best].std()), 4),
+        'error': None
+    })
+    return summary
+
+
+def search_hyperparameters(X, y, param_space=None, search='grid', n_iter=20, n_splits=5,
+                           workers=None, memory_limit_mb=None, seed=42, tree_step=TREE_STEP,
+                           max_estimators=MAX_ESTIMATORS, patience=PATIENCE, cache_dir=None):
+    """Cross-validate every candidate in a process pool.
+
+    Returns candidate summaries (params, n_estimators, cv_accuracy, cv_std,
+    wall_seconds, folds_completed, error) sorted best first; candidates with
+    a failed fold sort last.
+    """
+    candidates = candidate_params(param_space, search, n_iter, seed)
+    workers = workers or os.cpu_count() or 1
+    logger.info(f"Tuning {len(candidates)} candidates x {n_splits} folds on {workers} workers")
+
+    start = time.perf_counter()
+    with FoldCache(X, y, n_splits, seed, cache_dir) as folds:
+        fold_results = [[] for _ in candidates]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(memory_limit_mb,)) as pool:
+            futures = {
+                pool.submit(_fit_fold, folds.directory, fold, params, seed,
+                            tree_step, max_estimators, patience): (index, fold)
+                for index, params in enumerate(candidates)
+                for fold in range(n_splits)
+            }
+            for future in as_completed(futures):
+                index, fold = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker died (e.g. killed by the OS), not just the fit
+                    now = time.time()
+                    result = {'fold': fold, 'scores': [], 'error': f'worker failed: {e}',
+                              'started': now, 'finished': now}
+                fold_results[index].append(result)
+                if len(fold_results[index]) == n_splits:
+                    summary = _summarize(candidates[index], fold_results[index], tree_step)
+                    fold_results[index] = summary
+                    if summary['error']:
+                        logger.warning(f"Candidate {summary['params']} failed: {summary['error']}")
+                    else:
+                        logger.info(f"Candidate {summary['params']}: accuracy {summary['cv_accuracy']:.4f} "
+                                    f"+/- {summary['cv_std']:.4f} at {summary['n_estimators']} trees "
+                                    f"({summary['wall_seconds']:.2f}s)")
+
+    results = sorted(fold_results, key=lambda r: (r['error'] is not None, -(r['cv_accuracy'] or 0.0),
+                                                  r['n_estimators'] or 0))
+    logger.info(f"Search finished in {time.perf_counter() - start:.1f}s")
+    return results
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+District-native crop ranking: a bounded, versioned LRU cache for per-request
+results and a vectorised scorer that ranks every (district, season) at once.
+
+Scores follow ImprovedSeasonalCropRecommendationAPI.get_native_crops:
+1.0 if the crop is in the district's historical crops, plus 0.6 times the
+state yield efficiency clipped to [0, 1], plus 0.3 if the season lists it as
+ideal or suitable. Ties are broken by crop name so every path ranks
+identically.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from ranking import top_k_indices
+
+HISTORICAL_WEIGHT = 1.0
+YIELD_WEIGHT = 0.6
+SEASONAL_WEIGHT = 0.3
+
+
+def rank_native_scores(scores, limit=None):
+    """Order a {crop: score} dict by score descending, then crop name"""
+    crops = list(scores)
+    order = top_k_indices(np.fromiter(scores.values(), dtype=float, count=len(crops)),
+                          len(crops) if limit is None else limit, tiebreak=np.array(crops))
+    return [crops[i] for i in order.tolist()]
+
+
+class NativeCropCache:
+    """Thread-safe LRU of native crop lists, tied to an artifact version.
+
+    A lookup or store with a different version than the cache holds drops
+    every entry first, so results computed from old district metadata or
+    yield features are never served after a reload.
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def _check_version(self, version):
+        if version != self.version:
+            if self._entries:
+                self._counters['invalidations'] += 1
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key, version):
+        with self._lock:
+            self._check_version(version)
+            value = self._entries.get(key)
+            if value is None:
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return value
+
+    def put(self, key, value, version):
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+            stats['version'] = self.version
+        return stats
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+def precompute_native_crops(district_index, seasonal_knowledge, state_crop_performance):
+    """Rank native crops for every indexed district and every season.
+
+    ``district_index`` maps (state, district) to records with a
+    'historical_set'; ``seasonal_knowledge`` maps season to its
+    ideal/suitable crop lists; ``state_crop_performance`` is the yield
+    features mapping state -> crop -> stats. Returns
+    {(state, district, season): [crops...]}.
+    """
+    keys = list(district_index)
+    if not keys:
+        return {}
+    states = sorted({state for state, _ in keys})
+    state_codes = {state: code for code, state in enumerate(states)}
+    state_perf = {state: state_crop_performance.get(state, {}) for state in states}
+    seasons = list(seasonal_knowledge)
+    season_crops = {
+        season: set(knowledge.get('ideal_crops', []) + knowledge.get('suitable_crops', []))
+        for season, knowledge in seasonal_knowledge.items()
+    }
+
+    # Crop vocabulary sorted by name: column order doubles as the tie-break
+    vocabulary = set()
+    for key in keys:
+        vocabulary.update(district_index[key]['historical_set'])
+    for crops in season_crops.values():
+        vocabulary.update(crops)
+    for perf in state_perf.values():
+        vocabulary.update(perf)
+    crops = sorted(vocabulary)
+    crop_codes = {crop: code for code, crop in enumerate(crops)}
+    crop_names = np.array(crops, dtype=object)
+
+    historical = np.zeros((len(keys), len(crops)), dtype=bool)
+    for row, key in enumerate(keys):
+        for crop in district_index[key]['historical_set']:
+            historical[row, crop_codes[crop]] = True
+
+    has_perf = np.zeros((len(states), len(crops)), dtype=bool)
+    yield_score = np.zeros((len(states), len(crops)))
+    for state, perf in state_perf.items():
+        for crop in perf:
+            stats = perf[crop]
+            if stats:
+                has_perf[state_codes[state], crop_codes[crop]] = True
+                yield_score[state_codes[state], crop_codes[crop]] = \
+                    min(max(stats.get('yield_efficiency', 0.0), 0.0), 1.0) * YIELD_WEIGHT
+
+    in_season = np.zeros((len(seasons), len(crops)), dtype=bool)
+    for row, season in enumerate(seasons):
+        for crop in season_crops[season]:
+            in_season[row, crop_codes[crop]] = True
+
+    district_states = np.array([state_codes[state] for state, _ in keys])
+    listed_in_state = np.zeros((len(states), len(crops)), dtype=bool)
+    for state, perf in state_perf.items():
+        for crop in perf:
+            listed_in_state[state_codes[state], crop_codes[crop]] = True
+
+    # Additions in the same order as the per-request scorer so floats match
+    base = np.where(historical, HISTORICAL_WEIGHT, 0.0)
+    base = base + np.where(has_perf[district_states], yield_score[district_states], 0.0)
+    candidate_base = historical | listed_in_state[district_states]
+
+    table = {}
+    for season_row, season in enumerate(seasons):
+        scores = base + np.where(in_season[season_row], SEASONAL_WEIGHT, 0.0)
+        candidates = candidate_base | in_season[season_row]
+        counts = candidates.sum(axis=1)
+        # Columns are sorted by crop name, so the default tie-break is the name
+        order = top_k_indices(np.where(candidates, scores, -np.inf), counts.max(initial=0))
+        for row, (state, district) in enumerate(keys):
+            table[(state, district, season)] = crop_names[order[row, :counts[row]]].tolist()
+    return table
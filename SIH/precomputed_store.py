@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Compact binary store for precomputed (state, district, season) crop
+recommendations. The table is a single NumPy structured array that the API
+memory-maps, so every worker process shares one page-cache copy.
+
+Layout of a store directory:
+    CURRENT                 active version hash
+    index-<version>.json    keys, crop/reason vocabularies and table shape
+    table-<version>.npy     structured array, one row per key
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CONFIDENCE_LEVELS = ['low', 'medium', 'high']
+
+# Live API seasons that map onto the coarser offline seasons
+SEASON_ALIASES = {
+    'rabi_early': 'rabi',
+    'rabi_late': 'rabi'
+}
+
+
+def _table_dtype(top_k, max_reasons):
+    return np.dtype([
+        ('crop', '<i2', (top_k,)),
+        ('score', '<f4', (top_k,)),
+        ('confidence', 'u1', (top_k,)),
+        ('reasons', '<i2', (top_k, max_reasons))
+    ])
+
+
+def build_table(recommendations, output_dir):
+    """Encode nested {state: {district: {season: [rec, ...]}}} recommendations.
+
+    Crops and explanation strings are replaced by integer codes into
+    vocabularies stored in the index file. Returns the version hash.
+    """
+    keys = []
+    for state in sorted(recommendations):
+        for district in sorted(recommendations[state]):
+            for season in sorted(recommendations[state][district]):
+                keys.append((state, district, season))
+
+    top_k = 0
+    max_reasons = 0
+    for state, district, season in keys:
+        recs = recommendations[state][district][season]
+        top_k = max(top_k, len(recs))
+        for rec in recs:
+            max_reasons = max(max_reasons, len(rec.get('explanation', [])))
+    max_reasons = max(max_reasons, 1)
+
+    crop_codes = {}
+    reason_codes = {}
+    table = np.zeros(len(keys), dtype=_table_dtype(top_k, max_reasons))
+    table['crop'] = -1
+    table['reasons'] = -1
+
+    for row, (state, district, season) in enumerate(keys):
+        for slot, rec in enumerate(recommendations[state][district][season]):
+            table['crop'][row, slot] = crop_codes.setdefault(rec['crop'], len(crop_codes))
+            table['score'][row, slot] = rec.get('probability', 0.0)
+            table['confidence'][row, slot] = CONFIDENCE_LEVELS.index(rec.get('confidence', 'low'))
+            for r, reason in enumerate(rec.get('explanation', [])):
+                table['reasons'][row, slot, r] = reason_codes.setdefault(reason, len(reason_codes))
+
+    index = {
+        'keys': keys,
+        'crops': list(crop_codes),
+        'reasons': list(reason_codes),
+        'top_k': top_k,
+        'max_reasons': max_reasons
+    }
+    index_bytes = json.dumps(index, sort_keys=True).encode()
+    version = hashlib.sha256(index_bytes + table.tobytes()).hexdigest()[:16]
+    index['version'] = version
+
+    os.makedirs(output_dir, exist_ok=True)
+    np.save(os.path.join(output_dir, f'table-{version}.npy'), table)
+    with open(os.path.join(output_dir, f'index-{version}.json'), 'w') as f:
+        json.dump(index, f)
+
+    # Switch CURRENT atomically so running workers never see a partial write
+    current_tmp = os.path.join(output_dir, 'CURRENT.tmp')
+    with open(current_tmp, 'w') as f:
+        f.write(version)
+    os.replace(current_tmp, os.path.join(output_dir, 'CURRENT'))
+
+    logger.info(f"Precomputed table {version}: {len(keys)} keys, {len(crop_codes)} crops, "
+                f"{len(reason_codes)} reasons")
+    return version
+
+
+class PrecomputedRecommendations:
+    """Read-only, memory-mapped view of a precomputed recommendation table"""
+
+    def __init__(self, table, index):
+        self.table = table
+        self.version = index['version']
+        self.crops = index['crops']
+        self.reasons = index['reasons']
+        self.row_index = {tuple(key): row for row, key in enumerate(index['keys'])}
+
+    @classmethod
+    def load(cls, directory):
+        """Load the CURRENT version from a store directory, or return None"""
+        current_path = os.path.join(directory, 'CURRENT')
+        if not os.path.exists(current_path):
+            return None
+        with open(current_path) as f:
+            version = f.read().strip()
+        with open(os.path.join(directory, f'index-{version}.json')) as f:
+            index = json.load(f)
+        table = np.load(os.path.join(directory, f'table-{version}.npy'), mmap_mode='r')
+        return cls(table, index)
+
+    def __len__(self):
+        return len(self.row_index)
+
+    def lookup(self, state, district, season, top_k=5):
+        """Return recommendations for a key, or None if it is not in the table"""
+        row = self.row_index.get((state, district, season))
+        if row is None and season in SEASON_ALIASES:
+            row = self.row_index.get((state, district, SEASON_ALIASES[season]))
+        if row is None:
+            return None
+
+        record = self.table[row]
+        predictions = []
+        for slot in range(min(top_k, len(record['crop']))):
+            crop_code = int(record['crop'][slot])
+            if crop_code < 0:
+                break
+            explanation = [self.reasons[r] for r in record['reasons'][slot] if r >= 0]
+            predictions.append({
+                'crop': self.crops[crop_code],
+                'probability': round(float(record['score'][slot]), 6),
+                'confidence': CONFIDENCE_LEVELS[int(record['confidence'][slot])],
+                'season_suitable': season,
+                'suitability_reason': '; '.join(explanation),
+                'explanation': explanation
+            })
+        return predictions
@@ -4,29 +4,164 @@ Process crop yield data to extract district-level statistics for enhanced crop r
 This script processes the crop_yield.csv file to generate district-specific crop performance metrics.
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 import logging
 import os
 import json
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
 from collections import defaultdict
 
+from yield_feature_store import write_store
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Crops whose yield-efficiency columns are always present in the enhanced metadata
+MAJOR_CROPS = ['Rice', 'Wheat', 'Maize', 'Sugarcane', 'Cotton', 'Groundnut', 'Chickpea']
+
+# Explicit column types for crop_yield.csv; State/Crop/Season repeat heavily
+CROP_YIELD_DTYPES = {
+    'Crop': 'category',
+    'Crop_Year': 'int16',
+    'Season': 'category',
+    'State': 'category',
+    'Area': 'float64',
+    'Production': 'float64',
+    'Annual_Rainfall': 'float64',
+    'Fertilizer': 'float64',
+    'Pesticide': 'float64',
+    'Yield': 'float64'
+}
+
+# Columns of the district-level done.csv used by the pipeline
+DISTRICT_YIELD_COLUMNS = {
+    'State Name': 'str',
+    'Dist Name': 'str',
+    'TOTAL FERTILISER CONSUMPTION (tons)': 'float64',
+    'TOTAL PRODUCTION': 'float64',
+    'TOTAL YIELD': 'float64'
+}
+
+def yield_efficiency_column(crop):
+    """Column name for a crop's yield efficiency, e.g. 'Arhar/Tur' -> 'arhar_tur_yield_efficiency'"""
+    return re.sub(r'[^0-9a-z]+', '_', str(crop).strip().lower()).strip('_') + '_yield_efficiency'
+
+class RunningAggregates:
+    """Mergeable per-group statistics accumulated chunk by chunk.
+    
+    For the ``moment`` column each group keeps count, mean, M2 (sum of squared
+    deviations), min and max, combined across chunks with Chan et al.'s
+    parallel form of Welford's update. ``sum_columns`` keep running sums and
+    ``mean_columns`` keep sums and non-null counts. Memory is bounded by the
+    number of groups, not the number of rows.
+    """
+    
+    def __init__(self, keys, moment, sum_columns=(), mean_columns=()):
+        self.keys = list(keys)
+        self.moment = moment
+        self.sum_columns = list(sum_columns)
+        self.mean_columns = list(mean_columns)
+        self.rows = 0
+        self.table = None
+    
+    def update(self, chunk):
+        """Fold one DataFrame chunk into the running statistics"""
+        grouped = chunk.groupby(self.keys, observed=True, sort=False)
+        values = grouped[self.moment]
+        part = pd.DataFrame({
+            'n': values.count(),
+            'mean': values.mean(),
+            'm2': values.var(ddof=0) * values.count(),
+            'min': values.min(),
+            'max': values.max()
+        })
+        for column in self.sum_columns:
+            part[f'sum_{column}'] = grouped[column].sum()
+        for column in self.mean_columns:
+            part[f'sum_{column}'] = grouped[column].sum()
+            part[f'n_{column}'] = grouped[column].count()
+        part[['mean', 'm2']] = part[['mean', 'm2']].fillna(0.0)
+        
+        self.rows += len(chunk)
+        self.table = part if self.table is None else self._combine(self.table, part)
+    
+    @staticmethod
+    def _combine(a, b):
+        """Chan et al. pairwise combination of two aligned partial tables"""
+        index = a.index.union(b.index)
+        a = a.reindex(index)
+        b = b.reindex(index)
+        extreme = {'min': np.inf, 'max': -np.inf}
+        a = a.fillna({c: extreme.get(c, 0.0) for c in a.columns})
+        b = b.fillna({c: extreme.get(c, 0.0) for c in b.columns})
+        
+        n = a['n'] + b['n']
+        delta = b['mean'] - a['mean']
+        weight_b = (b['n'] / n.where(n > 0)).fillna(0.0)
+        
+        combined = a + b
+        combined['mean'] = a['mean'] + delta * weight_b
+        combined['m2'] = a['m2'] + b['m2'] + delta ** 2 * a['n'] * weight_b
+        combined['min'] = np.fmin(a['min'], b['min'])
+        combined['max'] = np.fmax(a['max'], b['max'])
+        return combined
+    
+    def collapse(self, keys):
+        """Combine groups down to a coarser key, e.g. (State, Season, Crop) -> (State, Crop)"""
+        table = self.table
+        grouped = table.groupby(level=keys, sort=True)
+        n = grouped['n'].sum()
+        mean = (table['mean'] * table['n']).groupby(level=keys, sort=True).sum() / n.where(n > 0)
+        spread = table['n'] * (table['mean'] - mean.reindex(table.droplevel(
+            [k for k in self.keys if k not in keys]).index).values) ** 2
+        
+        collapsed = grouped.sum()
+        collapsed['mean'] = mean.fillna(0.0)
+        collapsed['m2'] = grouped['m2'].sum() + spread.groupby(level=keys, sort=True).sum()
+        collapsed['min'] = grouped['min'].min()
+        collapsed['max'] = grouped['max'].max()
+        
+        result = RunningAggregates(keys, self.moment, self.sum_columns, self.mean_columns)
+        result.rows = self.rows
+        result.table = collapsed
+        return result
+    
+    def finalize(self):
+        """Return a flat DataFrame with count, mean, std (ddof=1), min, max, sums and means"""
+        table = self.table.sort_index()
+        n = table['n']
+        result = pd.DataFrame({
+            'count': n.astype('int64'),
+            'mean': table['mean'].where(n > 0),
+            'std': np.sqrt(table['m2'] / (n - 1).where(n > 1)),
+            'min': table['min'].replace([np.inf, -np.inf], np.nan),
+            'max': table['max'].replace([np.inf, -np.inf], np.nan)
+        })
+        for column in self.sum_columns:
+            result[f'sum_{column}'] = table[f'sum_{column}']
+        for column in self.mean_columns:
+            result[f'mean_{column}'] = table[f'sum_{column}'] / table[f'n_{column}'].where(table[f'n_{column}'] > 0)
+        return result.reset_index()
+
 class CropYieldDataProcessor:
     """Process crop yield data to extract district-level statistics"""
     
     def __init__(self):
         self.district_yield_stats = {}
         self.crop_performance_by_district = {}
+        self.stage_report = []
         
     def load_crop_yield_data(self, file_path='crop_yield.csv'):
         """Load crop yield data from CSV file"""
         try:
             if os.path.exists(file_path):
-                df = pd.read_csv(file_path)
+                df = pd.read_csv(file_path, dtype=CROP_YIELD_DTYPES)
                 logger.info(f"Loaded crop yield data with {len(df)} rows")
                 return df
             else:
@@ -36,6 +171,59 @@ class CropYieldDataProcessor:
             logger.error(f"Error loading crop yield data: {e}")
             return None
     
+    def stream_crop_yield_data(self, file_path='crop_yield.csv', chunksize=100000):
+        """Stream crop_yield.csv in chunks into running (State, Season, Crop) aggregates"""
+        try:
+            if not os.path.exists(file_path):
+                logger.error(f"Crop yield data file not found at {file_path}")
+                return None
+            aggregates = RunningAggregates(
+                ['State', 'Season', 'Crop'], 'Yield',
+                sum_columns=['Area', 'Production'],
+                mean_columns=['Annual_Rainfall', 'Fertilizer', 'Pesticide']
+            )
+            # Keys stay plain strings: per-chunk categoricals would not share categories
+            dtypes = {c: ('str' if t == 'category' else t) for c, t in CROP_YIELD_DTYPES.items()}
+            for chunk in pd.read_csv(file_path, dtype=dtypes, chunksize=chunksize):
+                aggregates.update(chunk)
+            logger.info(f"Streamed crop yield data with {aggregates.rows} rows "
+                        f"into {len(aggregates.table)} groups")
+            return aggregates
+        except Exception as e:
+            logger.error(f"Error streaming crop yield data: {e}")
+            return None
+    
+    def stream_district_yield_data(self, file_path='done.csv', chunksize=100000):
+        """Stream the district-level done.csv into per-district yield statistics"""
+        try:
+            if not os.path.exists(file_path):
+                logger.warning(f"District yield data not found at {file_path}")
+                return None
+            aggregates = RunningAggregates(
+                ['State Name', 'Dist Name'], 'TOTAL YIELD',
+                sum_columns=['TOTAL PRODUCTION'],
+                mean_columns=['TOTAL FERTILISER CONSUMPTION (tons)']
+            )
+            for chunk in pd.read_csv(file_path, usecols=list(DISTRICT_YIELD_COLUMNS),
+                                     dtype=DISTRICT_YIELD_COLUMNS, chunksize=chunksize):
+                aggregates.update(chunk)
+            logger.info(f"Streamed district yield data with {aggregates.rows} rows "
+                        f"for {len(aggregates.table)} districts")
+            
+            stats = aggregates.finalize()
+            return pd.DataFrame({
+                'state': stats['State Name'],
+                'district': stats['Dist Name'],
+                'district_avg_yield': stats['mean'],
+                'district_yield_std': stats['std'],
+                'district_total_production': stats['sum_TOTAL PRODUCTION'],
+                'district_avg_fertiliser': stats['mean_TOTAL FERTILISER CONSUMPTION (tons)'],
+                'district_record_count': stats['count']
+            })
+        except Exception as e:
+            logger.error(f"Error streaming district yield data: {e}")
+            return None
+    
     def extract_state_district_mapping(self, district_meta_path='district_meta.csv'):
         """Extract state-district mapping from district metadata"""
         try:
@@ -55,11 +243,18 @@ class CropYieldDataProcessor:
             return {}
     
     def process_yield_data(self, df_yield):
-        """Process yield data to extract district-level statistics"""
+        """Process yield data to extract district-level statistics.
+        
+        ``df_yield`` is either the full DataFrame or RunningAggregates from
+        stream_crop_yield_data; both produce the same two tables.
+        """
         logger.info("Processing crop yield data...")
         
+        if isinstance(df_yield, RunningAggregates):
+            return self._stats_from_aggregates(df_yield)
+        
         # Group by State and Crop to get average yield statistics
-        state_crop_stats = df_yield.groupby(['State', 'Crop']).agg({
+        state_crop_stats = df_yield.groupby(['State', 'Crop'], observed=True).agg({
             'Yield': ['mean', 'std', 'max', 'min', 'count'],
             'Area': 'sum',
             'Production': 'sum',
@@ -77,7 +272,7 @@ class CropYieldDataProcessor:
         state_crop_stats['yield_efficiency'] = state_crop_stats['total_production'] / state_crop_stats['total_area']
         
         # Group by State, Season, and Crop for seasonal analysis
-        seasonal_stats = df_yield.groupby(['State', 'Season', 'Crop']).agg({
+        seasonal_stats = df_yield.groupby(['State', 'Season', 'Crop'], observed=True).agg({
             'Yield': ['mean', 'std'],
             'Area': 'sum',
             'Production': 'sum'
@@ -97,9 +292,155 @@ class CropYieldDataProcessor:
         
         return state_crop_stats, seasonal_stats
     
+    def _stats_from_aggregates(self, aggregates):
+        """Build state_crop_stats and seasonal_stats from streamed aggregates"""
+        state_crop = aggregates.collapse(['State', 'Crop']).finalize()
+        state_crop_stats = pd.DataFrame({
+            'State': state_crop['State'],
+            'Crop': state_crop['Crop'],
+            'avg_yield': state_crop['mean'],
+            'yield_std': state_crop['std'],
+            'max_yield': state_crop['max'],
+            'min_yield': state_crop['min'],
+            'record_count': state_crop['count'],
+            'total_area': state_crop['sum_Area'],
+            'total_production': state_crop['sum_Production'],
+            'avg_rainfall': state_crop['mean_Annual_Rainfall'],
+            'avg_fertilizer': state_crop['mean_Fertilizer'],
+            'avg_pesticide': state_crop['mean_Pesticide']
+        })
+        state_crop_stats['yield_efficiency'] = state_crop_stats['total_production'] / state_crop_stats['total_area']
+        
+        seasonal = aggregates.finalize()
+        seasonal_stats = pd.DataFrame({
+            'State': seasonal['State'],
+            'Season': seasonal['Season'],
+            'Crop': seasonal['Crop'],
+            'seasonal_avg_yield': seasonal['mean'],
+            'seasonal_yield_std': seasonal['std'],
+            'seasonal_area': seasonal['sum_Area'],
+            'seasonal_production': seasonal['sum_Production']
+        })
+        seasonal_stats['seasonal_yield_efficiency'] = (
+            seasonal_stats['seasonal_production'] / seasonal_stats['seasonal_area']
+        )
+        
+        logger.info(f"Processed yield statistics for {len(state_crop_stats)} state-crop combinations")
+        logger.info(f"Processed seasonal statistics for {len(seasonal_stats)} state-season-crop combinations")
+        
+        return state_crop_stats, seasonal_stats
+    
+    def load_and_process(self, crop_yield_path='crop_yield.csv'):
+        """Load the yield CSV and return (state_crop_stats, seasonal_stats), or None"""
+        df_yield = self.load_crop_yield_data(crop_yield_path)
+        if df_yield is None:
+            return None
+        return self.process_yield_data(df_yield)
+    
+    @contextmanager
+    def _stage(self, name):
+        """Record wall time and peak traced memory for one pipeline stage"""
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            self.stage_report.append({'stage': name, 'seconds': elapsed, 'peak_mb': peak / 1e6})
+            logger.info(f"Stage {name}: {elapsed:.3f} s, peak {peak / 1e6:.1f} MB")
+    
+    def run_pipeline(self, crop_yield_path='crop_yield.csv', district_meta_path='district_meta.csv',
+                     enhanced_meta_path='enhanced_district_meta.csv',
+                     yield_stats_path='../trained_models/yield_statistics.json',
+                     features_path='../trained_models/crop_yield_features.json',
+                     district_yield_path='done.csv', chunksize=None):
+        """Load and aggregate the yield data once and write every output from it.
+        
+        Produces the enhanced district metadata, yield_statistics.json and
+        crop_yield_features.json, reporting wall time and peak memory per stage.
+        With ``chunksize`` the yield CSV is streamed into running aggregates
+        instead of being read whole. The district-level ``district_yield_path``
+        (done.csv) is always streamed and merged when present.
+        """
+        self.stage_report = []
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        try:
+            with self._stage('load'):
+                if chunksize:
+                    df_yield = self.stream_crop_yield_data(crop_yield_path, chunksize)
+                else:
+                    df_yield = self.load_crop_yield_data(crop_yield_path)
+            if df_yield is None:
+                return False
+            
+            with self._stage('aggregate'):
+                stats = self.process_yield_data(df_yield)
+            del df_yield
+            
+            with self._stage('district_yield'):
+                district_stats = self.stream_district_yield_data(district_yield_path, chunksize or 100000)
+            
+            with self._stage('enhance_district_meta'):
+                success1 = self.enhance_district_meta_with_yield(
+                    district_meta_path, enhanced_meta_path,
+                    yield_stats_path=yield_stats_path, stats=stats,
+                    district_stats=district_stats
+                )
+            
+            with self._stage('crop_yield_features'):
+                success2 = self.generate_crop_recommendation_features(features_path, stats=stats)
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+        
+        total = sum(stage['seconds'] for stage in self.stage_report)
+        logger.info(f"{'Stage':<24}{'Wall time (s)':>14}{'Peak memory (MB)':>18}")
+        for stage in self.stage_report:
+            logger.info(f"{stage['stage']:<24}{stage['seconds']:>14.3f}{stage['peak_mb']:>18.1f}")
+        logger.info(f"{'total':<24}{total:>14.3f}")
+        
+        return success1 and success2
+    
+    def build_state_yield_columns(self, state_crop_stats):
+        """Pivot state-crop statistics into one yield-efficiency column per crop.
+        
+        Returns a DataFrame indexed by State. The MAJOR_CROPS columns come first
+        and are always present; every other crop in the data follows in name order.
+        """
+        pivot = state_crop_stats.pivot_table(
+            index='State', columns='Crop', values='yield_efficiency', aggfunc='first', observed=True
+        )
+        pivot.columns = [yield_efficiency_column(crop) for crop in pivot.columns]
+        # Crop names that differ only in case/punctuation share a column
+        pivot = pivot.T.groupby(level=0, sort=False).first().T
+        
+        major_columns = [yield_efficiency_column(crop) for crop in MAJOR_CROPS]
+        other_columns = sorted(c for c in pivot.columns if c not in major_columns)
+        return pivot.reindex(columns=major_columns + other_columns)
+    
+    def add_yield_columns(self, df_district, state_crop_stats):
+        """Merge per-crop state yield efficiency onto district rows (0.0 when unknown)"""
+        yield_columns = self.build_state_yield_columns(state_crop_stats)
+        df_district = df_district.merge(yield_columns, how='left', left_on='state', right_index=True)
+        df_district[yield_columns.columns] = df_district[yield_columns.columns].fillna(0.0)
+        logger.info(f"Added {len(yield_columns.columns)} crop yield efficiency columns")
+        return df_district
+    
     def enhance_district_meta_with_yield(self, district_meta_path='district_meta.csv', 
-                                        output_path='enhanced_district_meta.csv'):
-        """Enhance district metadata with crop yield statistics"""
+                                        output_path='enhanced_district_meta.csv',
+                                        crop_yield_path='crop_yield.csv',
+                                        yield_stats_path='../trained_models/yield_statistics.json',
+                                        stats=None, district_stats=None):
+        """Enhance district metadata with crop yield statistics.
+        
+        ``stats`` is an optional (state_crop_stats, seasonal_stats) pair from
+        process_yield_data; when given the yield CSV is not read again.
+        ``district_stats`` from stream_district_yield_data adds per-district
+        yield columns from done.csv.
+        """
         logger.info("Enhancing district metadata with crop yield statistics...")
         
         # Load district metadata
@@ -111,50 +452,18 @@ class CropYieldDataProcessor:
         logger.info(f"Loaded district metadata for {len(df_district)} districts")
         
         # Load and process crop yield data
-        df_yield = self.load_crop_yield_data()
-        if df_yield is None:
-            return False
-            
-        state_crop_stats, seasonal_stats = self.process_yield_data(df_yield)
+        if stats is None:
+            stats = self.load_and_process(crop_yield_path)
+            if stats is None:
+                return False
+        state_crop_stats, seasonal_stats = stats
         
-        # Add yield statistics to district metadata
-        # We'll add average yield efficiency for major crops in each state
-        major_crops = ['Rice', 'Wheat', 'Maize', 'Sugarcane', 'Cotton', 'Groundnut', 'Chickpea']
+        # Add the state's yield efficiency for every crop as district columns
+        df_district = self.add_yield_columns(df_district, state_crop_stats)
         
-        # Create dictionaries for quick lookup
-        state_yield_dict = {}
-        for _, row in state_crop_stats.iterrows():
-            state = row['State']
-            crop = row['Crop']
-            if state not in state_yield_dict:
-                state_yield_dict[state] = {}
-            state_yield_dict[state][crop] = {
-                'avg_yield': row['avg_yield'],
-                'yield_efficiency': row['yield_efficiency'],
-                'yield_std': row['yield_std']
-            }
-        
-        # Add new columns to district metadata
-        df_district['rice_yield_efficiency'] = 0.0
-        df_district['wheat_yield_efficiency'] = 0.0
-        df_district['maize_yield_efficiency'] = 0.0
-        df_district['sugarcane_yield_efficiency'] = 0.0
-        df_district['cotton_yield_efficiency'] = 0.0
-        df_district['groundnut_yield_efficiency'] = 0.0
-        df_district['chickpea_yield_efficiency'] = 0.0
-        
-        # Populate yield efficiency data
-        for idx, row in df_district.iterrows():
-            state = row['state']
-            if state in state_yield_dict:
-                crop_data = state_yield_dict[state]
-                df_district.at[idx, 'rice_yield_efficiency'] = crop_data.get('Rice', {}).get('yield_efficiency', 0.0)
-                df_district.at[idx, 'wheat_yield_efficiency'] = crop_data.get('Wheat', {}).get('yield_efficiency', 0.0)
-                df_district.at[idx, 'maize_yield_efficiency'] = crop_data.get('Maize', {}).get('yield_efficiency', 0.0)
-                df_district.at[idx, 'sugarcane_yield_efficiency'] = crop_data.get('Sugarcane', {}).get('yield_efficiency', 0.0)
-                df_district.at[idx, 'cotton_yield_efficiency'] = crop_data.get('Cotton', {}).get('yield_efficiency', 0.0)
-                df_district.at[idx, 'groundnut_yield_efficiency'] = crop_data.get('Groundnut', {}).get('yield_efficiency', 0.0)
-                df_district.at[idx, 'chickpea_yield_efficiency'] = crop_data.get('Chickpea', {}).get('yield_efficiency', 0.0)
+        # Add district-level yield history where done.csv covers the district
+        if district_stats is not None:
+            df_district = df_district.merge(district_stats, how='left', on=['state', 'district'])
         
         # Save enhanced district metadata
         df_district.to_csv(output_path, index=False)
@@ -165,23 +474,31 @@ class CropYieldDataProcessor:
             'state_crop_stats': state_crop_stats.to_dict('records'),
             'seasonal_stats': seasonal_stats.to_dict('records')
         }
+        if district_stats is not None:
+            yield_stats_output['district_stats'] = district_stats.to_dict('records')
         
-        with open('../trained_models/yield_statistics.json', 'w') as f:
+        with open(yield_stats_path, 'w') as f:
             json.dump(yield_stats_output, f, indent=2)
-        logger.info("Yield statistics saved to trained_models/yield_statistics.json")
+        logger.info(f"Yield statistics saved to {yield_stats_path}")
         
         return True
     
-    def generate_crop_recommendation_features(self, output_path='../trained_models/crop_yield_features.json'):
-        """Generate features from crop yield data for use in recommendation system"""
+    def generate_crop_recommendation_features(self, output_path='../trained_models/crop_yield_features.json',
+                                              crop_yield_path='crop_yield.csv', stats=None,
+                                              store_dir='../trained_models/crop_yield_features'):
+        """Generate features from crop yield data for use in recommendation system.
+        
+        Writes the columnar store read by the API (see yield_feature_store) and
+        a compact JSON copy of the same features for the training script.
+        """
         logger.info("Generating crop recommendation features from yield data...")
         
         # Load and process crop yield data
-        df_yield = self.load_crop_yield_data()
-        if df_yield is None:
-            return False
-            
-        state_crop_stats, seasonal_stats = self.process_yield_data(df_yield)
+        if stats is None:
+            stats = self.load_and_process(crop_yield_path)
+            if stats is None:
+                return False
+        state_crop_stats, seasonal_stats = stats
         
         # Create features for the recommendation system
         features = {
@@ -226,13 +543,22 @@ class CropYieldDataProcessor:
         
         # Save features
         with open(output_path, 'w') as f:
-            json.dump(features, f, indent=2)
+            json.dump(features, f)
         logger.info(f"Crop yield features saved to {output_path}")
         
+        write_store(state_crop_stats.to_dict('records'), seasonal_stats.to_dict('records'), store_dir)
+        
         return True
 
 def main():
     """Main function to process crop yield data"""
+    parser = argparse.ArgumentParser(description='Process crop yield data into district and model features')
+    parser.add_argument('--crop-yield', default='crop_yield.csv', help='State/season/crop yield CSV')
+    parser.add_argument('--district-yield', default='done.csv', help='District-level yield CSV')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='Stream the yield CSV in chunks of this many rows')
+    args = parser.parse_args()
+    
     logger.info("Starting crop yield data processing...")
     
     processor = CropYieldDataProcessor()
@@ -240,13 +566,14 @@ def main():
     # Create trained_models directory if it doesn't exist
     os.makedirs('../trained_models', exist_ok=True)
     
-    # Enhance district metadata with yield statistics
-    success1 = processor.enhance_district_meta_with_yield()
-    
-    # Generate features for recommendation system
-    success2 = processor.generate_crop_recommendation_features()
+    # Load and aggregate once, then write every output
+    success = processor.run_pipeline(
+        crop_yield_path=args.crop_yield,
+        district_yield_path=args.district_yield,
+        chunksize=args.chunksize
+    )
     
-    if success1 and success2:
+    if success:
         logger.info("Crop yield data processing completed successfully!")
     else:
         logger.error("Crop yield data processing failed!")
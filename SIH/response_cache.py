@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Response cache for /predict.
+
+Entries are the serialized JSON body plus a strong ETag (a digest of the
+body), addressed by the normalized request, the weather cache cell, the
+served model version and the artifact version. Each entry expires
+when the weather it was computed from stops being fresh, so a cached
+answer never outlives its weather.
+
+Two tiers:
+- an in-process LRU bounded by entry count and total body bytes, keyed
+  by the key tuple itself, so a lookup hashes no bytes;
+- optionally, a memory-mapped file of fixed-size slots shared by every
+  process that opens it (pre-fork workers inherit the mapping). A slot is
+  picked by Python's hash of the key, so it is only shared by processes
+  forked from the one that created the cache (they share the hash seed),
+  and overwritten on collision. Writers lock the slot's byte range with
+  fcntl.lockf and skip slots that already hold the entry; readers take no
+  lock and use a sequence counter (odd while a write is in progress) to
+  discard torn reads. Put the file on tmpfs (/dev/shm): on a disk-backed
+  file first writes allocate blocks and dirty pages are written back,
+  which shows up as millisecond stalls.
+
+Shared keys carry a per-instance namespace, so entries left in the shared
+file by an earlier server run or a pre-reload generation never match.
+"""
+
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# seq, shared key, expires (epoch seconds), body digest, body length
+SLOT_HEADER = struct.Struct('<Q16sd16sI')
+SLOT_HEADER_SIZE = 64
+DIGEST_SIZE = 16
+HASH_MASK = (1 << 64) - 1
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).digest()
+
+
+class SharedSlots:
+    """Direct-mapped table of fixed-size slots in a shared, memory-mapped file"""
+
+    def __init__(self, path, slots=1024, slot_size=16384):
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.capacity = slot_size - SLOT_HEADER_SIZE
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = slots * slot_size
+        if os.fstat(self._fd).st_size != size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        # lockf locks belong to the process, so threads also need this one
+        self._lock = threading.Lock()
+
+    def _offset(self, key):
+        return int.from_bytes(key[:8], 'little') % self.slots * self.slot_size
+
+    def get(self, key, now):
+        """(body, body digest, expires) for ``key`` if its slot holds it unexpired, else None"""
+        offset = self._offset(key)
+        seq, slot_key, expires, etag, length = SLOT_HEADER.unpack_from(self._map, offset)
+        if seq & 1 or slot_key != key or expires <= now or length > self.capacity:
+            return None
+        start = offset + SLOT_HEADER_SIZE
+        body = self._map[start:start + length]
+        if struct.unpack_from('<Q', self._map, offset)[0] != seq:
+            # Overwritten while we copied it
+            return None
+        return body, etag, expires
+
+    def put(self, key, body, etag, expires):
+        """Store an entry, replacing whatever shared its slot; False if the body does not fit"""
+        if len(body) > self.capacity:
+            return False
+        offset = self._offset(key)
+        seq, slot_key, slot_expires, slot_etag, _ = SLOT_HEADER.unpack_from(self._map, offset)
+        if not seq & 1 and slot_key == key and slot_etag == etag and slot_expires >= expires:
+            # Another worker already stored this body at least as long
+            return True
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self.slot_size, offset)
+            try:
+                seq = struct.unpack_from('<Q', self._map, offset)[0]
+                # Odd while writing; a writer that died mid-write left it odd
+                writing = (seq + 1) | 1
+                struct.pack_into('<Q', self._map, offset, writing)
+                start = offset + SLOT_HEADER_SIZE
+                self._map[start:start + len(body)] = body
+                SLOT_HEADER.pack_into(self._map, offset, writing + 1, key, expires, etag, len(body))
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self.slot_size, offset)
+        return True
+
+
+class ResponseCache:
+    """Thread-safe LRU of serialized responses with per-entry expiry and ETags"""
+
+    def __init__(self, max_entries=4096, max_bytes=64 * 1024 * 1024, shared_path=None,
+                 shared_slots=1024, slot_size=16384):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.namespace = os.urandom(8)
+        self._entries = OrderedDict()  # key -> (body, body digest, expires)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0,
+                          'expired': 0, 'not_modified': 0}
+        self.shared = None
+        if shared_path:
+            try:
+                self.shared = SharedSlots(shared_path, shared_slots, slot_size)
+            except OSError as e:
+                logger.error(f"Shared response cache unavailable at {shared_path}, using per-process only: {e}")
+
+    @staticmethod
+    def key(parts):
+        """Cache key for a tuple of hashable parts (str, numbers, None, nested tuples)"""
+        return tuple(parts)
+
+    def shared_key(self, key):
+        """16-byte slot key: the 64-bit hash of ``key`` and this cache's namespace.
+
+        Hashing the tuple costs a fraction of a byte digest of it; a false match
+        needs two live keys with the same 64-bit hash.
+        """
+        return (hash((self.namespace, key)) & HASH_MASK).to_bytes(8, 'little') + self.namespace
+
+    @staticmethod
+    def etag(body_digest):
+        return body_digest.hex()
+
+    def get(self, key):
+        """(body bytes, etag) for a live entry, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] > now:
+                    self._entries.move_to_end(key)
+                    self._counters['hits'] += 1
+                    return entry[0], self.etag(entry[1])
+                self._discard(key)
+                self._counters['expired'] += 1
+            if self.shared is None:
+                self._counters['misses'] += 1
+                return None
+        entry = self.shared.get(self.shared_key(key), now)
+        with self._lock:
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['shared_hits'] += 1
+            self._store(key, entry)
+        return entry[0], self.etag(entry[1])
+
+    def put(self, key, body, ttl):
+        """Cache ``body`` for ``ttl`` seconds and return its etag"""
+        body_digest = _digest(body)
+        if ttl > 0:
+            entry = (body, body_digest, time.time() + ttl)
+            with self._lock:
+                self._counters['stores'] += 1
+                self._store(key, entry)
+            if self.shared is not None:
+                self.shared.put(self.shared_key(key), body, body_digest, entry[2])
+        return self.etag(body_digest)
+
+    def _store(self, key, entry):
+        if len(entry[0]) > self.max_bytes:
+            return
+        self._discard(key)
+        self._entries[key] = entry
+        self._bytes += len(entry[0])
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (body, _, _) = self._entries.popitem(last=False)
+            self._bytes -= len(body)
+            self._counters['evictions'] += 1
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+    def not_modified(self):
+        with self._lock:
+            self._counters['not_modified'] += 1
+
+    def clear(self):
+        """Drop the in-process entries (shared slots expire on their own)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+            stats['bytes'] = self._bytes
+        stats['max_entries'] = self.max_entries
+        stats['max_bytes'] = self.max_bytes
+        stats['shared'] = self.shared.path if self.shared is not None else None
+        return stats
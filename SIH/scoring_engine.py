@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Table-driven knowledge-based crop scoring.
+
+The seasonal rules of get_seasonal_crop_recommendations are held as arrays:
+per-season weather thresholds for ideal and suitable crops, a state x crop
+regional boost matrix, and state x crop yield statistics with tiered boosts.
+A request's score depends only on its season, top_k, state, which weather
+rules hold and which candidates the district grew historically; distinct
+combinations in a batch are scored as one (rows, candidates) NumPy pass and
+memoised, and reason strings are generated only for the top_k crops that
+are returned. Season candidate tables and the per state x crop boosts are
+built once at construction; a handful of combinations (a single /predict)
+is scored in plain Python, where NumPy's per-call overhead would dominate.
+
+Bonuses are added in the same order as the original if/elif chains so the
+scores, and therefore the rankings, are bit-for-bit identical.
+"""
+
+import itertools
+
+import numpy as np
+
+from ranking import top_k_indices
+
+IDEAL_BASE_SCORE = 0.8
+SUITABLE_BASE_SCORE = 0.6
+HISTORICAL_BOOST = 0.15
+
+# Ideal crops: each satisfied condition adds its weight. Ranges are
+# inclusive; None means unbounded on that side.
+IDEAL_WEATHER_RULES = {
+    'kharif': [('temperature', 25, 35, 0.1), ('rainfall', 500, None, 0.1), ('humidity', 70, None, 0.05)],
+    'rabi_early': [('temperature', 10, 20, 0.1), ('rainfall', None, 300, 0.1), ('humidity', None, 60, 0.05)],
+    'rabi_late': [('temperature', 15, 25, 0.1), ('rainfall', None, 200, 0.1), ('humidity', None, 50, 0.05)],
+    'zaid': [('temperature', 30, None, 0.1), ('rainfall', None, 200, 0.1), ('humidity', None, 50, 0.05)],
+    'perennial': [('temperature', 20, 35, 0.1), ('rainfall', 750, 2500, 0.1), ('humidity', 60, 80, 0.05)]
+}
+
+# Suitable crops: one bonus when temperature and rainfall are both in range
+SUITABLE_WEATHER_RULES = {
+    'kharif': ((25, None), (500, None), 0.1),
+    'rabi_early': ((10, 20), (None, 300), 0.1),
+    'rabi_late': ((15, 25), (None, 200), 0.1),
+    'zaid': ((30, None), (None, 200), 0.1),
+    'perennial': ((20, 35), (750, None), 0.1)
+}
+
+REGIONAL_CROPS = {
+    'Maharashtra': ['cotton', 'sugarcane', 'soybean'],
+    'Punjab': ['wheat', 'rice'],
+    'Karnataka': ['cotton', 'sugarcane'],
+    'Tamil Nadu': ['rice', 'sugarcane'],
+    'Uttar Pradesh': ['wheat', 'rice', 'sugarcane'],
+    'Chhattisgarh': ['rice', 'pearl_millet', 'chickpea', 'groundnut', 'sugarcane'],
+    'Madhya Pradesh': ['rice', 'pearl_millet', 'chickpea', 'groundnut', 'sugarcane']
+}
+REGIONAL_BOOST = 0.1
+
+# Yield efficiency tiers (strictly greater than), first match wins; crops
+# with state yield data below every tier get the floor boost
+YIELD_TIERS = np.array([0.5, 0.3])
+YIELD_TIER_BOOSTS = np.array([0.2, 0.1])
+YIELD_FLOOR_BOOST = 0.05
+AVG_YIELD_THRESHOLD = 1.0
+AVG_YIELD_BOOST = 0.1
+
+
+class SeasonalScoringEngine:
+    """Scores seasonal crop candidates for many requests at once.
+
+    ``seasonal_knowledge`` is the API's season -> {ideal_crops, suitable_crops}
+    mapping, ``state_crop_performance`` the yield features' state -> crop ->
+    stats mapping, and ``reason_fn(crop, season, weather_data)`` builds the
+    suitability reason for returned crops.
+    """
+
+    # Bound on memoised ranked rows before the memo is reset
+    MAX_RANKED = 65536
+    # Up to this many distinct combinations per season are scored without NumPy
+    SCALAR_MAX_ROWS = 8
+
+    def __init__(self, seasonal_knowledge, state_crop_performance, reason_fn, version=None):
+        self.seasonal_knowledge = seasonal_knowledge
+        self.reason_fn = reason_fn
+        self.version = version
+
+        crops = set()
+        for knowledge in seasonal_knowledge.values():
+            crops.update(knowledge.get('ideal_crops', []))
+            crops.update(knowledge.get('suitable_crops', []))
+        self.crops = sorted(crops)
+        self.crop_codes = {crop: code for code, crop in enumerate(self.crops)}
+
+        # Row 0 is the "unknown state" row: no boosts, no yield data
+        states = sorted(set(REGIONAL_CROPS) | set(state_crop_performance))
+        self.state_codes = {state: code + 1 for code, state in enumerate(states)}
+        shape = (len(states) + 1, len(self.crops))
+        self.regional = np.zeros(shape, dtype=bool)
+        for state, regional_crops in REGIONAL_CROPS.items():
+            for crop in regional_crops:
+                if crop in self.crop_codes:
+                    self.regional[self.state_codes[state], self.crop_codes[crop]] = True
+
+        self.has_yield = np.zeros(shape, dtype=bool)
+        self.yield_efficiency = np.zeros(shape)
+        self.avg_yield = np.zeros(shape)
+        # Original values (int 0 default included) echoed in responses
+        self._yield_values = {}
+        for state in state_crop_performance:
+            performance = state_crop_performance[state]
+            for crop in self.crops:
+                if crop in performance:
+                    stats = performance[crop]
+                    row, col = self.state_codes[state], self.crop_codes[crop]
+                    efficiency = stats.get('yield_efficiency', 0)
+                    self.has_yield[row, col] = True
+                    self.yield_efficiency[row, col] = efficiency
+                    self.avg_yield[row, col] = stats.get('avg_yield', 0)
+                    self._yield_values[(state, crop)] = efficiency
+
+        # Per state row and crop code: (regional, yield tier, average yield) boosts,
+        # zero where they do not apply, as Python floats for the scalar path
+        tier = np.full(shape, YIELD_FLOOR_BOOST)
+        for threshold, boost in zip(YIELD_TIERS[::-1], YIELD_TIER_BOOSTS[::-1]):
+            tier = np.where(self.yield_efficiency > threshold, boost, tier)
+        self.tier_boost = np.where(self.has_yield, tier, 0.0)
+        self.avg_boost = np.where(self.has_yield & (self.avg_yield > AVG_YIELD_THRESHOLD), AVG_YIELD_BOOST, 0.0)
+        regional_boost = np.where(self.regional, REGIONAL_BOOST, 0.0)
+        self._boosts = [list(zip(regional, tiers, avgs)) for regional, tiers, avgs in
+                        zip(regional_boost.tolist(), self.tier_boost.tolist(), self.avg_boost.tolist())]
+
+        # Season -> (crops, ideal flags, crop codes, ideal flags array). The
+        # candidates for top_k are ideal[:2k] then suitable to fill 2k, which
+        # is the first 2k entries of ideal + suitable.
+        self._seasons = {}
+        # Season -> state row -> boosts of each candidate, in candidate order
+        self._season_boosts = {}
+        # Season -> weather bits -> (ideal, suitable) score before the state boosts
+        self._season_starts = {}
+        for season, knowledge in seasonal_knowledge.items():
+            ideal = list(knowledge.get('ideal_crops', []))
+            suitable = list(knowledge.get('suitable_crops', []))
+            crops = ideal + suitable
+            is_ideal = [True] * len(ideal) + [False] * len(suitable)
+            codes = [self.crop_codes[crop] for crop in crops]
+            self._seasons[season] = (crops, is_ideal, np.array(codes, dtype=np.intp), np.array(is_ideal, dtype=bool))
+            self._season_boosts[season] = [[boosts[code] for code in codes] for boosts in self._boosts]
+            self._season_starts[season] = self._weather_starts(season)
+
+        # (season, top_k, state row, weather bits, grown bits) -> ranked columns
+        self._ranked = {}
+
+    @staticmethod
+    def _weather_starts(season):
+        """{weather bits: (ideal start, suitable start)} for every combination of the season's rules.
+
+        Satisfied ideal weights are added one by one, in rule order, exactly as
+        score() adds them (an unsatisfied rule adds 0.0, which changes nothing).
+        """
+        ideal_rules = IDEAL_WEATHER_RULES.get(season, [])
+        rule = SUITABLE_WEATHER_RULES.get(season)
+        starts = {}
+        for bits in itertools.product((False, True), repeat=len(ideal_rules) + (rule is not None)):
+            ideal_score = IDEAL_BASE_SCORE
+            for (_, _, _, weight), holds in zip(ideal_rules, bits):
+                if holds:
+                    ideal_score += weight
+            suitable_score = SUITABLE_BASE_SCORE
+            if rule is not None and bits[len(ideal_rules)]:
+                suitable_score += rule[2]
+            starts[bits] = (ideal_score, suitable_score)
+        return starts
+
+    def _season_candidates(self, season, top_k):
+        """Candidate crops and ideal flags: ideal[:2k], then suitable to fill 2k"""
+        crops, is_ideal, _, _ = self._seasons[season]
+        return crops[:top_k * 2], is_ideal[:top_k * 2]
+
+    @staticmethod
+    def weather_bits(season, weather_data):
+        """Which weather rules hold: one flag per ideal rule, then the suitable rule"""
+        bits = []
+        for field, low, high, _ in IDEAL_WEATHER_RULES.get(season, []):
+            value = weather_data[field]
+            bits.append((low is None or value >= low) and (high is None or value <= high))
+        rule = SUITABLE_WEATHER_RULES.get(season)
+        if rule is not None:
+            (t_low, t_high), (r_low, r_high) = rule[0], rule[1]
+            temp, rainfall = weather_data['temperature'], weather_data['rainfall']
+            bits.append((t_low is None or temp >= t_low) and (t_high is None or temp <= t_high)
+                        and (r_low is None or rainfall >= r_low) and (r_high is None or rainfall <= r_high))
+        return tuple(bits)
+
+    def score(self, season, top_k, state_rows, weather_bits, grown):
+        """Score a season's candidates for many rows in one pass.
+
+        ``state_rows`` are state codes, ``weather_bits`` a (rows, rules)
+        bool array from weather_bits() and ``grown`` a (rows, candidates)
+        bool array of historically grown crops. Returns the (rows,
+        candidates) score matrix.
+        """
+        _, _, codes, is_ideal = self._seasons[season]
+        codes, is_ideal = codes[:top_k * 2], is_ideal[:top_k * 2]
+        state_rows = np.asarray(state_rows, dtype=np.intp)
+        weather_bits = np.asarray(weather_bits, dtype=bool).reshape(len(state_rows), -1)
+
+        scores = np.where(is_ideal, IDEAL_BASE_SCORE, SUITABLE_BASE_SCORE) * np.ones((len(state_rows), 1))
+        ideal_rules = IDEAL_WEATHER_RULES.get(season, [])
+        for i, (_, _, _, weight) in enumerate(ideal_rules):
+            scores = scores + np.where(is_ideal & weather_bits[:, i:i + 1], weight, 0.0)
+        rule = SUITABLE_WEATHER_RULES.get(season)
+        if rule is not None:
+            suitable_ok = weather_bits[:, len(ideal_rules):len(ideal_rules) + 1]
+            scores = scores + np.where(~is_ideal & suitable_ok, rule[2], 0.0)
+
+        scores = scores + np.where(self.regional[state_rows][:, codes], REGIONAL_BOOST, 0.0)
+        scores = scores + np.where(grown, HISTORICAL_BOOST, 0.0)
+        scores = scores + self.tier_boost[state_rows][:, codes]
+        scores = scores + self.avg_boost[state_rows][:, codes]
+        return scores
+
+    def score_row(self, season, top_k, state_row, weather_bits, grown):
+        """score() for one row in plain Python, adding bonuses in the same order"""
+        ideal_start, suitable_start = self._season_starts[season][weather_bits]
+        scores = []
+        # grown has one flag per top_k candidate, so zip stops there
+        for ideal, (regional, tier, avg), was_grown in zip(self._seasons[season][1],
+                                                           self._season_boosts[season][state_row], grown):
+            score = (ideal_start if ideal else suitable_start) + regional
+            if was_grown:
+                score += HISTORICAL_BOOST
+            scores.append(score + tier + avg)
+        return scores
+
+    def _rank(self, season, top_k, keys):
+        """Score and rank distinct keys of one season; returns and memoises {key: ranked}"""
+        crops, is_ideal = self._season_candidates(season, top_k)
+        if len(keys) <= self.SCALAR_MAX_ROWS:
+            scores = [self.score_row(season, top_k, key[2], key[3], key[4]) for key in keys]
+            probability = [[score if score < 1.0 else 1.0 for score in row] for row in scores]
+            # Stable, so ties keep candidate order as top_k_indices does
+            order = [sorted(range(len(row)), key=row.__getitem__, reverse=True) for row in probability]
+        else:
+            state_rows = [key[2] for key in keys]
+            weather_bits = [key[3] for key in keys]
+            grown = np.array([key[4] for key in keys], dtype=bool).reshape(len(keys), len(crops))
+            scores = self.score(season, top_k, state_rows, weather_bits, grown)
+            probability = np.minimum(scores, 1.0)
+            # The whole 2 * top_k pool is ranked so callers can ask for more than top_k
+            order = top_k_indices(probability, len(crops)).tolist()
+            scores, probability = scores.tolist(), probability.tolist()
+
+        ranked_keys = {}
+        for key, row_order, row_scores, row_probability in zip(keys, order, scores, probability):
+            ranked = []
+            for col in row_order:
+                score = row_scores[col]
+                if is_ideal[col]:
+                    confidence = 'high' if score > 0.9 else 'medium' if score > 0.7 else 'low'
+                else:
+                    confidence = 'medium' if score > 0.7 else 'low'
+                ranked.append((crops[col], row_probability[col], confidence, key[4][col]))
+            ranked_keys[key] = ranked
+        if len(self._ranked) + len(ranked_keys) > self.MAX_RANKED:
+            self._ranked.clear()
+        self._ranked.update(ranked_keys)
+        return ranked_keys
+
+    def _key(self, season, top_k, weather_data, state, historical):
+        crops = self._seasons[season][0][:top_k * 2]
+        return (season, top_k, self.state_codes.get(state, 0), self.weather_bits(season, weather_data),
+                tuple([crop in historical for crop in crops]))
+
+    def recommend(self, season, weather_data, state, historical, top_k=5, limit=None):
+        """recommend_batch() for a single request, without the batch bookkeeping"""
+        if season not in self._seasons:
+            return []
+        key = self._key(season, top_k, weather_data, state, historical)
+        ranked = self._ranked.get(key)
+        if ranked is None:
+            ranked = self._rank(season, top_k, [key])[key]
+        return self._build(ranked, season, weather_data, state, top_k if limit is None else limit)
+
+    def recommend_batch(self, rows, top_k=5, limit=None):
+        """Recommendations for many requests.
+
+        ``rows`` is a list of (season, weather_data, state, historical_set).
+        Rows are reduced to the inputs the rules can see, distinct ones are
+        scored per season in one NumPy pass, and recommendation dicts with
+        reasons are built for the top_k only. Returns one list per row, in
+        input order, sorted by probability (ties keep candidate order).
+        ``limit`` returns more of the ranked 2 * top_k candidate pool, e.g. for
+        re-ranking against model probabilities.
+        """
+        if len(rows) == 1:
+            return [self.recommend(*rows[0], top_k, limit)]
+        limit = top_k if limit is None else limit
+        keys = []
+        ranked = {}
+        missing = {}
+        for season, weather_data, state, historical in rows:
+            if season not in self._seasons:
+                keys.append(None)
+                continue
+            key = self._key(season, top_k, weather_data, state, historical)
+            keys.append(key)
+            if key not in ranked:
+                known = self._ranked.get(key)
+                if known is not None:
+                    ranked[key] = known
+                else:
+                    missing.setdefault(season, {})[key] = None
+        for season, season_keys in missing.items():
+            ranked.update(self._rank(season, top_k, list(season_keys)))
+
+        results = []
+        reasons = {}
+        for key, (season, weather_data, state, _) in zip(keys, rows):
+            if key is None:
+                results.append([])
+                continue
+            results.append(self._build(ranked[key], season, weather_data, state, limit, reasons))
+        return results
+
+    def _build(self, ranked, season, weather_data, state, limit, reasons=None):
+        """Recommendation dicts for the first ``limit`` ranked crops.
+
+        ``reasons`` memoises reason strings across the rows of a batch; a single
+        row has no repeats to share.
+        """
+        recommendations = []
+        weather_key = (weather_data['temperature'], weather_data['humidity'], weather_data['rainfall'])
+        # Read-only and identical for every crop of the row, so built once
+        weather_factors = {
+            'temperature': weather_data['temperature'],
+            'humidity': weather_data['humidity'],
+            'rainfall_forecast': weather_data['rainfall']
+        }
+        for crop, probability, confidence, grown in ranked[:limit]:
+            if reasons is None:
+                reason = self.reason_fn(crop, season, weather_data)
+            else:
+                reason_key = (crop, season) + weather_key
+                reason = reasons.get(reason_key)
+                if reason is None:
+                    reason = reasons[reason_key] = self.reason_fn(crop, season, weather_data)
+            recommendations.append({
+                'crop': crop,
+                'probability': probability,
+                'confidence': confidence,
+                'season_suitable': season,
+                'weather_factors': weather_factors,
+                'suitability_reason': reason,
+                'district_historical': grown,
+                'yield_efficiency': self._yield_values.get((state, crop), 0)
+            })
+        return recommendations
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Pre-fork production server for the crop recommendation API.
+
+The master process binds the listening socket and loads the model, district
+index and yield features once. It then calls gc.freeze() and forks the
+workers, so they share those pages copy-on-write. Each worker runs a
+Werkzeug WSGI server on the inherited socket; the kernel spreads
+connections across the workers.
+
+The master supervises the workers:
+- A worker that dies unexpectedly is replaced.
+- SIGHUP, or a change to any file under trained_models/ (cache/ and
+  registry/ aside), triggers a graceful reload. The master loads a fresh API instance first;
+  if that fails, the old workers keep serving. Otherwise a new generation
+  of workers is forked and the old ones are asked to finish their
+  in-flight requests and exit.
+- SIGTERM or SIGINT stops every worker the same graceful way.
+
+Model versions from the registry (model_registry.py) are swapped in by each
+worker's own background loader instead, without a reload; a pin made
+through one worker is picked up by the others on their next registry poll.
+
+Each worker keeps its own metrics. They are written to METRICS_DIR (by
+default a directory per server run under the system temp dir) so /metrics
+on whichever worker answers reports the sum over all workers; see metrics.py.
+
+Run from the SIH directory: python serve_production.py [--workers 4] [--port 5003]
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import tempfile
+import threading
+import time
+
+os.environ.setdefault('API_STARTUP_MODE', 'lazy')
+# Read by metrics at import time
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), f'farmgaze-metrics-{os.getpid()}'))
+
+import improved_seasonal_api  # noqa: E402
+from improved_seasonal_api import WeatherService, app  # noqa: E402
+from metrics import REGISTRY  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ARTIFACT_DIR = '../trained_models'
+# Generated caches that change without a new model, and the model registry,
+# whose versions and pins each worker's ModelLoader swaps in by itself
+IGNORED_ARTIFACT_DIRS = {'cache', 'registry'}
+# Seconds an old worker gets to finish in-flight requests before SIGKILL
+GRACEFUL_TIMEOUT = 30
+
+
+def artifact_fingerprint(directory=ARTIFACT_DIR):
+    """(path, mtime, size) of every artifact file, to notice retrains"""
+    entries = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_ARTIFACT_DIRS)
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(entries)
+
+
+def clear_metric_snapshots():
+    """Drop worker metric snapshots left by an earlier server run"""
+    directory = REGISTRY.directory
+    if not directory or not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if name.endswith('.json') or name.endswith('.json.tmp'):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def load_api():
+    """A fully loaded API instance, or None if its artifacts failed to load"""
+    api = improved_seasonal_api.ImprovedSeasonalCropRecommendationAPI(startup_mode='lazy')
+    api.ensure_loaded()
+    if api.load_error:
+        logger.error(f"API artifacts failed to load: {api.load_error}")
+        return None
+    return api
+
+
+def run_worker(listener, host, port, threaded, access_log):
+    """Serve requests on the inherited socket until SIGTERM; never returns"""
+    server = make_server(host, port, app, threaded=threaded, fd=listener.fileno())
+    if not access_log:
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    def stop(signum, frame):
+        # shutdown() waits for serve_forever, so it cannot run in this thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        # Keep this worker's counts in the server-wide totals after it exits
+        try:
+            REGISTRY.flush()
+        except OSError as e:
+            logger.error(f"Could not write final metrics snapshot: {e}")
+        os._exit(0)
+
+
+class Master:
+    """Forks and supervises worker generations"""
+
+    def __init__(self, args):
+        self.args = args
+        self.workers = {}  # pid -> generation
+        self.generation = 0
+        self.stopping = False
+        self.reload_requested = False
+        self.listener = None
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.listener, self.args.host, self.args.port, self.args.threaded, self.args.access_log)
+        self.workers[pid] = self.generation
+        return pid
+
+    def spawn_generation(self):
+        self.generation += 1
+        # Keep the loaded artifacts out of the collector so forked pages stay shared
+        gc.collect()
+        gc.freeze()
+        for _ in range(self.args.workers):
+            self.spawn()
+        logger.info(f"Generation {self.generation}: {self.args.workers} workers "
+                    f"{sorted(pid for pid, gen in self.workers.items() if gen == self.generation)}")
+
+    def stop_workers(self, pids):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT
+        remaining = set(pids)
+        while remaining and time.monotonic() < deadline:
+            remaining = {pid for pid in remaining if not self.reap(pid)}
+            time.sleep(0.05)
+        for pid in remaining:
+            logger.warning(f"Worker {pid} did not stop in {GRACEFUL_TIMEOUT}s; killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                # Exited and was reaped in the meantime
+                pass
+            self.workers.pop(pid, None)
+
+    def reap(self, pid):
+        """True once ``pid`` has exited (and is forgotten)"""
+        try:
+            done, _ = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            done = pid
+        if done:
+            self.workers.pop(pid, None)
+        return bool(done)
+
+    def reload(self, reason):
+        logger.info(f"Reloading ({reason})...")
+        gc.unfreeze()
+        api = load_api()
+        if api is None:
+            logger.error("Reload aborted; the current workers keep serving")
+            gc.freeze()
+            return
+        improved_seasonal_api.api = api
+        WeatherService._snapshot = None
+        if WeatherService.mode == 'snapshot':
+            WeatherService.get_snapshot()
+        old = [pid for pid, gen in self.workers.items() if gen == self.generation]
+        self.spawn_generation()
+        self.stop_workers(old)
+        logger.info(f"Reload complete; generation {self.generation} serving")
+
+    def run(self):
+        args = self.args
+        self.listener = socket.create_server((args.host, args.port), backlog=args.backlog)
+        self.listener.set_inheritable(True)
+        clear_metric_snapshots()
+
+        start = time.perf_counter()
+        api = load_api()
+        if api is None:
+            return 1
+        improved_seasonal_api.api = api
+        if WeatherService.mode == 'snapshot':
+            WeatherService.get_snapshot()
+        logger.info(f"Artifacts loaded in {time.perf_counter() - start:.2f}s; "
+                    f"serving on {args.host}:{args.port}")
+
+        def request_stop(signum, frame):
+            self.stopping = True
+
+        def request_reload(signum, frame):
+            self.reload_requested = True
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGHUP, request_reload)
+
+        fingerprint = artifact_fingerprint()
+        last_check = time.monotonic()
+        self.spawn_generation()
+        while not self.stopping:
+            time.sleep(0.2)
+            # Replace current-generation workers that died
+            for pid, gen in list(self.workers.items()):
+                if self.reap(pid) and gen == self.generation and not self.stopping:
+                    logger.warning(f"Worker {pid} exited unexpectedly; starting a replacement")
+                    self.spawn()
+            if self.reload_requested:
+                self.reload_requested = False
+                self.reload('SIGHUP')
+                fingerprint = artifact_fingerprint()
+            elif args.reload_interval > 0 and time.monotonic() - last_check >= args.reload_interval:
+                last_check = time.monotonic()
+                current = artifact_fingerprint()
+                if current != fingerprint:
+                    fingerprint = current
+                    self.reload('artifacts changed')
+
+        logger.info("Shutting down workers...")
+        self.stop_workers(list(self.workers))
+        self.listener.close()
+        clear_metric_snapshots()
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-fork production server for the crop recommendation API')
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5003)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_WORKERS', os.cpu_count() or 1)))
+    parser.add_argument('--threaded', action='store_true',
+                        help='Handle requests on a thread each inside every worker')
+    parser.add_argument('--backlog', type=int, default=1024)
+    parser.add_argument('--reload-interval', type=float, default=5.0,
+                        help='Seconds between checks of trained_models/ for changes (0 disables)')
+    parser.add_argument('--access-log', action='store_true', help='Log every request')
+    args = parser.parse_args()
+    raise SystemExit(Master(args).run())
+
+
+if __name__ == '__main__':
+    main()
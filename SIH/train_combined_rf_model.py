@@ -10,32 +10,75 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.metrics import classification_report, accuracy_score, confusion_matrix
+import argparse
 import joblib
 import json
 import logging
 from datetime import datetime
 import os
 
+from feature_cache import DEFAULT_CACHE_DIR, FeatureMatrixCache, feature_cache_key, file_sha256
+from forest_engine import export_forest
+from model_registry import ModelRegistry
+from model_tuning import search_hyperparameters
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def rebase_tree_thresholds(model, old_mean, old_scale, new_mean, new_scale):
+    """Move split thresholds of fitted trees from one StandardScaler space to another.
+
+    A split x_scaled <= t on (x - old_mean) / old_scale is the same split as
+    (t * old_scale + old_mean - new_mean) / new_scale on the new scaling, so
+    the existing trees keep routing raw inputs exactly as before.
+    """
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        split = tree.feature >= 0
+        feature = tree.feature[split]
+        threshold = tree.threshold
+        threshold[split] = (threshold[split] * old_scale[feature] + old_mean[feature]
+                            - new_mean[feature]) / new_scale[feature]
+
+
+# Crops a district's historical list may name instead of the label
+SIMILAR_CROPS = {
+    'rice': ['rice', 'paddy'],
+    'wheat': ['wheat'],
+    'maize': ['maize', 'corn'],
+    'cotton': ['cotton'],
+    'sugarcane': ['sugarcane'],
+    'groundnut': ['groundnut', 'peanut'],
+    'chickpea': ['chickpea', 'gram'],
+    'pearl_millet': ['pearl_millet', 'bajra']
+}
+YIELD_FEATURE_COLUMNS = ['state_avg_yield', 'state_yield_efficiency', 'state_yield_std']
+
+
 class CombinedCropRecommendationTrainer:
     """Trains a Random Forest model on combined agricultural datasets"""
     
-    def __init__(self):
+    def __init__(self, seed=42):
         self.model = None
         self.label_encoders = {}
         self.scaler = StandardScaler()
         self.feature_names = []
         self.crop_classes = []
+        self.tuning_results = None
+        self.lineage = None
+        self.requirements_path = 'crop_requirements.csv'
+        self.meta_path = 'district_meta.csv'
+        self.yield_features_path = '../trained_models/crop_yield_features.json'
+        # Seeds the season/district sampling so features are reproducible
+        self.seed = seed
         
     def load_and_combine_datasets(self):
         """Load and combine all three datasets"""
         logger.info("Loading and combining datasets...")
         
         # Load crop_requirements.csv (N, P, K, etc. features)
-        requirements_path = 'crop_requirements.csv'
+        requirements_path = self.requirements_path
         if os.path.exists(requirements_path):
             df_requirements = pd.read_csv(requirements_path)
             logger.info(f"Loaded crop_requirements.csv with {len(df_requirements)} rows")
@@ -44,7 +87,7 @@ class CombinedCropRecommendationTrainer:
             return None
             
         # Load district_meta.csv for district information
-        meta_path = 'district_meta.csv'
+        meta_path = self.meta_path
         if os.path.exists(meta_path):
             df_meta = pd.read_csv(meta_path)
             logger.info(f"Loaded district_meta.csv with {len(df_meta)} rows")
@@ -53,7 +96,7 @@ class CombinedCropRecommendationTrainer:
             return None
             
         # Load crop_yield features if available
-        yield_features_path = '../trained_models/crop_yield_features.json'
+        yield_features_path = self.yield_features_path
         if os.path.exists(yield_features_path):
             import json
             with open(yield_features_path, 'r') as f:
@@ -84,40 +127,24 @@ class CombinedCropRecommendationTrainer:
         """Engineer district-level features for better recommendations"""
         logger.info("Engineering district-level features...")
         
+        rng = np.random.RandomState(self.seed)
+        
         # Add seasonal information
         seasons = ['kharif', 'rabi_early', 'rabi_late', 'zaid', 'perennial']
-        df_base['season'] = np.random.choice(seasons, size=len(df_base))
-        
-        # Add district information by sampling from meta
-        districts_sample = df_meta.sample(n=len(df_base), replace=True)
-        df_base['state'] = districts_sample['state'].values
-        df_base['district'] = districts_sample['district'].values
-        
-        # Add district-specific crop ratios based on historical crops
-        def get_district_crop_ratio(district_crops, crop_label):
-            crops_list = district_crops.split(',') if isinstance(district_crops, str) else []
-            if crop_label in crops_list:
-                return 1.0
-            # Check if it's a similar crop
-            similar_crops = {
-                'rice': ['rice', 'paddy'],
-                'wheat': ['wheat'],
-                'maize': ['maize', 'corn'],
-                'cotton': ['cotton'],
-                'sugarcane': ['sugarcane'],
-                'groundnut': ['groundnut', 'peanut'],
-                'chickpea': ['chickpea', 'gram'],
-                'pearl_millet': ['pearl_millet', 'bajra']
-            }
-            for similar in similar_crops.get(crop_label, []):
-                if similar in crops_list:
-                    return 0.7
-            return 0.3
-            
-        df_base['district_crop_ratio'] = [
-            get_district_crop_ratio(district_crops, crop_label) 
-            for district_crops, crop_label in zip(districts_sample['historical_crops'], df_base['label'])
-        ]
+        df_base['season'] = rng.choice(seasons, size=len(df_base))
+        
+        # Add district information by sampling meta rows (same draw as
+        # df_meta.sample(n=len(df_base), replace=True, random_state=rng))
+        district_rows = rng.choice(len(df_meta), size=len(df_base), replace=True)
+        df_base['state'] = df_meta['state'].to_numpy()[district_rows]
+        df_base['district'] = df_meta['district'].to_numpy()[district_rows]
+        
+        # District-specific crop ratio: 1.0 if the district grows the crop,
+        # 0.7 if it grows a synonym, else 0.3. Scored once per
+        # (district, crop) pair, then gathered for every row.
+        label_codes, labels = pd.factorize(df_base['label'])
+        ratio = self.district_crop_ratio_matrix(df_meta['historical_crops'], labels)
+        df_base['district_crop_ratio'] = ratio[district_rows, label_codes]
         
         # Add crop yield efficiency features if available
         if hasattr(self, 'yield_features') and self.yield_features:
@@ -125,27 +152,45 @@ class CombinedCropRecommendationTrainer:
             
             # Add state-level crop performance features
             state_crop_performance = self.yield_features.get('state_crop_performance', {})
-            
-            # Initialize new columns with default values
-            df_base['state_avg_yield'] = 0.0
-            df_base['state_yield_efficiency'] = 0.0
-            df_base['state_yield_std'] = 0.0
-            
-            # Populate yield features for each row
-            for idx, row in df_base.iterrows():
-                state = row['state']
-                crop = row['label']
-                
-                if state in state_crop_performance and crop in state_crop_performance[state]:
-                    crop_stats = state_crop_performance[state][crop]
-                    df_base.at[idx, 'state_avg_yield'] = crop_stats.get('avg_yield', 0.0)
-                    df_base.at[idx, 'state_yield_efficiency'] = crop_stats.get('yield_efficiency', 0.0)
-                    df_base.at[idx, 'state_yield_std'] = crop_stats.get('yield_std', 0.0)
+            performance = pd.DataFrame(
+                [
+                    (state, crop,
+                     crop_stats.get('avg_yield', 0.0),
+                     crop_stats.get('yield_efficiency', 0.0),
+                     crop_stats.get('yield_std', 0.0))
+                    for state, crops in state_crop_performance.items()
+                    for crop, crop_stats in crops.items()
+                ],
+                columns=['state', 'label'] + YIELD_FEATURE_COLUMNS
+            )
+            # Left merge keeps row order; pairs without stats stay 0.0
+            merged = df_base[['state', 'label']].merge(performance, how='left', on=['state', 'label'])
+            for column in YIELD_FEATURE_COLUMNS:
+                df_base[column] = merged[column].fillna(0.0).to_numpy(dtype=float)
         
         return df_base
     
-    def prepare_features(self, df):
-        """Prepare features for training"""
+    @staticmethod
+    def district_crop_ratio_matrix(historical_crops, labels):
+        """[district, crop] matrix of district_crop_ratio values for the given labels"""
+        vocabulary = {crop: code for code, crop in enumerate(labels)}
+        grown = np.zeros((len(historical_crops), len(labels)), dtype=bool)
+        grown_similar = np.zeros_like(grown)
+        # Synonym -> labels it stands in for, resolved once for this label set
+        synonym_labels = {}
+        for crop in labels:
+            for similar in SIMILAR_CROPS.get(crop, []):
+                synonym_labels.setdefault(similar, []).append(vocabulary[crop])
+        for row, crops in enumerate(historical_crops):
+            for crop in (crops.split(',') if isinstance(crops, str) else []):
+                if crop in vocabulary:
+                    grown[row, vocabulary[crop]] = True
+                for code in synonym_labels.get(crop, []):
+                    grown_similar[row, code] = True
+        return np.where(grown, 1.0, np.where(grown_similar, 0.7, 0.3))
+    
+    def prepare_features(self, df, fit_encoders=True):
+        """Prepare features for training; fit_encoders=False extends the existing encoders"""
         logger.info("Preparing features for training...")
         
         # Select numerical features
@@ -177,9 +222,12 @@ class CombinedCropRecommendationTrainer:
         # Categorical encoding
         for feature in categorical_features:
             if feature in df.columns:
-                le = LabelEncoder()
-                df[feature] = le.fit_transform(df[feature].astype(str))
-                self.label_encoders[feature] = le
+                if fit_encoders or feature not in self.label_encoders:
+                    le = LabelEncoder()
+                    df[feature] = le.fit_transform(df[feature].astype(str))
+                    self.label_encoders[feature] = le
+                else:
+                    df[feature] = self._encode_appending(self.label_encoders[feature], df[feature])
         
         # Add categorical features to numerical ones
         all_features = numerical_features + categorical_features + [
@@ -200,12 +248,23 @@ class CombinedCropRecommendationTrainer:
         logger.info(f"Prepared {len(self.feature_names)} features")
         return df
     
-    def train_model(self, df):
-        """Train the Random Forest model"""
-        logger.info("Training Random Forest model...")
-        
+    @staticmethod
+    def _encode_appending(le, values):
+        """Encode with a fitted LabelEncoder, giving unseen values new codes at the end"""
+        values = values.astype(str)
+        known = set(le.classes_)
+        unseen = [v for v in pd.unique(values) if v not in known]
+        if unseen:
+            # Existing codes keep their meaning; transform maps strings through a lookup
+            # table, so classes_ does not have to stay sorted
+            logger.info(f"Appending {len(unseen)} new categories: {unseen}")
+            le.classes_ = np.concatenate([le.classes_, np.array(unseen)])
+        return le.transform(values)
+    
+    def _training_matrices(self, df, fit_encoders=True):
+        """Feature matrix and labels ready for the scaler"""
         # Prepare features
-        df = self.prepare_features(df)
+        df = self.prepare_features(df, fit_encoders)
         
         # Target variable
         y = df['label']
@@ -219,6 +278,49 @@ class CombinedCropRecommendationTrainer:
             if col in X.columns:
                 X[col] = pd.to_numeric(X[col], errors='coerce').fillna(0)
         
+        return X, y
+    
+    def build_feature_matrix(self, use_cache=True, cache_dir=DEFAULT_CACHE_DIR):
+        """Final X/y for training, reused from the feature cache when inputs are unchanged"""
+        key, inputs = feature_cache_key(
+            [self.requirements_path, self.meta_path, self.yield_features_path], self.seed
+        )
+        cache = FeatureMatrixCache(cache_dir)
+        if use_cache:
+            cached = cache.load(key)
+            if cached is not None:
+                X, y, self.feature_names, self.label_encoders, info = cached
+                self.crop_classes = info['crop_classes']
+                logger.info(f"Loaded {len(y)} rows x {len(self.feature_names)} features "
+                            f"from feature cache {key[:12]}")
+                # Restore the column dtypes of a fresh build (X is stored as float64)
+                X = pd.DataFrame(X, columns=self.feature_names).astype(info['dtypes'])
+                return X, pd.Series(y, name='label')
+        
+        datasets = self.load_and_combine_datasets()
+        if datasets is None:
+            return None
+        df_requirements, df_meta = datasets
+        
+        # Engineer district features
+        df_enhanced = self.engineer_district_features(df_requirements, df_meta)
+        X, y = self._training_matrices(df_enhanced)
+        
+        if use_cache:
+            cache.save(key, X.to_numpy(dtype=float), y.to_numpy(), self.feature_names,
+                       self.label_encoders, {
+                           'seed': self.seed,
+                           'inputs': inputs,
+                           'crop_classes': self.crop_classes,
+                           'dtypes': {column: str(dtype) for column, dtype in X.dtypes.items()}
+                       })
+            logger.info(f"Stored feature matrix in cache {key[:12]}")
+        return X, y
+    
+    def train_model(self, X, y):
+        """Train the Random Forest model"""
+        logger.info("Training Random Forest model...")
+        
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=0.2, random_state=42, stratify=y
@@ -250,6 +352,166 @@ class CombinedCropRecommendationTrainer:
         
         return accuracy
     
+    def tune_model(self, X, y, search='grid', n_iter=20, n_splits=5, workers=None,
+                   memory_limit_mb=None, seed=42):
+        """Pick Random Forest hyperparameters by cross-validation, then train the winner"""
+        logger.info(f"Tuning Random Forest model ({search} search, {n_splits}-fold CV)...")
+        
+        # Same split as train_model: the test set stays out of the search
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y
+        )
+        
+        results = search_hyperparameters(
+            X_train.to_numpy(dtype=float), y_train.to_numpy(), search=search, n_iter=n_iter,
+            n_splits=n_splits, workers=workers, memory_limit_mb=memory_limit_mb, seed=seed
+        )
+        best = results[0]
+        if best['error']:
+            logger.error(f"Every tuning candidate failed, e.g.: {best['error']}")
+            return None
+        logger.info(f"Best parameters: {best['params']} with {best['n_estimators']} trees "
+                    f"(CV accuracy {best['cv_accuracy']:.4f})")
+        
+        X_train_scaled = self.scaler.fit_transform(X_train)
+        X_test_scaled = self.scaler.transform(X_test)
+        
+        self.model = RandomForestClassifier(
+            n_estimators=best['n_estimators'],
+            random_state=42,
+            n_jobs=-1,
+            **best['params']
+        )
+        self.model.fit(X_train_scaled, y_train)
+        
+        y_pred = self.model.predict(X_test_scaled)
+        accuracy = accuracy_score(y_test, y_pred)
+        
+        self.tuning_results = {
+            'search': search,
+            'folds': n_splits,
+            'best': best,
+            'candidates': results
+        }
+        
+        logger.info(f"Tuned model trained with accuracy: {accuracy:.4f}")
+        logger.info("\nClassification Report:")
+        logger.info(classification_report(y_test, y_pred))
+        
+        return accuracy
+    
+    def incremental_update(self, batch_path, add_trees=25, replay_per_class=5,
+                           model_dir='../trained_models', seed=42):
+        """Add trees trained on a new batch of rows to the saved forest.
+        
+        The batch uses the crop_requirements.csv columns. The scaler is
+        updated with partial_fit (existing tree thresholds are rebased to the
+        new scaling), categorical encoders gain codes for new values only,
+        and a small replay sample of the original data keeps every known crop
+        in the fit. Rows labelled with crops the forest does not know are
+        rejected: the existing trees cannot vote for them, so adding a crop
+        needs a full retrain. Returns the forest's accuracy on the batch, or
+        None if nothing was updated.
+        """
+        logger.info(f"Incremental update from {batch_path}...")
+        
+        try:
+            model_data = joblib.load(f'{model_dir}/combined_rf_crop_recommender.joblib')
+            preprocessing = joblib.load(f'{model_dir}/combined_preprocessing_pipeline.joblib')
+            with open(f'{model_dir}/combined_model_metadata.json', 'r') as f:
+                metadata = json.load(f)
+            df_batch = pd.read_csv(batch_path)
+        except Exception as e:
+            logger.error(f"Error loading model or batch for incremental update: {e}")
+            return None
+        
+        self.model = model_data['model']
+        self.feature_names = model_data['feature_names']
+        self.crop_classes = model_data['crop_classes']
+        self.label_encoders = preprocessing['label_encoders']
+        self.scaler = preprocessing['scaler']
+        self.tuning_results = metadata.get('tuning')
+        n_existing = len(self.model.estimators_)
+        self.lineage = metadata.get('lineage') or [
+            {'batch': 0, 'source': 'unknown', 'sha256': None, 'rows': None, 'trees': [0, n_existing]}
+        ]
+        
+        batch_hash = file_sha256(batch_path)
+        if any(entry.get('sha256') == batch_hash for entry in self.lineage):
+            logger.error(f"Batch {batch_path} has already been applied to this model")
+            return None
+        
+        datasets = self.load_and_combine_datasets()
+        if datasets is None:
+            return None
+        df_requirements, df_meta = datasets
+        
+        missing = [c for c in df_requirements.columns if c not in df_batch.columns]
+        if missing:
+            logger.error(f"Batch is missing columns: {missing}")
+            return None
+        
+        known_crops = set(self.model.classes_)
+        unknown = ~df_batch['label'].isin(known_crops)
+        if unknown.any():
+            logger.warning(f"Rejecting {int(unknown.sum())} rows with crops the model does not know: "
+                           f"{sorted(df_batch.loc[unknown, 'label'].unique())}")
+        df_batch = df_batch.loc[~unknown, df_requirements.columns]
+        if df_batch.empty:
+            logger.error("No usable rows in the batch")
+            return None
+        
+        # warm_start refits classes_ from y, so every known crop must appear
+        df_replay = (df_requirements[df_requirements['label'].isin(known_crops)]
+                     .sample(frac=1.0, random_state=seed)
+                     .groupby('label')
+                     .head(replay_per_class))
+        df_new = pd.concat([df_batch, df_replay], ignore_index=True)
+        if set(df_new['label']) != known_crops:
+            logger.error(f"Batch plus replay does not cover every crop: {sorted(known_crops - set(df_new['label']))}")
+            return None
+        
+        saved_features = self.feature_names
+        df_new = self.engineer_district_features(df_new, df_meta)
+        X, y = self._training_matrices(df_new, fit_encoders=False)
+        if self.feature_names != saved_features:
+            logger.error("Batch features do not match the saved model's features")
+            self.feature_names = saved_features
+            return None
+        
+        # Only the batch is new to the scaler; replay rows were counted before
+        old_mean, old_scale = self.scaler.mean_.copy(), self.scaler.scale_.copy()
+        self.scaler.partial_fit(X.iloc[:len(df_batch)])
+        rebase_tree_thresholds(self.model, old_mean, old_scale, self.scaler.mean_, self.scaler.scale_)
+        
+        # Trees pickled by older scikit-learn hold class counts rather than
+        # fractions; normalise so old and new trees vote with equal weight
+        for estimator in self.model.estimators_:
+            value = estimator.tree_.value
+            value /= np.maximum(value.sum(axis=-1, keepdims=True), 1e-12)
+        
+        self.model.set_params(warm_start=True, n_estimators=n_existing + add_trees)
+        X_scaled = self.scaler.transform(X)
+        self.model.fit(X_scaled, y)
+        self.model.set_params(warm_start=False)
+        
+        accuracy = accuracy_score(y[:len(df_batch)], self.model.predict(X_scaled[:len(df_batch)]))
+        
+        self.lineage.append({
+            'batch': len(self.lineage),
+            'source': os.path.abspath(batch_path),
+            'sha256': batch_hash,
+            'rows': len(df_batch),
+            'replay_rows': len(df_replay),
+            'rejected_rows': int(unknown.sum()),
+            'trees': [n_existing, n_existing + add_trees],
+            'date': datetime.now().isoformat()
+        })
+        
+        logger.info(f"Added {add_trees} trees ({n_existing} -> {n_existing + add_trees}); "
+                    f"accuracy on the batch: {accuracy:.4f}")
+        return accuracy
+    
     def save_model(self, output_dir='../trained_models'):
         """Save the trained model and metadata"""
         if not os.path.exists(output_dir):
@@ -263,6 +525,9 @@ class CombinedCropRecommendationTrainer:
         }
         joblib.dump(model_data, f'{output_dir}/combined_rf_crop_recommender.joblib')
         
+        # Export flat node arrays for the API's compiled inference path
+        export_forest(self.model, f'{output_dir}/combined_rf_compiled.npz')
+        
         # Save metadata
         metadata = {
             'crop_classes': self.crop_classes,
@@ -270,6 +535,10 @@ class CombinedCropRecommendationTrainer:
             'model_type': 'CombinedRandomForestClassifier',
             'training_date': datetime.now().isoformat()
         }
+        if self.tuning_results:
+            metadata['tuning'] = self.tuning_results
+        if self.lineage:
+            metadata['lineage'] = self.lineage
         with open(f'{output_dir}/combined_model_metadata.json', 'w') as f:
             json.dump(metadata, f, indent=2)
             
@@ -281,24 +550,73 @@ class CombinedCropRecommendationTrainer:
         joblib.dump(preprocessing_data, f'{output_dir}/combined_preprocessing_pipeline.joblib')
         
         logger.info(f"Model saved to {output_dir}")
+        
+        # Publish an immutable version the API's background loader picks up
+        try:
+            ModelRegistry(f'{output_dir}/registry').publish({
+                'model': f'{output_dir}/combined_rf_crop_recommender.joblib',
+                'preprocessing': f'{output_dir}/combined_preprocessing_pipeline.joblib',
+                'metadata': f'{output_dir}/combined_model_metadata.json',
+                'compiled': f'{output_dir}/combined_rf_compiled.npz'
+            }, source='train_combined_rf_model.py')
+        except Exception as e:
+            logger.error(f"Error publishing model to the registry: {e}")
     
-    def run_training(self):
-        """Run the complete training pipeline"""
+    def evaluate_model(self, model_dir='../trained_models', use_cache=True):
+        """Accuracy of the saved model on the held-out split of the feature matrix"""
+        try:
+            model_data = joblib.load(f'{model_dir}/combined_rf_crop_recommender.joblib')
+            preprocessing = joblib.load(f'{model_dir}/combined_preprocessing_pipeline.joblib')
+        except Exception as e:
+            logger.error(f"Error loading model for evaluation: {e}")
+            return None
+        
+        matrices = self.build_feature_matrix(use_cache)
+        if matrices is None:
+            return None
+        X, y = matrices
+        if list(X.columns) != list(model_data['feature_names']):
+            logger.error("Saved model was trained on different features")
+            return None
+        
+        # Same split as train_model
+        _, X_test, _, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y
+        )
+        y_pred = model_data['model'].predict(preprocessing['scaler'].transform(X_test))
+        accuracy = accuracy_score(y_test, y_pred)
+        logger.info(f"Saved model accuracy on the held-out split: {accuracy:.4f}")
+        logger.info(classification_report(y_test, y_pred))
+        return accuracy
+    
+    def run_training(self, tune_options=None, use_cache=True):
+        """Run the complete training pipeline; tune_options switches to CV tuning"""
         logger.info("Starting combined crop recommendation model training...")
         
-        # Load datasets
-        datasets = self.load_and_combine_datasets()
-        if datasets is None:
+        # Load datasets and engineer features, or reuse the cached matrix
+        matrices = self.build_feature_matrix(use_cache)
+        if matrices is None:
             logger.error("Failed to load datasets")
             return False
-            
-        df_requirements, df_meta = datasets
-        
-        # Engineer district features
-        df_enhanced = self.engineer_district_features(df_requirements, df_meta)
+        X, y = matrices
         
         # Train model
-        accuracy = self.train_model(df_enhanced)
+        if tune_options is not None:
+            accuracy = self.tune_model(X, y, **tune_options)
+            if accuracy is None:
+                logger.error("Hyperparameter tuning failed")
+                return False
+        else:
+            accuracy = self.train_model(X, y)
+        
+        self.lineage = [{
+            'batch': 0,
+            'source': os.path.abspath(self.requirements_path),
+            'sha256': file_sha256(self.requirements_path),
+            'rows': len(X),
+            'trees': [0, len(self.model.estimators_)],
+            'date': datetime.now().isoformat()
+        }]
         
         # Save model
         self.save_model()
@@ -312,8 +630,57 @@ class CombinedCropRecommendationTrainer:
 
 def main():
     """Main training function"""
-    trainer = CombinedCropRecommendationTrainer()
-    success = trainer.run_training()
+    parser = argparse.ArgumentParser(description='Train the combined crop recommendation Random Forest')
+    parser.add_argument('--tune', action='store_true', help='Pick hyperparameters by stratified k-fold CV')
+    parser.add_argument('--search', choices=['grid', 'random'], default='grid')
+    parser.add_argument('--n-iter', type=int, default=20, help='Candidates sampled by random search')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=None, help='Tuning processes (default: CPU count)')
+    parser.add_argument('--fold-memory-mb', type=int, default=None,
+                        help='Address-space cap for each tuning worker')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--incremental', metavar='BATCH_CSV',
+                        help='Add trees trained on a new batch to the saved model instead of retraining')
+    parser.add_argument('--add-trees', type=int, default=25)
+    parser.add_argument('--replay-per-class', type=int, default=5,
+                        help='Original rows per crop mixed into an incremental batch')
+    parser.add_argument('--model-dir', default='../trained_models')
+    parser.add_argument('--evaluate', action='store_true',
+                        help='Score the saved model on the held-out split instead of training')
+    parser.add_argument('--no-feature-cache', action='store_true',
+                        help='Rebuild the feature matrix even if a cached one matches the inputs')
+    args = parser.parse_args()
+    
+    if args.evaluate:
+        trainer = CombinedCropRecommendationTrainer(seed=args.seed)
+        if trainer.evaluate_model(args.model_dir, not args.no_feature_cache) is None:
+            logger.error("Model evaluation failed!")
+        return
+    
+    if args.incremental:
+        trainer = CombinedCropRecommendationTrainer(seed=args.seed)
+        accuracy = trainer.incremental_update(args.incremental, args.add_trees, args.replay_per_class,
+                                              args.model_dir, args.seed)
+        if accuracy is None:
+            logger.error("Incremental update failed!")
+            return
+        trainer.save_model(args.model_dir)
+        logger.info("Incremental update completed successfully!")
+        return
+    
+    tune_options = None
+    if args.tune:
+        tune_options = {
+            'search': args.search,
+            'n_iter': args.n_iter,
+            'n_splits': args.folds,
+            'workers': args.workers,
+            'memory_limit_mb': args.fold_memory_mb,
+            'seed': args.seed
+        }
+    
+    trainer = CombinedCropRecommendationTrainer(seed=args.seed)
+    success = trainer.run_training(tune_options, not args.no_feature_cache)
     
     if success:
         logger.info("Model training completed successfully!")
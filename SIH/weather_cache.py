@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Spatial-bucket weather cache with TTL, LRU eviction and stale-while-revalidate.
+Nearby coordinates share a grid cell so farmers in the same district reuse
+one upstream Open-Meteo response.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingFetch:
+    """Upstream fetch shared by every caller that missed on the same cell"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+        self.fetched_at = None
+
+
+class WeatherCache:
+    """Thread-safe weather cache keyed by rounded (lat, lon) grid cell.
+
+    Entries younger than ``ttl`` seconds are served as hits. Entries older
+    than ``ttl`` but within ``ttl + stale_ttl`` are served immediately while
+    a background thread refreshes them. Concurrent misses for the same cell
+    are coalesced into a single upstream fetch.
+    """
+
+    def __init__(self, ttl=900, stale_ttl=3600, max_entries=2048, cell_size=0.1,
+                 fetch_timeout=15):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.cell_size = cell_size
+        self.fetch_timeout = fetch_timeout
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'coalesced': 0,
+            'refreshes': 0,
+            'errors': 0,
+            'evictions': 0
+        }
+
+    def cell_key(self, lat, lon):
+        """Snap coordinates to the centre of their grid cell"""
+        size = self.cell_size
+        return (round(round(float(lat) / size) * size, 6),
+                round(round(float(lon) / size) * size, 6))
+
+    def get(self, lat, lon, fetch):
+        """Return weather for the cell containing (lat, lon).
+
+        ``fetch(lat, lon)`` is called with the cell centre on a miss and must
+        return a weather dict or raise. Errors are propagated to every caller
+        waiting on that fetch and nothing is cached.
+        """
+        return self.get_with_freshness(lat, lon, fetch)[0]
+
+    def get_with_freshness(self, lat, lon, fetch):
+        """get(), plus the seconds the returned weather stays a fresh hit (0 if served stale)"""
+        key = self.cell_key(lat, lon)
+        now = time.monotonic()
+        refresh = False
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, fetched_at = entry
+                age = now - fetched_at
+                if age <= self.ttl:
+                    self._counters['hits'] += 1
+                    self._entries.move_to_end(key)
+                    return dict(value), self.ttl - age
+                if age <= self.ttl + self.stale_ttl:
+                    self._counters['stale'] += 1
+                    self._entries.move_to_end(key)
+                    if key not in self._inflight:
+                        self._inflight[key] = _PendingFetch()
+                        refresh = True
+                    stale_value = dict(value)
+                else:
+                    stale_value = None
+            else:
+                stale_value = None
+
+            if stale_value is None:
+                self._counters['misses'] += 1
+                pending = self._inflight.get(key)
+                leader = pending is None
+                if leader:
+                    pending = _PendingFetch()
+                    self._inflight[key] = pending
+                else:
+                    self._counters['coalesced'] += 1
+
+        if stale_value is not None:
+            if refresh:
+                thread = threading.Thread(
+                    target=self._run_fetch, args=(key, fetch), daemon=True
+                )
+                thread.start()
+            return stale_value, 0.0
+
+        if leader:
+            self._run_fetch(key, fetch)
+        elif not pending.event.wait(self.fetch_timeout):
+            raise TimeoutError(f"Timed out waiting for weather fetch for cell {key}")
+
+        if pending.error is not None:
+            raise pending.error
+        return dict(pending.value), max(0.0, self.ttl - (time.monotonic() - pending.fetched_at))
+
+    def _run_fetch(self, key, fetch):
+        """Fetch a cell from upstream and publish the result to waiters"""
+        with self._lock:
+            pending = self._inflight[key]
+            is_refresh = key in self._entries
+        try:
+            value = fetch(key[0], key[1])
+            fetched_at = time.monotonic()
+            with self._lock:
+                self._entries[key] = (value, fetched_at)
+                self._entries.move_to_end(key)
+                if is_refresh:
+                    self._counters['refreshes'] += 1
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counters['evictions'] += 1
+            pending.value = value
+            pending.fetched_at = fetched_at
+        except Exception as e:
+            with self._lock:
+                self._counters['errors'] += 1
+            if is_refresh:
+                logger.warning(f"Background weather refresh failed for cell {key}: {e}")
+            pending.error = e
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.event.set()
+
+    def stats(self):
+        """Return a snapshot of the cache counters"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+        stats['max_entries'] = self.max_entries
+        stats['ttl'] = self.ttl
+        stats['stale_ttl'] = self.stale_ttl
+        stats['cell_size'] = self.cell_size
+        return stats
+
+    def clear(self):
+        """Drop all cached cells (in-flight fetches are left to finish)"""
+        with self._lock:
+            self._entries.clear()
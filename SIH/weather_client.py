@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP client for Open-Meteo with a circuit breaker, plus a thread-pool
+fan-out helper for fetching many coordinates concurrently.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling upstream while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Stops calling a failing upstream until a cool-down has passed.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    every call is rejected for ``reset_timeout`` seconds. One probe call is
+    then let through (half-open); success closes the circuit, failure opens
+    it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._counters = {'trips': 0, 'rejected': 0}
+
+    def allow(self):
+        """Return True if a call may go upstream now"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self._counters['rejected'] += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    self._counters['rejected'] += 1
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self._counters['trips'] += 1
+                    logger.warning(f"Circuit opened after {self._failures} consecutive failures")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['state'] = self.state
+            stats['consecutive_failures'] = self._failures
+        return stats
+
+
+class PooledWeatherClient:
+    """Keep-alive HTTP client for the Open-Meteo forecast endpoint.
+
+    At most ``pool_size`` calls are in flight at once, so every connection
+    goes back to the pool instead of being opened and discarded when request
+    threads, fan-outs and background refreshes overlap.
+    """
+
+    def __init__(self, base_url, pool_size=16, connect_timeout=3.05, read_timeout=10,
+                 breaker=None):
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker or CircuitBreaker()
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    @property
+    def session(self):
+        """requests.Session created on first use (keeps requests off the import path)"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    def get_json(self, params):
+        """GET the forecast endpoint through the breaker and return parsed JSON"""
+        # Wait for a pooled connection before asking the breaker, so a queued
+        # call never holds the half-open probe
+        if not self._slots.acquire(timeout=self.timeout[1]):
+            raise TimeoutError(f"All {self.pool_size} connections to {self.base_url} busy")
+        try:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {self.base_url}")
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+                response.raise_for_status()
+                data = response.json()
+            except Exception:
+                self.breaker.record_failure()
+                raise
+        finally:
+            self._slots.release()
+        self.breaker.record_success()
+        return data
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+def fan_out(fn, args_list, concurrency=16):
+    """Call ``fn(*args)`` for every entry of ``args_list`` concurrently.
+
+    Calls run on a thread pool of at most ``concurrency`` workers. Results are
+    returned in input order, with exceptions returned in place of failed results.
+    """
+    if not args_list:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(args_list))) as executor:
+        futures = [executor.submit(fn, *args) for args in args_list]
+    results = []
+    for future in futures:
+        error = future.exception()
+        results.append(error if error is not None else future.result())
+    return results
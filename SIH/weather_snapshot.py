@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Local weather snapshot store for offline and batch scoring.
+
+A snapshot is a float32 array of shape (districts, dates, 4) holding
+temperature, humidity, weekly rainfall and wind speed for consecutive days,
+plus a JSON index with the start date and each district's (state, district,
+lat, lon). The array is memory-mapped and a lookup is two dict/arithmetic
+steps, so WeatherService in WEATHER_MODE=snapshot answers without touching
+the network.
+
+Layout next to each other:
+    weather_snapshot.npy    float32 [districts, dates, FIELDS]
+    weather_snapshot.json   index: start_date, n_dates, fields, districts
+
+Fill it from a synthetic generator, a live recording of every district, or
+recorded fetches (JSONL lines with state, district and weather_data, such
+as generate_bulk_recommendations.py parts):
+    python weather_snapshot.py synthetic --start 2025-01-01 --days 365
+    python weather_snapshot.py record
+    python weather_snapshot.py import ../outputs/parts/*.jsonl
+"""
+
+import argparse
+import json
+import logging
+import os
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ['temperature', 'humidity', 'rainfall', 'wind_speed']
+DEFAULT_SNAPSHOT_PATH = '../trained_models/weather_snapshot.npy'
+# Coordinates are matched exactly (rounded to this many decimals), then by grid cell
+COORD_DECIMALS = 4
+CELL_SIZE = 0.1
+
+
+def index_path(path):
+    return os.path.splitext(path)[0] + '.json'
+
+
+def _cell(lat, lon):
+    return (round(lat / CELL_SIZE), round(lon / CELL_SIZE))
+
+
+class WeatherSnapshot:
+    """Read-only, memory-mapped weather snapshot with O(1) lookups"""
+
+    def __init__(self, values, index):
+        self.values = values
+        self.start_date = date.fromisoformat(index['start_date'])
+        self.n_dates = values.shape[1]
+        self.districts = [tuple(d) for d in index['districts']]
+        self.by_name = {(state, district): row for row, (state, district, _, _) in enumerate(self.districts)}
+        self.by_coords = {}
+        self.by_cell = {}
+        for row, (_, _, lat, lon) in enumerate(self.districts):
+            self.by_coords.setdefault((round(lat, COORD_DECIMALS), round(lon, COORD_DECIMALS)), row)
+            self.by_cell.setdefault(_cell(lat, lon), row)
+
+    @classmethod
+    def load(cls, path=DEFAULT_SNAPSHOT_PATH):
+        """Load a snapshot, or return None if it has not been built"""
+        if not (os.path.exists(path) and os.path.exists(index_path(path))):
+            return None
+        with open(index_path(path)) as f:
+            index = json.load(f)
+        values = np.load(path, mmap_mode='r')
+        return cls(values, index)
+
+    @property
+    def end_date(self):
+        return self.start_date + timedelta(days=self.n_dates - 1)
+
+    def row_for(self, lat, lon):
+        row = self.by_coords.get((round(lat, COORD_DECIMALS), round(lon, COORD_DECIMALS)))
+        return self.by_cell.get(_cell(lat, lon)) if row is None else row
+
+    def date_offset(self, day):
+        """Column for a date, clamped to the snapshot's range"""
+        return min(max((day - self.start_date).days, 0), self.n_dates - 1)
+
+    def lookup(self, lat, lon, day=None):
+        """Weather dict for the district at (lat, lon) on ``day``, or None if unknown/missing"""
+        row = self.row_for(lat, lon)
+        if row is None:
+            return None
+        offset = self.date_offset(day or date.today())
+        temperature, humidity, rainfall, wind_speed = self.values[row, offset].tolist()
+        if np.isnan(temperature):
+            return None
+        return {
+            'temperature': round(temperature, 1),
+            'humidity': round(humidity, 1),
+            'rainfall': round(rainfall, 1),
+            'wind_speed': round(wind_speed, 1),
+            # Snapshots keep weekly rainfall only
+            'precipitation_current': None,
+            'precipitation_week': round(rainfall, 1),
+            'fetch_time': (self.start_date + timedelta(days=offset)).isoformat(),
+            'source': 'snapshot'
+        }
+
+
+def write_snapshot(path, districts, start_date, values):
+    """Write values [districts, dates, FIELDS] and the index; the index goes last"""
+    values = np.asarray(values, dtype=np.float32)
+    index = {
+        'start_date': start_date.isoformat(),
+        'n_dates': int(values.shape[1]),
+        'fields': FIELDS,
+        'districts': [[state, district, float(lat), float(lon)] for state, district, lat, lon in districts]
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + '.tmp.npy'
+    np.save(tmp, values)
+    os.replace(tmp, path)
+    with open(index_path(path) + '.tmp', 'w') as f:
+        json.dump(index, f)
+    os.replace(index_path(path) + '.tmp', index_path(path))
+    logger.info(f"Weather snapshot written to {path}: {len(districts)} districts, "
+                f"{values.shape[1]} days from {start_date}")
+
+
+def load_districts(meta_path='district_meta.csv'):
+    """(state, district, lat, lon) for every district in the metadata CSV"""
+    # Imported here so the API can import this module without pandas
+    import pandas as pd
+
+    df = pd.read_csv(meta_path)
+    return list(df[['state', 'district', 'lat', 'lon']].itertuples(index=False, name=None))
+
+
+def synthetic_values(districts, start_date, days, seed=0):
+    """Plausible daily weather per district: seasonal cycle, monsoon peak, latitude and noise"""
+    rng = np.random.default_rng(seed)
+    lat = np.array([d[2] for d in districts], dtype=float)[:, None]
+    lon = np.array([d[3] for d in districts], dtype=float)[:, None]
+    day_of_year = np.array([(start_date + timedelta(days=i)).timetuple().tm_yday for i in range(days)])[None, :]
+    shape = (len(districts), days)
+
+    monsoon = np.exp(-((day_of_year - 205) / 45.0) ** 2)
+    temperature = (26 + 6 * np.sin(2 * np.pi * (day_of_year - 105) / 365) - 0.35 * (lat - 20)
+                   + rng.normal(0, 1.5, shape))
+    humidity = np.clip(55 + 30 * monsoon + rng.normal(0, 5, shape), 15, 100)
+    rainfall = np.maximum(0, 5 + 150 * monsoon * (1 + 0.03 * (lon - 78)) + rng.normal(0, 10, shape))
+    wind_speed = np.maximum(0, 7 + 4 * monsoon + rng.normal(0, 1.5, shape))
+    return np.stack([temperature, humidity, rainfall, wind_speed], axis=-1)
+
+
+def merge_observations(districts, observations, snapshot=None):
+    """Combine an existing snapshot with (row, date, [values]) observations.
+
+    The result covers the union of the date ranges; missing cells are NaN
+    and later observations overwrite earlier values for the same day.
+    """
+    days = [day for _, day, _ in observations]
+    if snapshot is not None:
+        days += [snapshot.start_date, snapshot.end_date]
+    start, end = min(days), max(days)
+    values = np.full((len(districts), (end - start).days + 1, len(FIELDS)), np.nan, dtype=np.float32)
+    if snapshot is not None:
+        name_rows = {(state, district): row for row, (state, district, _, _) in enumerate(districts)}
+        offset = (snapshot.start_date - start).days
+        for old_row, (state, district, _, _) in enumerate(snapshot.districts):
+            row = name_rows.get((state, district))
+            if row is not None:
+                values[row, offset:offset + snapshot.n_dates] = snapshot.values[old_row]
+    for row, day, observed in observations:
+        values[row, (day - start).days] = observed
+    return start, values
+
+
+def record_live(districts, weather_service):
+    """Fetch today's weather for every district; failed fetches are skipped"""
+    from weather_client import fan_out
+
+    def fetch(lat, lon):
+        try:
+            return weather_service.fetch_weather(lat, lon)
+        except Exception as e:
+            logger.warning(f"Fetch failed for ({lat}, {lon}): {e}")
+            return None
+
+    today = date.today()
+    results = fan_out(fetch, [(lat, lon) for _, _, lat, lon in districts],
+                      weather_service.fan_out_concurrency)
+    return [(row, today, [weather[field] for field in FIELDS])
+            for row, weather in enumerate(results) if weather is not None]
+
+
+def read_recorded(paths, districts):
+    """Observations from JSONL records with state, district and weather_data"""
+    name_rows = {(state, district): row for row, (state, district, _, _) in enumerate(districts)}
+    observations = []
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                record = json.loads(line)
+                row = name_rows.get((record.get('state'), record.get('district')))
+                weather = record.get('weather_data')
+                if row is None or not weather:
+                    continue
+                day = datetime.fromisoformat(weather['fetch_time']).date()
+                observations.append((row, day, [weather[field] for field in FIELDS]))
+    return observations
+
+
+def main():
+    """Build or extend the weather snapshot"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Build the local weather snapshot store')
+    parser.add_argument('--output', default=DEFAULT_SNAPSHOT_PATH)
+    parser.add_argument('--meta', default='district_meta.csv')
+    commands = parser.add_subparsers(dest='command', required=True)
+    synthetic = commands.add_parser('synthetic', help='Generate seeded synthetic weather')
+    synthetic.add_argument('--start', type=date.fromisoformat, default=date(date.today().year, 1, 1))
+    synthetic.add_argument('--days', type=int, default=366)
+    synthetic.add_argument('--seed', type=int, default=0)
+    commands.add_parser('record', help="Fetch today's weather for every district and add it")
+    imported = commands.add_parser('import', help='Add recorded fetches from JSONL files')
+    imported.add_argument('paths', nargs='+')
+    args = parser.parse_args()
+
+    districts = load_districts(args.meta)
+    if args.command == 'synthetic':
+        values = synthetic_values(districts, args.start, args.days, args.seed)
+        write_snapshot(args.output, districts, args.start, values)
+        return
+
+    if args.command == 'record':
+        from improved_seasonal_api import WeatherService
+        observations = record_live(districts, WeatherService)
+    else:
+        observations = read_recorded(args.paths, districts)
+    if not observations:
+        logger.error("No weather observations to add")
+        return
+    start, values = merge_observations(districts, observations, WeatherSnapshot.load(args.output))
+    write_snapshot(args.output, districts, start, values)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Columnar, memory-mapped store for crop yield features.
+
+Replaces parsing crop_yield_features.json into nested dicts: states, seasons
+and crops are stored as integer codes and the statistics as float64 columns
+(so lookups return exactly the JSON values) in NumPy structured arrays.
+YieldFeatureStore exposes the same
+``features['state_crop_performance'][state][crop]`` lookups as the JSON.
+
+Layout of a store directory:
+    meta.json                   vocabularies, format version and active version
+    state_crop-<version>.npy    one row per (state, crop), sorted by state
+    seasonal-<version>.npy      one row per (state, season, crop), sorted by state, season
+
+The arrays are written under new version names and meta.json is switched
+last with os.replace, so a server mapping the store never pairs files from
+different builds.
+
+Run from the SIH directory to convert an existing JSON artifact:
+    python yield_feature_store.py
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Mapping
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+
+STATE_CROP_FIELDS = ['avg_yield', 'yield_efficiency', 'yield_std', 'total_area', 'total_production']
+SEASONAL_FIELDS = ['seasonal_avg_yield', 'seasonal_yield_efficiency', 'seasonal_area', 'seasonal_production']
+
+STATE_CROP_DTYPE = np.dtype(
+    [('state', '<i2'), ('crop', '<i2')]
+    + [(field, '<f8') for field in STATE_CROP_FIELDS]
+    + [('record_count', '<i4')]
+)
+SEASONAL_DTYPE = np.dtype(
+    [('state', '<i2'), ('season', '<i2'), ('crop', '<i2')]
+    + [(field, '<f8') for field in SEASONAL_FIELDS]
+)
+
+
+def _codes(values):
+    vocabulary = sorted(set(values))
+    return vocabulary, {value: code for code, value in enumerate(vocabulary)}
+
+
+def write_store(state_crop_rows, seasonal_rows, output_dir):
+    """Write a store from row dicts shaped like the JSON feature records.
+
+    ``state_crop_rows`` need 'State', 'Crop' and STATE_CROP_FIELDS plus
+    'record_count'; ``seasonal_rows`` need 'State', 'Season', 'Crop' and
+    SEASONAL_FIELDS. Seasons are stripped of padding as in the JSON.
+    """
+    seasonal_rows = [dict(row, Season=str(row['Season']).strip()) for row in seasonal_rows]
+    states, state_codes = _codes([r['State'] for r in state_crop_rows] + [r['State'] for r in seasonal_rows])
+    crops, crop_codes = _codes([r['Crop'] for r in state_crop_rows] + [r['Crop'] for r in seasonal_rows])
+    seasons, season_codes = _codes([r['Season'] for r in seasonal_rows])
+
+    state_crop = np.zeros(len(state_crop_rows), dtype=STATE_CROP_DTYPE)
+    for i, row in enumerate(state_crop_rows):
+        state_crop[i] = ((state_codes[row['State']], crop_codes[row['Crop']])
+                         + tuple(row[field] for field in STATE_CROP_FIELDS)
+                         + (row['record_count'],))
+    state_crop.sort(order=['state', 'crop'])
+
+    seasonal = np.zeros(len(seasonal_rows), dtype=SEASONAL_DTYPE)
+    for i, row in enumerate(seasonal_rows):
+        seasonal[i] = ((state_codes[row['State']], season_codes[row['Season']], crop_codes[row['Crop']])
+                       + tuple(row[field] for field in SEASONAL_FIELDS))
+    seasonal.sort(order=['state', 'season', 'crop'])
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'states': states,
+        'seasons': seasons,
+        'crops': crops
+    }
+    digest = hashlib.sha256(json.dumps(meta, sort_keys=True).encode())
+    digest.update(state_crop.tobytes())
+    digest.update(seasonal.tobytes())
+    meta['version'] = version = digest.hexdigest()[:16]
+
+    os.makedirs(output_dir, exist_ok=True)
+    previous = _active_version(output_dir)
+    for name, table in [('state_crop', state_crop), ('seasonal', seasonal)]:
+        path = os.path.join(output_dir, f'{name}-{version}.npy')
+        np.save(path + '.tmp.npy', table)
+        os.replace(path + '.tmp.npy', path)
+    # Switch meta.json atomically so running workers never see a partial write
+    meta_path = os.path.join(output_dir, 'meta.json')
+    with open(meta_path + '.tmp', 'w') as f:
+        json.dump(meta, f)
+    os.replace(meta_path + '.tmp', meta_path)
+
+    # Keep the arrays of the version just replaced for workers still opening it
+    keep = {version, previous}
+    for name in os.listdir(output_dir):
+        stem, ext = os.path.splitext(name)
+        if ext == '.npy' and stem.rsplit('-', 1)[-1] not in keep:
+            os.remove(os.path.join(output_dir, name))
+    logger.info(f"Yield feature store {version} written to {output_dir}: {len(state_crop)} state-crop rows, "
+                f"{len(seasonal)} seasonal rows")
+
+
+def _active_version(directory):
+    try:
+        with open(os.path.join(directory, 'meta.json')) as f:
+            return json.load(f).get('version')
+    except (OSError, ValueError):
+        return None
+
+
+def rows_from_features(features):
+    """Flatten a crop_yield_features.json dict into write_store row lists"""
+    state_crop_rows = [
+        dict(stats, State=state, Crop=crop)
+        for state, crops in features.get('state_crop_performance', {}).items()
+        for crop, stats in crops.items()
+    ]
+    seasonal_rows = [
+        dict(stats, State=state, Season=season, Crop=crop)
+        for state, seasons in features.get('seasonal_crop_performance', {}).items()
+        for season, crops in seasons.items()
+        for crop, stats in crops.items()
+    ]
+    return state_crop_rows, seasonal_rows
+
+
+class _RecordMapping(Mapping):
+    """Read-only {name: stats dict} view over a slice of a structured array"""
+
+    def __init__(self, table, start, stop, key_field, vocabulary, fields, int_fields=()):
+        self._table = table
+        self._start = start
+        self._stop = stop
+        self._key_field = key_field
+        self._vocabulary = vocabulary
+        self._fields = fields
+        self._int_fields = int_fields
+        self._rows = None
+
+    def _row_index(self):
+        if self._rows is None:
+            codes = self._table[self._key_field][self._start:self._stop]
+            self._rows = {self._vocabulary[code]: self._start + i for i, code in enumerate(codes.tolist())}
+        return self._rows
+
+    def __getitem__(self, name):
+        row = self._table[self._row_index()[name]]
+        stats = {field: float(row[field]) for field in self._fields}
+        for field in self._int_fields:
+            stats[field] = int(row[field])
+        return stats
+
+    def __contains__(self, name):
+        return name in self._row_index()
+
+    def __iter__(self):
+        return iter(self._row_index())
+
+    def __len__(self):
+        return self._stop - self._start
+
+
+def _group_bounds(codes):
+    """Map each code in a sorted code column to its (start, stop) row range"""
+    if len(codes) == 0:
+        return {}
+    change = np.flatnonzero(np.diff(codes)) + 1
+    starts = np.concatenate([[0], change])
+    stops = np.concatenate([change, [len(codes)]])
+    return {int(codes[start]): (int(start), int(stop)) for start, stop in zip(starts, stops)}
+
+
+class _StateCropPerformance(Mapping):
+    """features['state_crop_performance']: state -> crop -> stats"""
+
+    def __init__(self, store):
+        self._store = store
+        self._bounds = None
+        self._views = {}
+
+    def _state_bounds(self):
+        if self._bounds is None:
+            self._bounds = _group_bounds(self._store.state_crop['state'])
+        return self._bounds
+
+    def __getitem__(self, state):
+        view = self._views.get(state)
+        if view is None:
+            code = self._store.state_codes.get(state)
+            if code is None or code not in self._state_bounds():
+                raise KeyError(state)
+            start, stop = self._state_bounds()[code]
+            view = _RecordMapping(self._store.state_crop, start, stop, 'crop', self._store.crops,
+                                  STATE_CROP_FIELDS, int_fields=('record_count',))
+            self._views[state] = view
+        return view
+
+    def __iter__(self):
+        return (self._store.states[code] for code in self._state_bounds())
+
+    def __len__(self):
+        return len(self._state_bounds())
+
+
+class _SeasonalCropPerformance(Mapping):
+    """features['seasonal_crop_performance']: state -> season -> crop -> stats"""
+
+    def __init__(self, store):
+        self._store = store
+        self._bounds = None
+        self._views = {}
+
+    def _state_bounds(self):
+        if self._bounds is None:
+            self._bounds = _group_bounds(self._store.seasonal['state'])
+        return self._bounds
+
+    def __getitem__(self, state):
+        view = self._views.get(state)
+        if view is None:
+            code = self._store.state_codes.get(state)
+            if code is None or code not in self._state_bounds():
+                raise KeyError(state)
+            start, stop = self._state_bounds()[code]
+            view = {}
+            seasons = self._store.seasonal['season'][start:stop]
+            for season_code, (s_start, s_stop) in _group_bounds(seasons).items():
+                view[self._store.seasons[season_code]] = _RecordMapping(
+                    self._store.seasonal, start + s_start, start + s_stop, 'crop',
+                    self._store.crops, SEASONAL_FIELDS
+                )
+            self._views[state] = view
+        return view
+
+    def __iter__(self):
+        return (self._store.states[code] for code in self._state_bounds())
+
+    def __len__(self):
+        return len(self._state_bounds())
+
+
+class YieldFeatureStore(Mapping):
+    """Drop-in replacement for the parsed crop_yield_features.json dict"""
+
+    def __init__(self, state_crop, seasonal, meta):
+        self.state_crop = state_crop
+        self.seasonal = seasonal
+        self.states = meta['states']
+        self.seasons = meta['seasons']
+        self.crops = meta['crops']
+        self.state_codes = {state: code for code, state in enumerate(self.states)}
+        self._sections = {
+            'state_crop_performance': _StateCropPerformance(self),
+            'seasonal_crop_performance': _SeasonalCropPerformance(self),
+            'crop_yield_trends': {}
+        }
+
+    @classmethod
+    def load(cls, directory):
+        """Memory-map a store directory, or return None if it does not exist"""
+        meta_path = os.path.join(directory, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('format_version') != FORMAT_VERSION:
+            logger.warning(f"Unsupported yield feature store version {meta.get('format_version')}")
+            return None
+        version = meta['version']
+        state_crop = np.load(os.path.join(directory, f'state_crop-{version}.npy'), mmap_mode='r')
+        seasonal = np.load(os.path.join(directory, f'seasonal-{version}.npy'), mmap_mode='r')
+        return cls(state_crop, seasonal, meta)
+
+    def __getitem__(self, key):
+        return self._sections[key]
+
+    def __iter__(self):
+        return iter(self._sections)
+
+    def __len__(self):
+        return len(self._sections)
+
+
+def load_yield_features(store_dir, json_path):
+    """Load yield features from the columnar store, falling back to JSON.
+
+    Returns a Mapping with the crop_yield_features.json structure, or {}.
+    """
+    store = YieldFeatureStore.load(store_dir)
+    if store is not None:
+        logger.info(f"Loaded columnar crop yield features from {store_dir}")
+        return store
+    if os.path.exists(json_path):
+        with open(json_path, 'r') as f:
+            features = json.load(f)
+        logger.info(f"Loaded crop yield features from {json_path}")
+        return features
+    logger.warning(f"Crop yield features not found at {store_dir} or {json_path}")
+    return {}
+
+
+def main():
+    """Convert crop_yield_features.json into a columnar store"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Convert crop yield features JSON to the columnar store')
+    parser.add_argument('--input', default='../trained_models/crop_yield_features.json')
+    parser.add_argument('--output-dir', default='../trained_models/crop_yield_features')
+    args = parser.parse_args()
+
+    with open(args.input, 'r') as f:
+        features = json.load(f)
+    write_store(*rows_from_features(features), args.output_dir)
+
+
+if __name__ == "__main__":
+    main()